@@ -2,93 +2,298 @@
 
 import json
 import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Any, Dict, List
 
 import logging
 
+try:  # 优先使用 msgspec 的 MessagePack 编码，体积更小、编解码更快
+    import msgspec
+except ImportError:  # pragma: no cover - 可选依赖
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
-_SQL_INIT = """
-CREATE TABLE IF NOT EXISTS metrics (
+if msgspec is not None:
+    _encode = msgspec.msgpack.Encoder().encode
+    _decode_msgpack = msgspec.msgpack.Decoder().decode
+elif orjson is not None:
+    _encode = orjson.dumps
+    _decode_msgpack = None
+else:
+    def _encode(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data).encode("utf-8")
+    _decode_msgpack = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# 数据轮流写入两张表：新数据只写入活动表，活动表启用满一个保留周期后切换到
+# 另一张表，并整表删除其中的旧数据。DROP TABLE 只修改元数据，无需逐行 DELETE
+# 产生大量 WAL 帧；每条数据至少保留一个周期，最多保留两个周期
+_TABLES = ("metrics_a", "metrics_b")
+_LEGACY_TABLE = "metrics"
+
+_SQL_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     timestamp INTEGER NOT NULL,
-    data TEXT NOT NULL,
+    data BLOB NOT NULL,
     sent INTEGER DEFAULT 0
-);
+)
+"""
+
+# 部分索引只包含未发送的少量行，get_unsent 无需扫描整张表
+_SQL_CREATE_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_{table}_unsent ON {table}(sent, id) WHERE sent = 0"
+)
+
+# 记录当前活动表及其启用时间
+_SQL_CREATE_META = """
+CREATE TABLE IF NOT EXISTS cache_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+)
 """
 
+# WAL 模式下读写互不阻塞；synchronous=NORMAL 每次提交只需一次 fsync，
+# 仅在断电时可能丢失最后的提交，程序崩溃不会丢数据
+_SQL_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=67108864",
+)
+
+# 固定的 SQL 语句文本，配合长连接的语句缓存复用已编译的执行计划
+_SQL_INSERT = {
+    table: f"INSERT INTO {table} (timestamp, data, sent) VALUES (?, ?, 0)" for table in _TABLES
+}
+_SQL_SELECT_UNSENT = (
+    "SELECT id, timestamp, data FROM metrics_a WHERE sent = 0 "
+    "UNION ALL SELECT id, timestamp, data FROM metrics_b WHERE sent = 0 "
+    "ORDER BY id LIMIT ?"
+)
+_SQL_MARK_SENT = {table: f"UPDATE {table} SET sent = 1 WHERE id IN ({{}})" for table in _TABLES}
+_SQL_COUNT_UNSENT = {table: f"SELECT COUNT(*) FROM {table} WHERE sent = 0" for table in _TABLES}
+
+# 单条语句绑定参数数量上限（SQLite 旧版本默认 999）
+_MAX_SQL_PARAMS = 900
+
+_SQL_GET_META = "SELECT key, value FROM cache_meta"
+_SQL_INIT_META = "INSERT OR IGNORE INTO cache_meta (key, value) VALUES (?, ?)"
+_SQL_SET_META = "UPDATE cache_meta SET value = ? WHERE key = ?"
+# 两张表共用一个递增 id 序列：重建的表从另一张表已用到的最大 id 之后继续编号，
+# 保证 id 全局唯一且按写入顺序递增
+_SQL_MAX_SEQ = "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name IN ('metrics_a', 'metrics_b')"
+_SQL_SEED_SEQ = "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)"
+
+# 轮换之后执行的维护语句：将 WAL 写回主库并截断，同时刷新索引统计信息
+_SQL_MAINTENANCE = (
+    "PRAGMA wal_checkpoint(TRUNCATE)",
+    "PRAGMA optimize",
+)
+
+# 服务端要求 GPU 的这些数值字段不为 None，写入缓存时一次性补齐，发送时无需再处理
+_GPU_NUM_KEYS = ("memory_total", "memory_used", "memory_util_percent", "util_percent", "frequency_mhz")
+
+
+def _normalize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """返回 GPU 数值字段中的 None 已替换为 0 的数据。
+
+    调用方在保存后还会继续使用 data，因此不修改原对象：需要补齐时复制顶层 dict
+    及各 GPU 的 dict，其余字段直接引用。
+    """
+    # 多数主机没有 GPU，无 gpus 或为空列表时直接返回
+    gpus = data.get("gpus")
+    if not gpus:
+        return data
+    fixed = []
+    for gpu in gpus:
+        if any(gpu.get(key) is None for key in _GPU_NUM_KEYS):
+            gpu = dict(gpu)
+            for key in _GPU_NUM_KEYS:
+                if gpu.get(key) is None:
+                    gpu[key] = 0
+        fixed.append(gpu)
+    return {**data, "gpus": fixed}
+
+
+def _decode(raw: Any) -> Dict[str, Any]:
+    """解码 data 列。兼容旧版本写入的 JSON 文本以及 JSON 字节串。
+
+    数据损坏，或由装有 msgspec 的旧进程写入 MessagePack 而当前环境缺少 msgspec
+    时抛出 ValueError。
+    """
+    if isinstance(raw, str) or raw[:1] == b"{":
+        return _json_loads(raw)
+    if _decode_msgpack is None:
+        raise ValueError("MessagePack 数据需要 msgspec 才能解码")
+    return _decode_msgpack(raw)
+
 
 class Cache:
-    """简易 SQLite 缓存封装。线程安全需求不高，这里每次操作持久化连接。"""
+    """简易 SQLite 缓存封装。持有一个长连接，写操作由锁串行化。"""
 
     def __init__(self, db_path: str):
         self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = self._get_conn()
         self._ensure_db()
 
     # ------------------------------ 私有方法 ------------------------------
     def _get_conn(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path, timeout=10)
+        return sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+
+    def _create_table(self, table: str) -> None:
+        self._conn.execute(_SQL_CREATE_TABLE.format(table=table))
+        self._conn.execute(_SQL_CREATE_INDEX.format(table=table))
 
     def _ensure_db(self) -> None:
-        conn = self._get_conn()
-        try:
-            conn.execute(_SQL_INIT)
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._conn:
+            for pragma in _SQL_PRAGMAS:
+                self._conn.execute(pragma)
+            self._migrate_legacy_table()
+            for table in _TABLES:
+                self._create_table(table)
+            self._conn.execute(_SQL_CREATE_META)
+            self._conn.execute(_SQL_INIT_META, ("active", 0))
+            self._conn.execute(_SQL_INIT_META, ("rotated_at", int(time.time())))
+            meta = dict(self._conn.execute(_SQL_GET_META).fetchall())
+        self._active = meta["active"]
+        self._rotated_at = meta["rotated_at"]
+
+    def _migrate_legacy_table(self) -> None:
+        """旧版本只有一张 metrics 表，直接改名为第一张轮换表，保留其中未发送的数据。"""
+        tables = {
+            row[0]
+            for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        if _LEGACY_TABLE not in tables or _TABLES[0] in tables:
+            return
+        self._conn.execute("DROP INDEX IF EXISTS idx_metrics_sent_id")
+        self._conn.execute("DROP INDEX IF EXISTS idx_metrics_ts")
+        self._conn.execute(f"ALTER TABLE {_LEGACY_TABLE} RENAME TO {_TABLES[0]}")
+        logger.info("本地缓存已迁移到轮换表结构")
 
     # ------------------------------ 对外接口 ------------------------------
     def save(self, data: Dict[str, Any]) -> None:
         """插入一条新的 metrics 记录。"""
+        self.save_many([data])
+
+    def save_many(self, rows: List[Dict[str, Any]]) -> None:
+        """在单个事务内批量插入多条 metrics 记录，只提交一次。"""
+        if not rows:
+            return
         ts = int(time.time())
-        conn = self._get_conn()
-        try:
-            conn.execute(
-                "INSERT INTO metrics (timestamp, data, sent) VALUES (?, ?, 0)",
-                (ts, json.dumps(data)),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        params = [(ts, _encode(_normalize(data))) for data in rows]
+        with self._lock, self._conn:
+            self._conn.executemany(_SQL_INSERT[_TABLES[self._active]], params)
 
     def get_unsent(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """获取尚未成功发送到服务端的记录。"""
-        conn = self._get_conn()
-        try:
-            rows = conn.execute(
-                "SELECT id, timestamp, data FROM metrics WHERE sent = 0 ORDER BY id LIMIT ?",
-                (limit,),
-            ).fetchall()
-            return [
-                {
-                    "id": row[0],
-                    "timestamp": row[1],
-                    "data": json.loads(row[2]),
-                }
-                for row in rows
-            ]
-        finally:
-            conn.close()
+        """获取尚未成功发送到服务端的记录。
+
+        无法解码的记录记录日志后标记为已发送，避免其一直排在最前面阻塞后续发送。
+        """
+        with self._lock:
+            rows = self._conn.execute(_SQL_SELECT_UNSENT, (limit,)).fetchall()
+        records = []
+        bad_ids = []
+        for row in rows:
+            try:
+                data = _decode(row[2])
+            except ValueError as e:
+                logger.warning("跳过无法解码的缓存记录 id=%s: %s", row[0], e)
+                bad_ids.append(row[0])
+                continue
+            records.append({"id": row[0], "timestamp": row[1], "data": data})
+        if bad_ids:
+            self.mark_sent(bad_ids)
+        return records
 
     def mark_sent(self, ids: List[int]) -> None:
         """批量标记指定记录为已发送。"""
         if not ids:
             return
-        conn = self._get_conn()
-        try:
-            conn.executemany("UPDATE metrics SET sent = 1 WHERE id = ?", [(i,) for i in ids])
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._conn:
+            # 显式获取写锁，避免隐式事务在语句执行中途升级
+            self._conn.execute("BEGIN IMMEDIATE")
+            for start in range(0, len(ids), _MAX_SQL_PARAMS):
+                chunk = ids[start:start + _MAX_SQL_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                for sql in _SQL_MARK_SENT.values():
+                    self._conn.execute(sql.format(placeholders), chunk)
 
     def prune(self, max_age_seconds: int) -> None:
-        """删除早于 *max_age_seconds* 的数据行。"""
-        threshold = int(time.time()) - max_age_seconds
-        conn = self._get_conn()
+        """清理超过 *max_age_seconds* 的数据。
+
+        活动表启用满 *max_age_seconds* 后切换到另一张表，并整表删除另一张表；
+        该表的数据都写入于上次切换之前，均已超过保留时长。其中仍未发送的数据
+        （服务端长时间不可达时）同样被丢弃，丢弃条数以 WARNING 级别记录。
+        """
+        now = int(time.time())
+        with self._lock:
+            if now - self._rotated_at < max_age_seconds:
+                return
+            stale = 1 - self._active
+            table = _TABLES[stale]
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                seq = self._conn.execute(_SQL_MAX_SEQ).fetchone()[0]
+                dropped = self._conn.execute(_SQL_COUNT_UNSENT[table]).fetchone()[0]
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._create_table(table)
+                self._conn.execute(_SQL_SEED_SEQ, (table, seq))
+                self._conn.execute(_SQL_SET_META, (stale, "active"))
+                self._conn.execute(_SQL_SET_META, (now, "rotated_at"))
+            self._active = stale
+            self._rotated_at = now
+            logger.debug("本地缓存切换到 %s", table)
+            if dropped:
+                logger.warning("本地缓存丢弃 %d 条超过保留时长仍未发送的数据", dropped)
+
+            for pragma in _SQL_MAINTENANCE:
+                try:
+                    self._conn.execute(pragma).fetchall()
+                except sqlite3.Error as e:
+                    logger.debug("缓存维护语句执行失败 %s: %s", pragma, e)
+
+    def close(self) -> None:
+        """关闭底层数据库连接。"""
+        with self._lock:
+            self._conn.close()
+
+
+def reset_cache_db(db_path: str) -> None:
+    """清空缓存数据库中的全部数据，保留表结构、索引和持久化的 PRAGMA 设置。
+
+    相比删除数据库文件，下次启动无需重新建表和初始化 WAL，仍持有连接的进程
+    也能继续使用同一个文件。数据库损坏无法清空时退回为删除文件。
+    """
+    try:
+        conn = sqlite3.connect(db_path, timeout=10)
         try:
-            conn.execute("DELETE FROM metrics WHERE timestamp < ?", (threshold,))
-            conn.commit()
+            tables = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for table in (*_TABLES, _LEGACY_TABLE):
+                    if table in tables:
+                        conn.execute(f"DELETE FROM {table}")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            conn.execute("VACUUM")
         finally:
-            conn.close() 
\ No newline at end of file
+            conn.close()
+        logger.info("本地缓存已清空")
+    except sqlite3.DatabaseError as e:
+        logger.warning("清空本地缓存失败 (%s)，删除缓存数据库文件", e)
+        Path(db_path).unlink(missing_ok=True)
\ No newline at end of file
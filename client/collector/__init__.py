@@ -1,8 +1,11 @@
 """采集所有硬件指标。"""
 
+import logging
+import platform
 import socket
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 
 from ..config import get_monitor_config, get_disk_paths
 from .cpu import collect as collect_cpu
@@ -11,31 +14,76 @@ from .disk import collect as collect_disk
 from .gpu import collect as collect_gpu
 from ..identity import get_client_id
 
+logger = logging.getLogger(__name__)
 
-def _has_invalid_disk_paths(paths: list, system: str) -> bool:
-    """检查是否包含明显无效的磁盘路径"""
-    if not paths:
-        return False
+# 运行平台在进程生命周期内不会变化，导入时确定一次
+_SYSTEM = platform.system().lower()
+_POSIX_SYSTEMS = frozenset({"linux", "darwin"})
 
-    for path in paths:
-        # 检查是否为纯数字或明显无效的路径
-        if path.isdigit():  # 纯数字路径，如 "1", "2"
-            return True
+# 各采集器互相独立且以子进程/系统调用等待为主，放到常驻线程池中并行执行
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="collector")
+
+# collect_all 用到的全部监控配置项
+_MONITOR_KEYS = (
+    ("cpu", "enabled"),
+    ("cpu", "collect_temp"),
+    ("cpu", "collect_power"),
+    ("memory", "enabled"),
+    ("disk", "enabled"),
+    ("gpu", "enabled"),
+    ("gpu", "collect_temp"),
+    ("gpu", "collect_power"),
+)
 
-        if system == "windows":
-            # Windows下，有效路径应该是 "C:\", "D:\" 等格式
-            if not (len(path) >= 2 and path[1] == ':'):
-                return True
-        elif system in ["linux", "darwin"]:
-            # Linux/macOS下，有效路径应该以 "/" 开头
-            if not path.startswith('/'):
-                return True
 
-    return False
+def _snapshot_monitor_cfg() -> Dict[tuple, bool]:
+    """一次性读取本轮采集所需的监控配置，保证同一轮采集内配置一致"""
+    return {key: get_monitor_config(*key) for key in _MONITOR_KEYS}
 
 
-def collect_all() -> Dict[str, Any]:
-    """采集所有硬件指标并返回统一的 dict。"""
+def _classify_paths(paths: list, system: str) -> Tuple[bool, str]:
+    """判断是否应忽略配置路径而监控所有主要分区，一次遍历同时给出原因。
+
+    返回 (should_use_all, reason)；should_use_all 为 False 时 reason 为空字符串。
+    """
+    if not paths:
+        return True, "配置路径为空"
+
+    is_windows = system == "windows"
+    is_posix = system in _POSIX_SYSTEMS
+
+    if is_windows and "/" in paths:
+        return True, "Windows下配置了Linux路径"
+
+    invalid = False
+    for path in paths:
+        if is_posix and path.endswith(":\\"):
+            return True, "Linux/macOS下配置了Windows路径"
+        if invalid:
+            continue
+        # 纯数字路径，如 "1", "2"，属于明显无效的路径
+        if path.isdigit():
+            invalid = True
+        # Windows下，有效路径应该是 "C:\", "D:\" 等格式
+        elif is_windows and not (len(path) >= 2 and path[1] == ':'):
+            invalid = True
+        # Linux/macOS下，有效路径应该以 "/" 开头
+        elif is_posix and not path.startswith('/'):
+            invalid = True
+
+    if invalid:
+        return True, f"配置了无效路径 {paths}"
+    return False, ""
+
+
+def collect_all() -> Optional[Dict[str, Any]]:
+    """采集所有硬件指标并返回统一的 dict。
+
+    结构：timestamp、client_id、hostname 必有；cpu、memory 为 dict，disk、gpus
+    为 dict 列表，仅在对应监控项启用时出现。所有监控项均禁用时返回 None。
+    返回值保持为普通 dict：既可直接交给 requests 以 JSON 发送，也可由本地缓存
+    的 msgpack 编码器直接编码，无需中间转换。
+    """
     timestamp = int(time.time())
     data = {
         "timestamp": timestamp,
@@ -43,58 +91,51 @@ def collect_all() -> Dict[str, Any]:
         "hostname": socket.gethostname(),
     }
 
+    cfg = _snapshot_monitor_cfg()
+
+    # 并行启动所有已启用的采集器，结果按固定顺序合并
+    futures = {}
+    if cfg["cpu", "enabled"]:
+        futures["cpu"] = _executor.submit(collect_cpu)
+    if cfg["memory", "enabled"]:
+        futures["memory"] = _executor.submit(collect_memory)
+    if cfg["disk", "enabled"]:
+        futures["disk"] = _executor.submit(collect_disk)
+    if cfg["gpu", "enabled"]:
+        futures["gpu"] = _executor.submit(collect_gpu)
+
     # 记录实际采集的监控项数量
     collected_items = 0
 
     # CPU 监控
-    if get_monitor_config("cpu", "enabled"):
-        cpu_data = collect_cpu()
+    if "cpu" in futures:
+        cpu_data = futures["cpu"].result()
         # 根据配置过滤字段
-        if not get_monitor_config("cpu", "collect_temp"):
+        if not cfg["cpu", "collect_temp"]:
             cpu_data.pop("temperature_c", None)
-        if not get_monitor_config("cpu", "collect_power"):
+        if not cfg["cpu", "collect_power"]:
             cpu_data.pop("power_w", None)
         data["cpu"] = cpu_data
         collected_items += 1
 
     # 内存监控
-    if get_monitor_config("memory", "enabled"):
-        data["memory"] = collect_memory()
+    if "memory" in futures:
+        data["memory"] = futures["memory"].result()
         collected_items += 1
 
     # 磁盘监控
-    if get_monitor_config("disk", "enabled"):
+    if "disk" in futures:
         paths = get_disk_paths()
-        disk_data = collect_disk()
+        disk_data = futures["disk"].result()
 
         # 调试信息
-        import logging
-        import platform
-        logger = logging.getLogger(__name__)
         logger.info("磁盘采集: 配置路径=%s, 采集到%d个分区", paths, len(disk_data))
 
         # 如果配置的路径为空，或者配置了无效路径，则监控所有主要分区
-        system = platform.system().lower()
-        should_use_all = (
-            not paths or
-            (system == "windows" and "/" in paths) or  # Windows下配置了Linux路径
-            (system in ["linux", "darwin"] and any(p.endswith(":\\") for p in paths)) or  # Linux/Mac下配置了Windows路径
-            _has_invalid_disk_paths(paths, system)  # 配置了明显无效的路径
-        )
+        should_use_all, reason = _classify_paths(paths, _SYSTEM)
 
         if should_use_all:
             data["disk"] = disk_data
-            # 详细说明使用所有分区的原因
-            if not paths:
-                reason = "配置路径为空"
-            elif system == "windows" and "/" in paths:
-                reason = "Windows下配置了Linux路径"
-            elif system in ["linux", "darwin"] and any(p.endswith(":\\") for p in paths):
-                reason = "Linux/macOS下配置了Windows路径"
-            elif _has_invalid_disk_paths(paths, system):
-                reason = f"配置了无效路径 {paths}"
-            else:
-                reason = "其他原因"
             logger.info("使用所有分区: %d个 (原因: %s)", len(disk_data), reason)
         else:
             # 只保留配置的路径
@@ -105,13 +146,15 @@ def collect_all() -> Dict[str, Any]:
         collected_items += 1
 
     # GPU 监控
-    if get_monitor_config("gpu", "enabled"):
-        gpu_data = collect_gpu()
+    if "gpu" in futures:
+        gpu_data = futures["gpu"].result()
         # 根据配置过滤字段
+        drop_temp = not cfg["gpu", "collect_temp"]
+        drop_power = not cfg["gpu", "collect_power"]
         for gpu in gpu_data:
-            if not get_monitor_config("gpu", "collect_temp"):
+            if drop_temp:
                 gpu.pop("temperature_c", None)
-            if not get_monitor_config("gpu", "collect_power"):
+            if drop_power:
                 gpu.pop("power_w", None)
         data["gpus"] = gpu_data
         collected_items += 1
@@ -1,20 +1,145 @@
 """CPU 相关指标采集。"""
 
+import base64
+import functools
 import logging
 import platform
+import queue
 import re
 import subprocess
+import threading
+import time
 from typing import Any, Dict, Optional
 
 import psutil
 
 logger = logging.getLogger(__name__)
 
+# 运行平台在进程生命周期内不会变化，导入时确定一次
+_SYSTEM = platform.system().lower()
+_IS_WINDOWS = _SYSTEM == "windows"
+_IS_LINUX = _SYSTEM == "linux"
+_IS_DARWIN = _SYSTEM == "darwin"
+
+# sensors -u 输出中的功耗行，示例: power1_input: 34.56
+_POWER_RE = re.compile(r"power1_input:\s+([\d.]+)")
+
+
+class _PowerShellWorker:
+    """常驻 PowerShell 进程，避免每次采集都冷启动 PowerShell。
+
+    每条查询脚本以 Base64 编码成单行写入 stdin，执行完后输出一个哨兵行，
+    读取端据此切分每次查询的结果。进程退出或查询超时后，下次查询时重新拉起。
+    """
+
+    _SENTINEL = "__SERVER_STATUS_EOQ__"
+
+    def __init__(self) -> None:
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._lines = queue.Queue()
+            self._proc = subprocess.Popen(
+                ["powershell", "-NoProfile", "-NoLogo", "-NonInteractive", "-Command", "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+            threading.Thread(
+                target=self._pump, args=(self._proc.stdout, self._lines), daemon=True
+            ).start()
+        return self._proc
+
+    @staticmethod
+    def _pump(stream, lines: "queue.Queue[Optional[str]]") -> None:
+        """后台线程：逐行转发 stdout，进程结束时放入 None。"""
+        for line in stream:
+            lines.put(line.rstrip("\r\n"))
+        lines.put(None)
+
+    def close(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()
+        self._proc = None
+
+    def query(self, script: str, timeout: float) -> str:
+        """执行脚本并返回去除首尾空白的输出。
+
+        Raises:
+            TimeoutError: 超时未返回结果（进程会被结束）
+            OSError: 进程无法启动或已退出
+        """
+        encoded = base64.b64encode(script.encode("utf-8")).decode("ascii")
+        command = (
+            "& ([scriptblock]::Create([Text.Encoding]::UTF8.GetString("
+            f"[Convert]::FromBase64String('{encoded}')))); "
+            f"Write-Output '{self._SENTINEL}'\n"
+        )
+        with self._lock:
+            proc = self._ensure_started()
+            try:
+                proc.stdin.write(command)
+                proc.stdin.flush()
+            except OSError:
+                self.close()
+                raise
+
+            deadline = time.monotonic() + timeout
+            output = []
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    self.close()
+                    raise TimeoutError("PowerShell 查询超时") from None
+                if line is None:
+                    self.close()
+                    raise OSError("PowerShell 进程已退出")
+                if line == self._SENTINEL:
+                    break
+                output.append(line)
+        return "\n".join(output).strip()
+
+
+_powershell = _PowerShellWorker()
+
+
+def _run_powershell(script: str, timeout: float) -> Optional[str]:
+    """通过常驻 PowerShell 执行脚本，常驻进程不可用时退回一次性调用。"""
+    try:
+        return _powershell.query(script, timeout)
+    except TimeoutError:
+        logger.debug("PowerShell 查询超时 (%ss)", timeout)
+        return None
+    except OSError as e:
+        logger.debug("常驻 PowerShell 不可用，改用一次性调用: %s", e)
+
+    result = subprocess.run(
+        ["powershell", "-Command", script],
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+# 非阻塞模式返回距上次调用以来的平均占用率，导入时先调用一次作为基准
+psutil.cpu_percent(interval=None)
+_last_cpu_usage = 0.0
+
 
 def _get_cpu_usage() -> float:
-    """返回 CPU 占用率百分比。"""
-    # interval=1 可获得 1 秒平均负载，更平滑
-    return psutil.cpu_percent(interval=1)
+    """返回 CPU 占用率百分比（两次采集间隔内的平均值，不阻塞采集线程）。"""
+    global _last_cpu_usage
+    _last_cpu_usage = psutil.cpu_percent(interval=None)
+    return _last_cpu_usage
 
 
 def _get_cpu_temperature_windows() -> Optional[float]:
@@ -54,16 +179,11 @@ def _get_cpu_temperature_windows() -> Optional[float]:
         }
         '''
 
-        result = subprocess.run(
-            ["powershell", "-Command", cmd],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        output = _run_powershell(cmd, timeout=10)
 
-        if result.returncode == 0 and result.stdout.strip():
+        if output:
             try:
-                temp = float(result.stdout.strip())
+                temp = float(output)
                 if 0 < temp < 150:  # 合理的温度范围
                     return temp
             except ValueError:
@@ -83,16 +203,11 @@ def _get_cpu_temperature_windows() -> Optional[float]:
         } catch {}
         '''
 
-        result2 = subprocess.run(
-            ["powershell", "-Command", cmd2],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        output2 = _run_powershell(cmd2, timeout=5)
 
-        if result2.returncode == 0 and result2.stdout.strip():
+        if output2:
             try:
-                temp = float(result2.stdout.strip())
+                temp = float(output2)
                 if 0 < temp < 150:
                     logger.debug("通过LibreHardwareMonitor获取CPU温度: %.1f°C", temp)
                     return temp
@@ -113,16 +228,11 @@ def _get_cpu_temperature_windows() -> Optional[float]:
         } catch {}
         '''
 
-        result3 = subprocess.run(
-            ["powershell", "-Command", cmd3],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        output3 = _run_powershell(cmd3, timeout=5)
 
-        if result3.returncode == 0 and result3.stdout.strip():
+        if output3:
             try:
-                temp = float(result3.stdout.strip())
+                temp = float(output3)
                 if 0 < temp < 150:
                     logger.debug("通过OpenHardwareMonitor获取CPU温度: %.1f°C", temp)
                     return temp
@@ -138,9 +248,7 @@ def _get_cpu_temperature_windows() -> Optional[float]:
 
 def _get_cpu_temperature() -> Optional[float]:
     """返回 CPU 当前最高温度 (°C)。若无法获取返回 None。跨平台支持。"""
-    system = platform.system().lower()
-
-    if system == "windows":
+    if _IS_WINDOWS:
         # Windows: 使用WMI查询
         return _get_cpu_temperature_windows()
 
@@ -174,16 +282,11 @@ def _get_cpu_power_windows() -> Optional[float]:
         } catch {}
         '''
 
-        result = subprocess.run(
-            ["powershell", "-Command", cmd],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        output = _run_powershell(cmd, timeout=10)
 
-        if result.returncode == 0 and result.stdout.strip():
+        if output:
             try:
-                performance = float(result.stdout.strip())
+                performance = float(output)
                 if 0 < performance < 1000:
                     # 将性能百分比转换为功耗估算
                     # 假设100%性能对应约100W功耗
@@ -224,16 +327,11 @@ def _get_cpu_power_windows() -> Optional[float]:
         }
         '''
 
-        result2 = subprocess.run(
-            ["powershell", "-Command", cmd2],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        output2 = _run_powershell(cmd2, timeout=10)
 
-        if result2.returncode == 0 and result2.stdout.strip():
+        if output2:
             try:
-                power = float(result2.stdout.strip())
+                power = float(output2)
                 if 0 < power < 1000:
                     logger.debug("通过硬件监控软件获取CPU功耗: %.1fW", power)
                     return power
@@ -245,7 +343,8 @@ def _get_cpu_power_windows() -> Optional[float]:
 
     # 方法3: 基于CPU使用率的粗略功耗估算
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # 复用本轮采集的占用率，再次调用 cpu_percent 会重置统计区间
+        cpu_percent = _last_cpu_usage
         if cpu_percent >= 0:
             # 基于CPU使用率的粗略功耗估算
             # 现代CPU: 空载约15-25W，满载约65-125W
@@ -262,14 +361,11 @@ def _get_cpu_power_windows() -> Optional[float]:
 
 def _get_cpu_power() -> Optional[float]:
     """尝试获取 CPU 当前功耗 (W)。跨平台支持。"""
-    system = platform.system().lower()
-
-    if system == "linux":
+    if _IS_LINUX:
         # Linux: 使用 sensors 命令
         try:
             output = subprocess.check_output(["sensors", "-u"], text=True)
-            # 示例: power1_input: 34.56
-            match = re.search(r"power1_input:\s+([\d.]+)", output)
+            match = _POWER_RE.search(output)
             if match:
                 try:
                     return float(match.group(1))
@@ -278,11 +374,11 @@ def _get_cpu_power() -> Optional[float]:
         except (FileNotFoundError, subprocess.CalledProcessError):
             logger.debug("sensors 命令不可用，无法读取 CPU 功耗")
 
-    elif system == "windows":
+    elif _IS_WINDOWS:
         # Windows: 使用性能计数器或WMI
         return _get_cpu_power_windows()
 
-    elif system == "darwin":  # macOS
+    elif _IS_DARWIN:  # macOS
         # macOS: 暂时不支持，返回 None
         logger.debug("macOS 平台暂不支持 CPU 功耗监控")
 
@@ -290,90 +386,47 @@ def _get_cpu_power() -> Optional[float]:
 
 
 def _get_cpu_name_windows() -> Optional[str]:
-    """Windows下获取CPU友好名称"""
-    try:
-        # 方法1: 使用WMI查询Win32_Processor获取CPU名称
-        cmd = '''
-        $cpu = Get-WmiObject -Class "Win32_Processor" -ErrorAction SilentlyContinue | Select-Object -First 1
-        if ($cpu) {
-            $cpu.Name.Trim()
-        }
-        '''
-
-        result = subprocess.run(
-            ["powershell", "-Command", cmd],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        if result.returncode == 0 and result.stdout.strip():
-            cpu_name = result.stdout.strip()
-            if cpu_name and cpu_name != "":
-                logger.debug("通过WMI获取CPU名称: %s", cpu_name)
-                return cpu_name
-
-        # 方法2: 使用CIM查询（较新的方法）
-        cmd2 = '''
-        try {
-            $cpu = Get-CimInstance -ClassName "Win32_Processor" -ErrorAction SilentlyContinue | Select-Object -First 1
-            if ($cpu) {
-                $cpu.Name.Trim()
-            }
-        } catch {}
-        '''
-
-        result2 = subprocess.run(
-            ["powershell", "-Command", cmd2],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        if result2.returncode == 0 and result2.stdout.strip():
-            cpu_name = result2.stdout.strip()
-            if cpu_name and cpu_name != "":
-                logger.debug("通过CIM获取CPU名称: %s", cpu_name)
-                return cpu_name
-
-        # 方法3: 使用WMIC命令
-        try:
-            result3 = subprocess.run(
-                ["wmic", "cpu", "get", "Name", "/format:value"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result3.returncode == 0:
-                for line in result3.stdout.split('\n'):
-                    if line.startswith('Name='):
-                        cpu_name = line.split('=', 1)[1].strip()
-                        if cpu_name and cpu_name != "":
-                            logger.debug("通过WMIC获取CPU名称: %s", cpu_name)
-                            return cpu_name
+    """Windows下获取CPU友好名称
 
-        except Exception as e:
-            logger.debug("WMIC CPU名称查询失败: %s", e)
+    直接读取注册表中的 ProcessorNameString，与 WMI Win32_Processor.Name 同源，
+    进程内调用即可完成，无需启动 PowerShell/WMIC。
+    """
+    try:
+        import winreg
 
+        with winreg.OpenKey(
+            winreg.HKEY_LOCAL_MACHINE,
+            r"HARDWARE\DESCRIPTION\System\CentralProcessor\0",
+        ) as key:
+            cpu_name = winreg.QueryValueEx(key, "ProcessorNameString")[0].strip()
+        if cpu_name:
+            logger.debug("通过注册表获取CPU名称: %s", cpu_name)
+            return cpu_name
     except Exception as e:
         logger.debug("Windows CPU名称获取失败: %s", e)
 
     return None
 
 
-def _get_cpu_info() -> Dict[str, Any]:
-    """获取CPU基本信息。跨平台支持。"""
+def _get_cpu_freq_mhz() -> Optional[float]:
+    """返回 CPU 当前频率 (MHz)，无法获取时返回 None。"""
+    freq = psutil.cpu_freq()
+    return freq.current if freq else None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cpu_static_info() -> Dict[str, Any]:
+    """获取进程生命周期内不变的 CPU 信息（型号、核心数、线程数）。跨平台支持。
+
+    结果只计算一次，不会在每次采集时重复执行。
+    """
     cpu_info = {
         "name": "Unknown",
         "cores": psutil.cpu_count(logical=False),
         "threads": psutil.cpu_count(logical=True),
-        "frequency_mhz": psutil.cpu_freq().current if psutil.cpu_freq() else None
     }
 
-    system = platform.system().lower()
-
-    if system == "linux":
+    if _IS_LINUX:
         # Linux: 从 /proc/cpuinfo 获取CPU型号
         try:
             with open("/proc/cpuinfo", "r") as f:
@@ -384,8 +437,8 @@ def _get_cpu_info() -> Dict[str, Any]:
         except Exception:
             pass
 
-    elif system == "windows":
-        # Windows: 使用WMI获取更友好的CPU名称
+    elif _IS_WINDOWS:
+        # Windows: 从注册表获取更友好的CPU名称
         cpu_name = _get_cpu_name_windows()
         if cpu_name:
             cpu_info["name"] = cpu_name
@@ -396,7 +449,7 @@ def _get_cpu_info() -> Dict[str, Any]:
             except Exception:
                 pass
 
-    elif system == "darwin":  # macOS
+    elif _IS_DARWIN:  # macOS
         # macOS: 使用 sysctl 命令
         try:
             output = subprocess.check_output(["sysctl", "-n", "machdep.cpu.brand_string"], text=True)
@@ -406,6 +459,7 @@ def _get_cpu_info() -> Dict[str, Any]:
 
     return cpu_info
 
+
 def collect() -> Dict[str, Any]:
     """收集 CPU 指标。"""
     metrics = {
@@ -413,5 +467,6 @@ def collect() -> Dict[str, Any]:
         "temperature_c": _get_cpu_temperature(),
         "power_w": _get_cpu_power(),
     }
-    metrics.update(_get_cpu_info())
+    metrics.update(_get_cpu_static_info())
+    metrics["frequency_mhz"] = _get_cpu_freq_mhz()
     return metrics 
\ No newline at end of file
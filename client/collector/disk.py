@@ -2,17 +2,41 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
 import platform
-import re
 import subprocess
+import time
 from typing import Any, Dict, List, Optional
 
 import psutil
 
 logger = logging.getLogger(__name__)
 
+# 运行平台在进程生命周期内不会变化，导入时确定一次
+_SYSTEM = platform.system().lower()
+_IS_WINDOWS = _SYSTEM == "windows"
+_IS_LINUX = _SYSTEM == "linux"
+_IS_DARWIN = _SYSTEM == "darwin"
+
+# 分区过滤规则，导入时构建一次；str.startswith 可直接接受前缀元组
+_WINDOWS_FLOPPY_DRIVES = frozenset({'A', 'B'})
+_LINUX_SPECIAL_FS = frozenset({
+    'tmpfs', 'devtmpfs', 'sysfs', 'proc', 'devpts', 'cgroup', 'pstore', 'squashfs',
+})
+_LINUX_SPECIAL_MOUNTS = ('/dev', '/proc', '/sys', '/run', '/boot/efi', '/snap', '/var/snap')
+# 允许监控的挂载点：根、/home、/var、/usr、/opt、/tmp（独立分区时）、/boot（不含/boot/efi）
+_LINUX_ALLOWED_MOUNTS = frozenset({'/', '/home', '/var', '/usr', '/opt', '/tmp', '/boot'})
+_LINUX_ALLOWED_PREFIXES = tuple(mount + '/' for mount in _LINUX_ALLOWED_MOUNTS)
+_LINUX_USER_MOUNT_PREFIXES = ('/mnt/', '/media/')
+_DARWIN_SPECIAL_FS = frozenset({'devfs', 'autofs', 'mtmfs'})
+
+# 分区布局很少变化，过滤后的分区列表缓存一段时间，每次采集只需 statvfs
+_PARTITIONS_TTL = 60
+_cached_partitions: Optional[list] = None
+_cached_partitions_ts = 0.0
+
 
 def _get_disk_model_windows(drive_letter: str) -> Optional[str]:
     """Windows下获取磁盘型号"""
@@ -96,29 +120,72 @@ def _get_disk_model_macos(dev_path: str) -> Optional[str]:
     return None
 
 
+def _strip_partition_suffix(name: str) -> str:
+    """去掉分区编号，得到物理盘名称。
+
+    - 普通盘分区，如 sda1 → sda
+    - NVMe/MMC 分区，如 nvme0n1p1 → nvme0n1、mmcblk0p1 → mmcblk0
+    """
+    base = name.rstrip("0123456789")
+    # 只有 "数字+p+数字" 形式的 p 才是分区分隔符，避免误删 sdp1 中的 p
+    if base.endswith("p") and base[-2:-1].isdigit():
+        return base[:-1]
+    return base
+
+
+def _read_sysfs_model(*names: str) -> Optional[str]:
+    """从 sysfs 读取块设备型号，依次尝试给定的设备名。
+
+    /sys/block/<disk>/device/model 适用于整盘；分区在 /sys/class/block/<part>
+    下是指向所属磁盘子目录的符号链接，其上一级即为整盘目录。
+    """
+    for name in names:
+        for path in (
+            f"/sys/block/{name}/device/model",
+            f"/sys/class/block/{name}/../device/model",
+        ):
+            try:
+                with open(path, "r") as f:
+                    content = f.read().strip()
+            except OSError:
+                continue
+            if content:
+                return content
+    return None
+
+
+@functools.lru_cache(maxsize=64)
 def _get_disk_model(dev_path: str) -> Optional[str]:
     """获取物理磁盘型号。跨平台支持。
 
     逻辑：
-    - Linux: 使用 lsblk 和 sysfs
+    - Linux: 优先读取 sysfs，失败时回退到 lsblk
     - Windows: 使用 WMI
     - macOS: 使用 diskutil
-    """
-    system = platform.system().lower()
 
-    if system == "windows":
+    磁盘型号不会变化，结果按设备路径缓存（包括 None），每个设备只查询一次。
+    """
+    if _IS_WINDOWS:
         # Windows: 从设备路径提取驱动器字母
         if len(dev_path) >= 2 and dev_path[1] == ':':
             drive_letter = dev_path[:2] + '\\'
             return _get_disk_model_windows(drive_letter)
         return None
 
-    elif system == "darwin":  # macOS
+    elif _IS_DARWIN:  # macOS
         return _get_disk_model_macos(dev_path)
 
-    elif system != "linux":
+    elif not _IS_LINUX:
         # 其他系统暂不支持
         return None
+
+    # 优先直接读取 sysfs，只是一次文件读取，无需 fork lsblk
+    name = os.path.basename(dev_path)
+    base = _strip_partition_suffix(name)
+    model = _read_sysfs_model(base, name)
+    if model:
+        return model
+
     try:
         output = subprocess.check_output(
             ["lsblk", "-dn", "-o", "MODEL", dev_path],
@@ -129,16 +196,9 @@ def _get_disk_model(dev_path: str) -> Optional[str]:
             return output
     except FileNotFoundError:
         pass  # lsblk 不存在
-    except Exception:
-        pass
     except Exception:  # pylint: disable=broad-except
         pass
 
-    base = os.path.basename(dev_path)
-    # 处理 NVMe 分区，如 nvme0n1p1 → nvme0n1
-    base = re.sub(r"p\d+$", "", base)
-    # 处理普通盘分区，如 sda1 → sda
-    base = re.sub(r"\d+$", "", base)
     physical_dev = os.path.join("/dev", base)
 
     try:
@@ -165,23 +225,7 @@ def _get_disk_model(dev_path: str) -> Optional[str]:
             if out_parent:
                 return out_parent
             # 再查 sysfs
-            sys_model_parent = f"/sys/block/{parent}/device/model"
-            if os.path.exists(sys_model_parent):
-                with open(sys_model_parent, "r") as f:
-                    c = f.read().strip()
-                    if c:
-                        return c
-    except Exception:
-        pass
-
-    # sysfs fallback
-    sys_model_path = f"/sys/block/{base}/device/model"
-    try:
-        if os.path.exists(sys_model_path):
-            with open(sys_model_path, "r") as f:
-                content = f.read().strip()
-                if content:
-                    return content
+            return _read_sysfs_model(parent)
     except Exception:
         pass
 
@@ -190,77 +234,51 @@ def _get_disk_model(dev_path: str) -> Optional[str]:
 
 def _should_monitor_partition(part) -> bool:
     """判断是否应该监控该分区"""
-    system = platform.system().lower()
+    return _should_monitor(part.device, part.mountpoint, part.fstype)
+
 
+@functools.lru_cache(maxsize=128)
+def _should_monitor(device: str, mountpoint: str, fstype: str) -> bool:
+    """按 (设备, 挂载点, 文件系统) 判断是否监控，结果只取决于参数，可直接缓存"""
     # 过滤掉空文件系统
-    if not part.fstype or part.fstype == "":
+    if not fstype or fstype == "":
         return False
 
-    if system == "windows":
+    if _IS_WINDOWS:
         # Windows: 只监控主要驱动器 (C:\, D:\, 等)
-        if len(part.mountpoint) == 3 and part.mountpoint.endswith(":\\"):
+        if len(mountpoint) == 3 and mountpoint.endswith(":\\"):
             # 排除一些特殊驱动器
-            drive_letter = part.mountpoint[0].upper()
-            if drive_letter in ['A', 'B']:  # 软盘驱动器
+            drive_letter = mountpoint[0].upper()
+            if drive_letter in _WINDOWS_FLOPPY_DRIVES:  # 软盘驱动器
                 return False
             return True
         return False
 
-    elif system == "linux":
-        # Linux: 排除特殊文件系统
-        special_fs = ['tmpfs', 'devtmpfs', 'sysfs', 'proc', 'devpts', 'cgroup', 'pstore', 'squashfs']
-        if part.fstype in special_fs:
+    elif _IS_LINUX:
+        # Linux: 排除特殊文件系统和特殊挂载点
+        if fstype in _LINUX_SPECIAL_FS:
             return False
-
-        # 排除特殊挂载点
-        special_mounts = ['/dev', '/proc', '/sys', '/run', '/boot/efi', '/snap', '/var/snap']
-        if any(part.mountpoint.startswith(mount) for mount in special_mounts):
+        if mountpoint.startswith(_LINUX_SPECIAL_MOUNTS):
             return False
 
         # 排除snap包挂载点（更精确的匹配）
-        if '/snap/' in part.mountpoint:
+        if '/snap/' in mountpoint:
             return False
 
         # 排除loop设备（通常是snap包）
-        if part.device.startswith('/dev/loop'):
+        if device.startswith('/dev/loop'):
             return False
 
-        # 只监控主要的物理分区（通常挂载在根目录或有意义的挂载点）
-        # 允许的挂载点模式
-        allowed_patterns = [
-            '/',           # 根分区
-            '/home',       # 家目录分区
-            '/var',        # var分区
-            '/usr',        # usr分区
-            '/opt',        # opt分区
-            '/tmp',        # tmp分区（如果是独立分区）
-            '/boot',       # boot分区（但不是/boot/efi）
-        ]
-
-        # 检查是否是允许的挂载点或其子目录
-        is_allowed = False
-        for pattern in allowed_patterns:
-            if part.mountpoint == pattern or part.mountpoint.startswith(pattern + '/'):
-                # 但要排除snap相关的子目录
-                if '/snap' not in part.mountpoint:
-                    is_allowed = True
-                    break
-
-        # 如果不在允许列表中，检查是否是用户自定义的挂载点
-        # 通常用户挂载点会在/mnt或/media下
-        if not is_allowed:
-            user_mount_patterns = ['/mnt/', '/media/']
-            for pattern in user_mount_patterns:
-                if part.mountpoint.startswith(pattern):
-                    is_allowed = True
-                    break
-
-        return is_allowed
-
-    elif system == "darwin":  # macOS
+        # 只监控主要的物理分区：允许的挂载点或其子目录（排除snap相关的子目录），
+        # 以及通常位于/mnt或/media下的用户自定义挂载点
+        if mountpoint in _LINUX_ALLOWED_MOUNTS or mountpoint.startswith(_LINUX_ALLOWED_PREFIXES):
+            if '/snap' not in mountpoint:
+                return True
+        return mountpoint.startswith(_LINUX_USER_MOUNT_PREFIXES)
+
+    elif _IS_DARWIN:  # macOS
         # macOS: 排除特殊文件系统
-        special_fs = ['devfs', 'autofs', 'mtmfs']
-        if part.fstype in special_fs:
+        if fstype in _DARWIN_SPECIAL_FS:
             return False
 
         return True
@@ -268,22 +286,43 @@ def _should_monitor_partition(part) -> bool:
     return True
 
 
+def _get_monitored_partitions() -> list:
+    """返回需要监控的分区列表，缓存 _PARTITIONS_TTL 秒后重新枚举"""
+    global _cached_partitions, _cached_partitions_ts
+
+    now = time.monotonic()
+    if _cached_partitions is not None and now - _cached_partitions_ts < _PARTITIONS_TTL:
+        return _cached_partitions
+
+    partitions = psutil.disk_partitions(all=False)
+    logger.info("磁盘采集: 发现%d个分区", len(partitions))
+
+    monitored = []
+    for part in partitions:
+        logger.debug("检查分区: %s (%s, %s)", part.mountpoint, part.device, part.fstype)
+        # 判断是否应该监控该分区
+        should_monitor = _should_monitor_partition(part)
+        logger.debug("分区 %s 监控决定: %s", part.mountpoint, should_monitor)
+        if should_monitor:
+            monitored.append(part)
+
+    _cached_partitions = monitored
+    _cached_partitions_ts = now
+    return monitored
+
+
+def _invalidate_partitions() -> None:
+    """使分区列表缓存失效，下次采集时重新枚举"""
+    global _cached_partitions
+    _cached_partitions = None
+
+
 def collect() -> List[Dict[str, Any]]:
     """返回所有物理分区的使用情况，并附带硬盘型号。跨平台支持。"""
     disks: List[Dict[str, Any]] = []
 
     try:
-        partitions = psutil.disk_partitions(all=False)
-        logger.info("磁盘采集: 发现%d个分区", len(partitions))
-
-        for part in partitions:
-            logger.debug("检查分区: %s (%s, %s)", part.mountpoint, part.device, part.fstype)
-            # 判断是否应该监控该分区
-            should_monitor = _should_monitor_partition(part)
-            logger.debug("分区 %s 监控决定: %s", part.mountpoint, should_monitor)
-            if not should_monitor:
-                continue
-
+        for part in _get_monitored_partitions():
             try:
                 usage = psutil.disk_usage(part.mountpoint)
                 model = _get_disk_model(part.device)
@@ -302,8 +341,9 @@ def collect() -> List[Dict[str, Any]]:
                 logger.debug("添加磁盘: %s (%.1f%% 使用)", part.mountpoint, usage.percent)
 
             except (PermissionError, FileNotFoundError, OSError) as e:
-                # 某些分区可能无法访问，跳过
+                # 某些分区可能无法访问（或已被卸载），跳过，并在下次采集时重新枚举分区
                 logger.debug("无法访问分区 %s: %s", part.mountpoint, e)
+                _invalidate_partitions()
                 continue
 
     except Exception as e:
@@ -1,85 +1,136 @@
 """采集 GPU 相关指标。支持 NVIDIA 和 AMD 显卡。"""
 
+import atexit
+import functools
 import logging
 import os
-import glob
 import platform
 import re
 import subprocess
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 import json
 import shutil
 
 import pynvml
 
+try:  # ROCm SMI 的 Python 绑定（可选），可在进程内读取 AMD GPU 指标
+    from pyrsmi import rocml
+except ImportError:  # pragma: no cover - 可选依赖
+    rocml = None
+
 from ..config import get_monitor_config
 
 logger = logging.getLogger(__name__)
 
+# 运行平台在进程生命周期内不会变化，导入时确定一次
+_IS_LINUX = platform.system().lower() == "linux"
+
+# pp_dpm_sclk 中当前频率档位，格式类似：0: 300MHz 1: 2000MHz *
+_RE_AMD_SCLK_CURRENT = re.compile(r"(\d+)MHz \*")
+# rocm-smi 输出值中的数值
+_RE_ROCM_DIGITS = re.compile(r"(\d+)")
+# rocm-smi JSON 输出字段 -> gpu_data 字段（新版显存占用字段名为 VRAM%）
+_ROCM_SMI_FIELDS = (
+    ("GPU use (%)", "util_percent"),
+    ("GPU memory use (%)", "memory_util_percent"),
+    ("GPU Memory Allocated (VRAM%)", "memory_util_percent"),
+)
+
+# 常驻线程池，供 NVIDIA 与 AMD 采集并行执行，避免每次采集都创建线程
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gpu-collector")
+
 NVML_INITIALIZED = False
 
+# NVIDIA 设备句柄与名称在进程生命周期内不变，初始化后获取一次：(索引, 句柄, 名称)
+_NVML_HANDLES: List[Tuple[int, Any, str]] = []
+
+
+def _load_nvml_handles() -> List[Tuple[int, Any, str]]:
+    """枚举所有 NVIDIA 设备，返回 (索引, 句柄, 名称) 列表。"""
+    handles = []
+    for i in range(pynvml.nvmlDeviceGetCount()):
+        handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+        # 获取设备名称
+        try:
+            raw_name = pynvml.nvmlDeviceGetName(handle)
+            if isinstance(raw_name, bytes):
+                name = raw_name.decode()
+            else:
+                name = raw_name
+        except Exception:  # pylint: disable=broad-except
+            name = f"NVIDIA-GPU-{i}"
+        handles.append((i, handle, name))
+    return handles
+
+
 try:
     pynvml.nvmlInit()
     NVML_INITIALIZED = True
+    atexit.register(pynvml.nvmlShutdown)
+    _NVML_HANDLES = _load_nvml_handles()
 except Exception as e:  # pylint: disable=broad-except
-    logger.warning("NVML 初始化失败，NVIDIA GPU 监控不可用: %s", e)
+    if NVML_INITIALIZED:
+        logger.error("枚举 NVIDIA GPU 设备失败: %s", e)
+    else:
+        logger.warning("NVML 初始化失败，NVIDIA GPU 监控不可用: %s", e)
+
+ROCML_INITIALIZED = False
+
+if rocml is not None and _IS_LINUX:
+    try:
+        rocml.smi_initialize()
+        ROCML_INITIALIZED = True
+        atexit.register(rocml.smi_shutdown)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning("ROCm SMI 初始化失败，AMD GPU 改用 radeontop/rocm-smi 采集: %s", e)
+
 
+def _nvml_query(func, *args):
+    """执行一次 NVML 查询，设备不支持该项或查询失败时返回 None。
+
+    只捕获 NVMLError，代码错误不会被吞掉。
+    """
+    try:
+        return func(*args)
+    except pynvml.NVMLError:
+        return None
+
+
+def _collect_nvidia(collect_temp: bool, collect_power: bool) -> List[Dict[str, Any]]:
+    """采集 NVIDIA GPU 指标。collect_temp/collect_power 决定是否输出温度、功耗。"""
+    # 循环前绑定到局部变量，避免每块显卡每次都查找模块属性
+    query = _nvml_query
+    get_util = pynvml.nvmlDeviceGetUtilizationRates
+    get_mem = pynvml.nvmlDeviceGetMemoryInfo
+    get_clock = pynvml.nvmlDeviceGetClockInfo
+    get_temp = pynvml.nvmlDeviceGetTemperature
+    get_power = pynvml.nvmlDeviceGetPowerUsage
+    clock_graphics = pynvml.NVML_CLOCK_GRAPHICS
+    temp_gpu = pynvml.NVML_TEMPERATURE_GPU
 
-def _collect_nvidia() -> List[Dict[str, Any]]:
-    """采集 NVIDIA GPU 指标。"""
     result = []
     try:
-        device_count = pynvml.nvmlDeviceGetCount()
-        for i in range(device_count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-            
-            # 获取设备名称
-            try:
-                raw_name = pynvml.nvmlDeviceGetName(handle)
-                if isinstance(raw_name, bytes):
-                    name = raw_name.decode()
-                else:
-                    name = raw_name
-            except Exception:  # pylint: disable=broad-except
-                name = f"NVIDIA-GPU-{i}"
-            
+        for i, handle, name in _NVML_HANDLES:
             # 获取利用率
-            try:
-                util = pynvml.nvmlDeviceGetUtilizationRates(handle)
-                util_percent = util.gpu
-            except Exception:  # pylint: disable=broad-except
-                util_percent = 0
+            util = query(get_util, handle)
+            util_percent = util.gpu if util is not None else 0
             
             # 获取内存信息
-            try:
-                mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+            mem = query(get_mem, handle)
+            if mem is not None and mem.total:
                 memory_total = mem.total
                 memory_used = mem.used
                 memory_util_percent = memory_used / memory_total * 100
-            except Exception:  # pylint: disable=broad-except
+            else:
                 memory_total = 0
                 memory_used = 0
                 memory_util_percent = 0
             
-            # 获取温度
-            try:
-                temperature = pynvml.nvmlDeviceGetTemperature(
-                    handle, pynvml.NVML_TEMPERATURE_GPU
-                )
-            except Exception:  # pylint: disable=broad-except
-                temperature = None
-            
-            # 获取功耗
-            try:
-                power = pynvml.nvmlDeviceGetPowerUsage(handle) / 1000.0
-            except Exception:  # pylint: disable=broad-except
-                power = None
-                
             # 获取频率
-            try:
-                freq = pynvml.nvmlDeviceGetClockInfo(handle, pynvml.NVML_CLOCK_GRAPHICS)
-            except Exception:  # pylint: disable=broad-except
-                freq = None
+            freq = query(get_clock, handle, clock_graphics)
             
             gpu_data = {
                 "vendor": "nvidia",
@@ -92,11 +143,14 @@ def _collect_nvidia() -> List[Dict[str, Any]]:
                 "frequency_mhz": freq
             }
             
-            if get_monitor_config("gpu", "collect_temp"):
-                gpu_data["temperature_c"] = temperature
+            # 获取温度（未启用时不调用 NVML）
+            if collect_temp:
+                gpu_data["temperature_c"] = query(get_temp, handle, temp_gpu)
                 
-            if get_monitor_config("gpu", "collect_power"):
-                gpu_data["power_w"] = power
+            # 获取功耗（未启用时不调用 NVML）
+            if collect_power:
+                power = query(get_power, handle)
+                gpu_data["power_w"] = power / 1000.0 if power is not None else None
             
             result.append(gpu_data)
             
@@ -106,43 +160,98 @@ def _collect_nvidia() -> List[Dict[str, Any]]:
     return result
 
 
+@functools.lru_cache(maxsize=1)
 def _get_amd_card_paths() -> List[str]:
-    """获取所有 AMD 显卡的 sysfs 路径。"""
+    """获取所有 AMD 显卡的 sysfs 路径。显卡在运行期间不会增减，只扫描一次。"""
     try:
-        base = "/sys/class/drm"
         cards = []
-        for entry in os.listdir(base):
-            if entry.startswith("card") and not entry.endswith("card"):  # 排除 renderD* 等
-                card_path = os.path.join(base, entry)
-                # 检查是否是 AMD 显卡
-                vendor_path = os.path.join(card_path, "device/vendor")
-                if os.path.exists(vendor_path):
-                    with open(vendor_path, "r") as f:
-                        vendor = f.read().strip()
-                        if vendor == "0x1002":  # AMD vendor ID
-                            cards.append(card_path)
+        with os.scandir("/sys/class/drm") as entries:
+            for entry in entries:
+                # 只保留 cardN，排除 renderD* 以及 card0-DP-1 等显示接口
+                if not (entry.name.startswith("card") and entry.name[4:].isdigit()):
+                    continue
+                # 检查是否是 AMD 显卡，直接比较原始字节，无需解码
+                try:
+                    fd = os.open(os.path.join(entry.path, "device/vendor"), os.O_RDONLY)
+                except OSError:
+                    continue
+                try:
+                    vendor = os.read(fd, 16).strip()
+                finally:
+                    os.close(fd)
+                if vendor == b"0x1002":  # AMD vendor ID
+                    cards.append(entry.path)
+        # scandir 不保证顺序，按卡号排序使 GPU 索引稳定
+        cards.sort(key=lambda path: int(path.rsplit("card", 1)[1]))
         return cards
     except Exception as e:  # pylint: disable=broad-except
         logger.error("查找 AMD 显卡失败: %s", e)
         return []
 
 
-def _read_amd_sysfs(card_path: str, sub_path: str) -> Optional[str]:
-    """从 AMD GPU sysfs 读取指标。"""
+# 每块 AMD 显卡需要读取的 sysfs 文件（相对显卡路径）
+_AMD_SYSFS_FILES = {
+    "name": "device/product_name",
+    "sclk": "device/pp_dpm_sclk",
+    "vram_total": "device/mem_info_vram_total",
+    "vram_used": "device/mem_info_vram_used",
+}
+# 位于 device/hwmon/hwmon*/ 下的文件，hwmon 编号在启动时确定
+_AMD_HWMON_FILES = {
+    "temp": "temp1_input",
+    "power": "power1_average",
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _resolve_amd_sysfs(card_path: str) -> Dict[str, str]:
+    """解析显卡各项指标对应的 sysfs 文件路径，只解析一次。
+
+    hwmon* 通配符在此展开为具体目录，之后每次采集直接读取文件，
+    不再重复 glob 和 isfile 检查。不存在的文件不会出现在结果中。
+    """
+    paths = {}
+    for key, sub_path in _AMD_SYSFS_FILES.items():
+        full_path = os.path.join(card_path, sub_path)
+        if os.path.isfile(full_path):
+            paths[key] = full_path
+
     try:
-        pattern = os.path.join(card_path, sub_path)
-        # 支持通配符 *，只读取第一个匹配文件
-        for full_path in glob.glob(pattern):
+        with os.scandir(os.path.join(card_path, "device/hwmon")) as entries:
+            hwmon_dirs = [entry.path for entry in entries if entry.name.startswith("hwmon")]
+    except OSError:
+        hwmon_dirs = []
+    for key, file_name in _AMD_HWMON_FILES.items():
+        # 与 glob 行为一致：取第一个包含该文件的 hwmon 目录
+        for hwmon_dir in hwmon_dirs:
+            full_path = os.path.join(hwmon_dir, file_name)
             if os.path.isfile(full_path):
-                with open(full_path, "r") as f:
-                    return f.read().strip()
-    except Exception:  # pylint: disable=broad-except
-        pass
-    return None
+                paths[key] = full_path
+                break
+    return paths
 
 
-def _read_radeontop(gpu_idx: int) -> Optional[Dict[str, Any]]:
-    """使用 radeontop 采集单块 AMD GPU 指标，需 root 或 udev 权限。
+def _read_amd_sysfs(paths: Dict[str, str], key: str) -> Optional[str]:
+    """从 AMD GPU sysfs 读取指标。
+
+    sysfs 文件都很小，直接用 os.open/os.read 读取，省去文件对象和解码器的开销。
+    """
+    path = paths.get(key)
+    if path is None:
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            data = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+        return data.decode("utf-8", "replace").strip()
+    except OSError:
+        return None
+
+
+def _parse_radeontop_line(line: str) -> Optional[Dict[str, Any]]:
+    """解析 radeontop 的一行输出，无法解析时返回 None。
 
 返回示例 dict：
 {
@@ -152,107 +261,257 @@ def _read_radeontop(gpu_idx: int) -> Optional[Dict[str, Any]]:
   "mclk": 1500.0       # 显存频率 MHz
 }
 """
-    if not shutil.which("radeontop"):
+    line = line.strip()
+    if not line:
         return None
-    try:
-        def _run(cmd_list):
-            return subprocess.check_output(cmd_list, text=True, stderr=subprocess.STDOUT)
+    # 先用首字符/分隔符做廉价判断，避免对文本行调用 json.loads 抛异常
+    # 1) JSON
+    if line[0] == '{':
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            pass
+    # 2) 解析两种文本格式
+    # 2.a  key=value%
+    if '=' in line:
+        kvs = {}
+        for seg in line.split(';'):
+            if '=' in seg:
+                key, val = seg.split('=', 1)
+                key = key.strip()
+                val = val.strip().rstrip('%')
+                try:
+                    kvs[key] = float(val)
+                except ValueError:
+                    continue
+        if kvs:
+            return kvs
+    # 2.b  radeontop 默认文本: "gpu 12.00%, vram 3.00% 123mb, sclk 20.00% 1.50ghz"
+    kvs2 = {}
+    for seg in line.split(','):
+        seg = seg.strip()
+        if not seg:
+            continue
+        parts = seg.split()
+        if len(parts) >= 2 and parts[1].endswith('%'):
+            key = parts[0]
+            try:
+                kvs2[key] = float(parts[1].rstrip('%'))
+            except ValueError:
+                pass
+            # vram 行同时包含已用 MB
+            if key in ("vram", "mem") and len(parts) >= 3 and parts[2].lower().endswith("mb"):
+                try:
+                    mb_val = float(parts[2][:-2])
+                    kvs2[key + "_used_mb"] = mb_val
+                except ValueError:
+                    pass
+        # 频率行: sclk 16.67% 0.150ghz -> 提取 ghz value
+        if parts[0] in ("sclk", "mclk") and len(parts) >= 3 and parts[2].lower().endswith("ghz"):
+            try:
+                ghz_val = float(parts[2][:-3])  # 去掉 ghz
+                kvs2[parts[0] + "_ghz"] = ghz_val
+            except ValueError:
+                pass
+    if kvs2:
+        return kvs2
+    return None
+
 
+class _RadeontopStream:
+    """常驻 radeontop 进程，持续输出采样，后台线程保留最新一行的解析结果。
+
+    避免每次采集都重新启动 radeontop 并等待其初始化、采样。进程退出后，
+    下次读取时重新拉起；旧版 radeontop 不支持 -j 时自动改用普通文本输出。
+    进程未给出采样即退出（如缺少 root/udev 权限）时按指数退避，期间不再启动。
+    客户端退出时由 _close_radeontop_streams 统一结束所有进程。
+    """
+
+    # 新启动的进程等待首个采样的最长时间（radeontop 默认每秒输出一行）
+    _FIRST_SAMPLE_TIMEOUT = 1.5
+
+    # 启动失败后暂停启动的时间（秒），连续失败时逐次翻倍直到上限
+    _BACKOFF_MIN = 30.0
+    _BACKOFF_MAX = 600.0
+
+    def __init__(self, gpu_idx: int) -> None:
+        self._gpu_idx = gpu_idx
+        self._proc: Optional[subprocess.Popen] = None
+        self._use_json = True
+        self._latest: Optional[Dict[str, Any]] = None
+        self._ready = threading.Event()
+        # 启动失败后的退避：当前退避时长及在此之前（单调时钟）不再启动
+        self._backoff = 0.0
+        self._failed_until = float("-inf")
+
+    def _command(self) -> List[str]:
         # 优先尝试 JSON 输出（radeontop >=1.4 支持 -j）
-        base_cmd = ["radeontop", "-d", "-", "-l", "1"]
-        cmd_json = base_cmd + ["-j"]
+        cmd = ["radeontop", "-d", "-"]
+        if self._use_json:
+            cmd.append("-j")
         # 若指定 card 节点存在则附加 -p
-        card_path = f"/dev/dri/card{gpu_idx}"
+        card_path = f"/dev/dri/card{self._gpu_idx}"
         if os.path.exists(card_path):
-            cmd_json += ["-p", card_path]
-        try_json = True
-        try:
-            output = _run(cmd_json)
-        except subprocess.CalledProcessError as exc:
-            # 旧版不支持 -j，回退普通输出
-            output = exc.output or ""
-            if "无效的选项" in output or "invalid option" in output:
-                try_json = False
-            else:
-                raise
-        if not try_json:
-            cmd_plain = base_cmd
-            if os.path.exists(card_path):
-                cmd_plain += ["-p", card_path]
-            output = _run(cmd_plain)
-
-        for line in output.splitlines():
-            line = line.strip()
-            if not line:
+            cmd += ["-p", card_path]
+        return cmd
+
+    def _ensure_started(self) -> bool:
+        """确保进程在运行，返回是否为本次新启动。"""
+        if self._proc is not None:
+            returncode = self._proc.poll()
+            if returncode is None:
+                return False
+            logger.debug("GPU%d 的 radeontop 进程已退出 (返回码 %s)，重新启动",
+                         self._gpu_idx, returncode)
+        self._latest = None
+        self._ready = threading.Event()
+        self._proc = subprocess.Popen(
+            self._command(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        threading.Thread(
+            target=self._pump, args=(self._proc.stdout, self._ready), daemon=True
+        ).start()
+        return True
+
+    def _pump(self, stream, ready: threading.Event) -> None:
+        """后台线程：逐行解析输出并保存最新结果。"""
+        for line in stream:
+            if "无效的选项" in line or "invalid option" in line:
+                # 旧版不支持 -j，下次重启时回退普通输出
+                self._use_json = False
                 continue
-            # 1) 先尝试 JSON
-            try:
-                data = json.loads(line)
-                return data
-            except json.JSONDecodeError:
-                pass
-            # 2) 解析两种文本格式
-            kvs = {}
-            # 2.a  key=value%
-            for seg in line.split(';'):
-                if '=' in seg:
-                    key, val = seg.split('=', 1)
-                    key = key.strip()
-                    val = val.strip().rstrip('%')
-                    try:
-                        kvs[key] = float(val)
-                    except ValueError:
-                        continue
-            if kvs:
-                return kvs
-            # 2.b  radeontop 默认文本: "gpu 12.00%, vram 3.00% 123mb, sclk 20.00% 1.50ghz"
-            kvs2 = {}
-            for seg in line.split(','):
-                seg = seg.strip()
-                if not seg:
-                    continue
-                parts = seg.split()
-                if len(parts) >= 2 and parts[1].endswith('%'):
-                    key = parts[0]
-                    try:
-                        kvs2[key] = float(parts[1].rstrip('%'))
-                    except ValueError:
-                        pass
-                    # vram 行同时包含已用 MB
-                    if key in ("vram", "mem") and len(parts) >= 3 and parts[2].lower().endswith("mb"):
-                        try:
-                            mb_val = float(parts[2][:-2])
-                            kvs2[key + "_used_mb"] = mb_val
-                        except ValueError:
-                            pass
-                # 频率行: sclk 16.67% 0.150ghz -> 提取 ghz value
-                if parts[0] in ("sclk", "mclk") and len(parts) >= 3 and parts[2].lower().endswith("ghz"):
-                    try:
-                        ghz_val = float(parts[2][:-3])  # 去掉 ghz
-                        kvs2[parts[0] + "_ghz"] = ghz_val
-                    except ValueError:
-                        pass
-            if kvs2:
-                return kvs2
+            data = _parse_radeontop_line(line)
+            if data:
+                self._latest = data
+                ready.set()
+        stream.close()
+        ready.set()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """返回最近一次采样结果，尚无结果或处于启动失败的退避期时返回 None。"""
+        if time.monotonic() < self._failed_until:
+            return None
+        try:
+            for _ in range(2):
+                if not self._ensure_started():
+                    break
+                self._ready.wait(self._FIRST_SAMPLE_TIMEOUT)
+                if self._latest is not None:
+                    break
+                # 进程启动后立即退出（如旧版不支持 -j），等其结束后换参数重试一次
+                try:
+                    self._proc.wait(timeout=0.5)
+                except subprocess.TimeoutExpired:
+                    break
+        except OSError:
+            self._record_failure()
+            raise
+        if self._latest is not None:
+            self._backoff = 0.0
+        elif self._proc is not None and self._proc.poll() is not None:
+            self._record_failure()
+        return self._latest
+
+    def _record_failure(self) -> None:
+        """记录一次启动失败，退避期内 read 直接返回 None。"""
+        self._backoff = min(self._backoff * 2, self._BACKOFF_MAX) or self._BACKOFF_MIN
+        self._failed_until = time.monotonic() + self._backoff
+        logger.debug("GPU%d 的 radeontop 未输出采样即退出，%.0f 秒内不再启动",
+                     self._gpu_idx, self._backoff)
+
+    def close(self) -> None:
+        """结束 radeontop 进程，超时未退出时强制终止。"""
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+_radeontop_streams: Dict[int, _RadeontopStream] = {}
+
+
+def _close_radeontop_streams() -> None:
+    """退出时结束所有常驻的 radeontop 进程，避免遗留子进程。"""
+    for stream in _radeontop_streams.values():
+        try:
+            stream.close()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("结束 radeontop 进程失败: %s", exc)
+
+
+atexit.register(_close_radeontop_streams)
+
+
+def _read_radeontop(gpu_idx: int) -> Optional[Dict[str, Any]]:
+    """读取单块 AMD GPU 的 radeontop 采样，需 root 或 udev 权限。"""
+    if not shutil.which("radeontop"):
+        return None
+    try:
+        stream = _radeontop_streams.get(gpu_idx)
+        if stream is None:
+            stream = _radeontop_streams[gpu_idx] = _RadeontopStream(gpu_idx)
+        return stream.read()
     except Exception as exc:  # pylint: disable=broad-except
         logger.debug("调用 radeontop 失败: %s", exc)
     return None
 
 
-def _collect_amd() -> List[Dict[str, Any]]:
-    """采集 AMD GPU 指标。仅支持Linux。"""
-    system = platform.system().lower()
-    if system != "linux":
+def _read_rocml(gpu_idx: int, gpu_data: Dict[str, Any]) -> bool:
+    """通过 ROCm SMI 绑定读取利用率与显存，成功返回 True。"""
+    try:
+        gpu_data["util_percent"] = rocml.smi_get_device_utilization(gpu_idx)
+        gpu_data["memory_util_percent"] = rocml.smi_get_device_memory_busy(gpu_idx)
+        if not gpu_data["memory_total"]:
+            gpu_data["memory_total"] = rocml.smi_get_device_memory_total(gpu_idx)
+            gpu_data["memory_used"] = rocml.smi_get_device_memory_used(gpu_idx)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug("ROCm SMI 读取 AMD GPU %d 失败: %s", gpu_idx, e)
+        return False
+    return True
+
+
+def _read_rocm_smi() -> Dict[str, Dict[str, Any]]:
+    """一次调用 rocm-smi 获取所有 AMD 显卡的利用率与显存占用，按 "cardN" 索引。"""
+    try:
+        output = subprocess.check_output(
+            ["rocm-smi", "--showuse", "--showmemuse", "--json"],
+            text=True,
+            stderr=subprocess.DEVNULL
+        )
+        data = json.loads(output)
+        if isinstance(data, dict):
+            return data
+    except Exception:  # pylint: disable=broad-except
+        pass
+    return {}
+
+
+def _collect_amd(collect_temp: bool, collect_power: bool) -> List[Dict[str, Any]]:
+    """采集 AMD GPU 指标。仅支持Linux。collect_temp/collect_power 决定是否采集温度、功耗。"""
+    if not _IS_LINUX:
         logger.debug("AMD GPU 监控仅支持 Linux 系统")
         return []
 
     result = []
     cards = _get_amd_card_paths()
+    rocm_stats = None
 
     for i, card_path in enumerate(cards):
         try:
+            sysfs = _resolve_amd_sysfs(card_path)
+
             # 获取设备名称
-            name = _read_amd_sysfs(card_path, "device/product_name")
+            name = _read_amd_sysfs(sysfs, "name")
             if not name:
                 name = f"AMD-GPU-{i}"
             
@@ -269,21 +528,21 @@ def _collect_amd() -> List[Dict[str, Any]]:
             }
             
             # 获取频率
-            freq = _read_amd_sysfs(card_path, "device/pp_dpm_sclk")
+            freq = _read_amd_sysfs(sysfs, "sclk")
             if freq:
                 # 解析当前频率，格式类似：0: 300MHz 1: 2000MHz *
-                match = re.search(r"(\d+)MHz \*", freq)
+                match = _RE_AMD_SCLK_CURRENT.search(freq)
                 if match:
                     gpu_data["frequency_mhz"] = int(match.group(1))
             
             # 读取显存信息
-            mem_total_str = _read_amd_sysfs(card_path, "device/mem_info_vram_total")
+            mem_total_str = _read_amd_sysfs(sysfs, "vram_total")
             if mem_total_str:
                 try:
                     gpu_data["memory_total"] = int(mem_total_str)
                 except ValueError:
                     pass
-            mem_used_str = _read_amd_sysfs(card_path, "device/mem_info_vram_used")
+            mem_used_str = _read_amd_sysfs(sysfs, "vram_used")
             if mem_used_str:
                 try:
                     gpu_data["memory_used"] = int(mem_used_str)
@@ -292,8 +551,11 @@ def _collect_amd() -> List[Dict[str, Any]]:
                 except ValueError:
                     pass
 
+            # 优先通过 ROCm SMI 绑定在进程内读取利用率与显存
+            rocml_ok = ROCML_INITIALIZED and _read_rocml(i, gpu_data)
+
             # 如果 util_percent 仍为 0，尝试用 radeontop 获取
-            if gpu_data.get("util_percent", 0) == 0:
+            if not rocml_ok and gpu_data.get("util_percent", 0) == 0:
                 rt = _read_radeontop(i)
                 if rt and ("gpu" in rt or "gpu%" in rt):
                     try:
@@ -322,35 +584,27 @@ def _collect_amd() -> List[Dict[str, Any]]:
                             gpu_data["memory_total"] = int(gpu_data["memory_used"] * 100 / percent)
             
             # 获取温度
-            if get_monitor_config("gpu", "collect_temp"):
-                temp = _read_amd_sysfs(card_path, "device/hwmon/hwmon*/temp1_input")
+            if collect_temp:
+                temp = _read_amd_sysfs(sysfs, "temp")
                 if temp:
                     gpu_data["temperature_c"] = int(temp) / 1000.0
             
             # 获取功耗
-            if get_monitor_config("gpu", "collect_power"):
-                power = _read_amd_sysfs(card_path, "device/hwmon/hwmon*/power1_average")
+            if collect_power:
+                power = _read_amd_sysfs(sysfs, "power")
                 if power:
                     gpu_data["power_w"] = int(power) / 1000000.0  # 微瓦转瓦
             
-            # 获取利用率和显存（需要 rocm-smi）
-            try:
-                output = subprocess.check_output(
-                    ["rocm-smi", "-d", str(i), "--showuse", "--showmemuse"],
-                    text=True,
-                    stderr=subprocess.DEVNULL
-                )
-                for line in output.splitlines():
-                    if "GPU use (%)" in line:
-                        util = re.search(r"(\d+)", line)
-                        if util:
-                            gpu_data["util_percent"] = int(util.group(1))
-                    elif "GPU memory use (%)" in line:
-                        mem_util = re.search(r"(\d+)", line)
-                        if mem_util:
-                            gpu_data["memory_util_percent"] = int(mem_util.group(1))
-            except Exception:  # pylint: disable=broad-except
-                pass
+            # 获取利用率和显存（需要 rocm-smi），已通过 ROCm SMI 绑定读取时跳过
+            if not rocml_ok:
+                # 所有显卡共用一次 rocm-smi 调用，首次需要时执行
+                if rocm_stats is None:
+                    rocm_stats = _read_rocm_smi()
+                card_stats = rocm_stats.get(f"card{i}", {})
+                for key, field in _ROCM_SMI_FIELDS:
+                    match = _RE_ROCM_DIGITS.search(str(card_stats.get(key, "")))
+                    if match:
+                        gpu_data[field] = int(match.group(1))
             
             result.append(gpu_data)
             
@@ -365,13 +619,23 @@ def collect() -> List[Dict[str, Any]]:
     if not get_monitor_config("gpu", "enabled"):
         return []
 
+    # 每次采集只读取一次配置，不在逐块显卡的循环中重复查询
+    collect_temp = get_monitor_config("gpu", "collect_temp")
+    collect_power = get_monitor_config("gpu", "collect_power")
+
+    # NVIDIA（NVML 调用）与 AMD（sysfs/子进程）互不依赖，并行采集
+    nvidia_future = None
+    if NVML_INITIALIZED:
+        nvidia_future = _executor.submit(_collect_nvidia, collect_temp, collect_power)
+    amd_future = _executor.submit(_collect_amd, collect_temp, collect_power)
+
     result = []
     
     # 采集 NVIDIA GPU
-    if NVML_INITIALIZED:
-        result.extend(_collect_nvidia())
+    if nvidia_future is not None:
+        result.extend(nvidia_future.result())
     
     # 采集 AMD GPU
-    result.extend(_collect_amd())
+    result.extend(amd_future.result())
     
     return result
\ No newline at end of file
@@ -1,15 +1,35 @@
 """内存相关指标采集。"""
 
+import functools
 import logging
+import os
 import platform
 import re
+import struct
 import subprocess
 from typing import Any, Dict, Optional
 
 import psutil
 
+try:  # Windows 下通过 COM 在进程内查询 WMI（可选，依赖 pywin32）
+    import wmi
+except ImportError:  # pragma: no cover - 可选依赖
+    wmi = None
+
 logger = logging.getLogger(__name__)
 
+# 运行平台在进程生命周期内不会变化，导入时确定一次
+_SYSTEM = platform.system().lower()
+_IS_WINDOWS = _SYSTEM == "windows"
+_IS_LINUX = _SYSTEM == "linux"
+_IS_DARWIN = _SYSTEM == "darwin"
+
+# lshw -C memory 输出中的频率，示例: clock: 3200MHz (0.3ns)
+_RE_LSHW_MHZ = re.compile(r"(\d+)MHz")
+
+# 内核导出的 SMBIOS 记录，Type 17 为内存设备（每条内存一个 17-N 目录）
+_DMI_ENTRIES_DIR = "/sys/firmware/dmi/entries"
+
 
 def _get_memory_usage() -> Dict[str, Any]:
     """返回内存使用情况。单位 Byte。"""
@@ -22,9 +42,45 @@ def _get_memory_usage() -> Dict[str, Any]:
     }
 
 
+def _get_memory_frequency_wmi() -> Optional[int]:
+    """通过 wmi 模块在进程内查询 Win32_PhysicalMemory，无需启动 PowerShell。"""
+    if wmi is None:
+        return None
+
+    import pythoncom
+
+    # 采集在线程池中执行，使用 COM 前需先在当前线程初始化
+    pythoncom.CoInitialize()
+    try:
+        frequencies = []
+        for memory in wmi.WMI().Win32_PhysicalMemory():
+            # 有些系统使用ConfiguredClockSpeed
+            for speed in (memory.Speed, memory.ConfiguredClockSpeed):
+                if speed:
+                    frequencies.append(int(speed))
+    finally:
+        pythoncom.CoUninitialize()
+
+    if frequencies:
+        # 返回最高频率
+        freq = max(frequencies)
+        if 100 < freq < 10000:  # 合理的内存频率范围 (100MHz - 10GHz)
+            logger.debug("通过WMI(COM)获取内存频率: %dMHz", freq)
+            return freq
+    return None
+
+
 def _get_memory_frequency_windows() -> Optional[int]:
     """Windows下获取内存频率"""
     try:
+        # 方法0: 进程内 WMI 查询，可用时无需启动任何子进程
+        try:
+            freq = _get_memory_frequency_wmi()
+            if freq:
+                return freq
+        except Exception as e:
+            logger.debug("进程内WMI内存频率查询失败: %s", e)
+
         # 方法1: 使用WMI查询Win32_PhysicalMemory获取内存频率
         cmd = '''
         $memories = Get-WmiObject -Class "Win32_PhysicalMemory" -ErrorAction SilentlyContinue
@@ -135,26 +191,69 @@ def _get_memory_frequency_windows() -> Optional[int]:
     return None
 
 
+def _get_memory_frequency_dmi() -> Optional[int]:
+    """从 SMBIOS Type 17（Memory Device）记录直接读取内存速率 (MT/s)。
+
+    记录布局（相对记录起始偏移）：0x01 记录长度；0x15 Speed (WORD)；
+    0x20 Configured Memory Speed (WORD)。值为 0 表示未知，0xFFFF 表示实际值
+    在扩展字段中（0x54 Extended Speed / 0x58 Extended Configured Speed，DWORD）。
+    读取 raw 文件通常需要 root 权限，无法读取时返回 None。
+    """
+    frequencies = []
+    with os.scandir(_DMI_ENTRIES_DIR) as entries:
+        for entry in entries:
+            if not entry.name.startswith("17-"):
+                continue
+            try:
+                with open(os.path.join(entry.path, "raw"), "rb") as f:
+                    raw = f.read()
+            except OSError:
+                continue
+            if len(raw) < 2:
+                continue
+            length = min(raw[1], len(raw))
+            for offset, ext_offset in ((0x15, 0x54), (0x20, 0x58)):
+                if length < offset + 2:
+                    continue
+                speed = struct.unpack_from("<H", raw, offset)[0]
+                if speed == 0xFFFF and length >= ext_offset + 4:
+                    speed = struct.unpack_from("<I", raw, ext_offset)[0]
+                if speed and speed != 0xFFFF:
+                    frequencies.append(speed)
+    return max(frequencies) if frequencies else None
+
+
+@functools.lru_cache(maxsize=1)
 def _get_memory_frequency() -> Optional[int]:
-    """尝试获取最大内存频率 (MHz)。跨平台支持。"""
-    system = platform.system().lower()
+    """尝试获取最大内存频率 (MHz)。跨平台支持。
+
+    内存频率由 BIOS 上报，运行期间不会变化，只在首次采集时查询一次。
+    """
+    if _IS_LINUX:
+        # Linux: 优先直接读取 SMBIOS 记录，无需启动 lshw 遍历整个设备树
+        try:
+            freq = _get_memory_frequency_dmi()
+            if freq:
+                logger.debug("通过SMBIOS获取内存频率: %dMHz", freq)
+                return freq
+        except OSError as e:
+            logger.debug("无法读取SMBIOS内存信息: %s", e)
 
-    if system == "linux":
-        # Linux: 使用 lshw 命令
+        # 回退到 lshw 命令
         try:
             output = subprocess.check_output(["lshw", "-C", "memory"], text=True, stderr=subprocess.DEVNULL)
-            matches = re.findall(r"(\d+)MHz", output)
+            matches = _RE_LSHW_MHZ.findall(output)
             if matches:
                 freqs = [int(m) for m in matches]
                 return max(freqs)
         except (FileNotFoundError, subprocess.CalledProcessError):
             logger.debug("lshw 命令不可用，无法读取内存频率")
 
-    elif system == "windows":
+    elif _IS_WINDOWS:
         # Windows: 使用WMI查询内存频率
         return _get_memory_frequency_windows()
 
-    elif system == "darwin":  # macOS
+    elif _IS_DARWIN:  # macOS
         # macOS: 暂时不支持，返回 None
         logger.debug("macOS 平台暂不支持内存频率监控")
 
@@ -12,6 +12,9 @@ DB_PATH = "client_cache.db"
 # 单次批量发送的最大条数
 SEND_BATCH_SIZE = 20
 
+# 缓存积压时合并发送，单次请求体（压缩后）的大小上限（字节）
+MAX_BATCH_BYTES = 256 * 1024
+
 # HTTP 请求超时时间（秒）- 已移至timing_config.py统一管理
 # TIMEOUT = 5  # 已废弃，使用timing_config.HTTP_TIMEOUT
 
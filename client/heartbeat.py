@@ -1,15 +1,27 @@
 """心跳管理模块，负责在非监控状态下维持与服务端的连接。"""
 
+import json
 import logging
 import socket
 import time
 from typing import Dict, Any, Optional
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
 from .identity import get_client_id
 from .config import is_server_active, is_monitoring_enabled
 
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    _dumps = orjson.dumps
+else:
+    def _dumps(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 class HeartbeatManager:
     """心跳管理器，负责在非监控状态下发送心跳包"""
@@ -25,6 +37,15 @@ class HeartbeatManager:
         self.monitor_config = monitor_config
         self.last_heartbeat_time = 0
         self.heartbeat_count = 0
+        # 进程生命周期内不变的字段只构建一次；client_id 可能在重新初始化时
+        # 重新生成，因此每次心跳仍实时读取
+        self._static_payload = {
+            "hostname": socket.gethostname(),
+            "heartbeat": True,  # 标识这是心跳包
+        }
+        # 静态字段预先编码为 JSON 前缀（去掉结尾的 "}" 并补上 ","），
+        # 每次心跳只需编码动态字段后拼接
+        self._json_prefix = _dumps(self._static_payload)[:-1] + b","
     
     def should_send_heartbeat(self) -> tuple[bool, str]:
         """检查是否应该发送心跳包
@@ -46,22 +67,12 @@ class HeartbeatManager:
         
         return False, ""
     
-    def create_heartbeat_data(self, reason: str) -> Dict[str, Any]:
-        """创建心跳包数据
-        
-        Args:
-            reason: 发送心跳的原因
-            
-        Returns:
-            Dict: 心跳包数据
-        """
+    def _dynamic_fields(self, reason: str) -> Dict[str, Any]:
+        """生成每次心跳都会变化的字段，并递增心跳序号"""
         self.heartbeat_count += 1
-        
-        heartbeat_data = {
+        return {
             "timestamp": int(time.time()),
             "client_id": get_client_id(),
-            "hostname": socket.gethostname(),
-            "heartbeat": True,  # 标识这是心跳包
             "heartbeat_sequence": self.heartbeat_count,  # 心跳序号
             "reason": reason,  # 心跳原因
             "monitor_status": self.monitor_config.get_status_info(),  # 监控状态信息
@@ -69,8 +80,29 @@ class HeartbeatManager:
             "monitoring_enabled": is_monitoring_enabled(),  # 监控项启用状态
             "last_heartbeat_time": self.last_heartbeat_time  # 上次心跳时间
         }
+
+    def create_heartbeat_data(self, reason: str) -> Dict[str, Any]:
+        """创建心跳包数据
         
-        return heartbeat_data
+        Args:
+            reason: 发送心跳的原因
+            
+        Returns:
+            Dict: 心跳包数据
+        """
+        return {**self._static_payload, **self._dynamic_fields(reason)}
+
+    def encode_heartbeat(self, reason: str) -> bytes:
+        """创建心跳包并直接编码为 JSON 请求体
+        
+        Args:
+            reason: 发送心跳的原因
+            
+        Returns:
+            bytes: 与 create_heartbeat_data 内容相同的 JSON 编码
+        """
+        # 动态部分去掉开头的 "{" 后接在预编码的静态前缀之后
+        return self._json_prefix + _dumps(self._dynamic_fields(reason))[1:]
     
     def send_heartbeat(self, reason: str) -> bool:
         """发送心跳包
@@ -82,10 +114,10 @@ class HeartbeatManager:
             bool: 是否发送成功
         """
         try:
-            heartbeat_data = self.create_heartbeat_data(reason)
+            heartbeat_body = self.encode_heartbeat(reason)
             
-            # 直接发送心跳包，不经过缓存
-            success = self.sender.send_immediate(heartbeat_data)
+            # 直接发送已编码的心跳包，不经过缓存
+            success = self.sender.send_immediate(heartbeat_body)
             
             if success:
                 self.last_heartbeat_time = int(time.time())
@@ -107,11 +139,12 @@ class HeartbeatManager:
         Returns:
             Dict: 心跳统计信息
         """
+        now = int(time.time())
         return {
             "total_heartbeats": self.heartbeat_count,
             "last_heartbeat_time": self.last_heartbeat_time,
-            "current_time": int(time.time()),
-            "time_since_last_heartbeat": int(time.time()) - self.last_heartbeat_time if self.last_heartbeat_time > 0 else 0
+            "current_time": now,
+            "time_since_last_heartbeat": now - self.last_heartbeat_time if self.last_heartbeat_time > 0 else 0
         }
 
 
@@ -134,18 +167,17 @@ def create_minimal_heartbeat(reason: str = "keep_alive") -> Dict[str, Any]:
     }
 
 
-def should_force_heartbeat(last_activity_time: int, max_silence_duration: int = 300) -> bool:
+def should_force_heartbeat(last_activity_time: float, max_silence_duration: int = 300) -> bool:
     """检查是否应该强制发送心跳包（防止长时间静默）
     
     Args:
-        last_activity_time: 上次活动时间
+        last_activity_time: 上次活动时间（time.monotonic() 的返回值）
         max_silence_duration: 最大静默时长（秒），默认5分钟
         
     Returns:
         bool: 是否应该强制发送心跳包
     """
-    current_time = int(time.time())
-    silence_duration = current_time - last_activity_time
+    silence_duration = time.monotonic() - last_activity_time
     
     if silence_duration >= max_silence_duration:
         logger.info("检测到长时间静默 (%d秒)，需要发送强制心跳包", silence_duration)
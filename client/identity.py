@@ -1,20 +1,36 @@
 """生成并缓存客户端唯一标识 (UUID) 和认证 Token。"""
 
-import base64
-import hashlib
+import binascii
+import functools
 import hmac
 import platform
+import shlex
+import socket
 import subprocess
+import sys
 from pathlib import Path
+from typing import Dict, Optional
 import uuid
 
 from .config import SERVER_SECRET_KEY
 
 _ID_FILE = Path("client_id.txt")
+_client_id: Optional[str] = None
 
+# 密钥固定不变，导入时预先完成 HMAC 的密钥填充（内外两层 SHA256 已吸收密钥块），
+# 生成 Token 时复制该状态后只需处理 UUID 本身
+_HMAC_TEMPLATE = hmac.new(SERVER_SECRET_KEY.encode('utf-8'), digestmod='sha256')
 
+# 标准 base64 字母表到 URL 安全字母表的转换表
+_URLSAFE_TABLE = bytes.maketrans(b"+/", b"-_")
+
+
+@functools.lru_cache(maxsize=4)
 def generate_token(uuid_str: str) -> str:
     """使用与服务端相同的算法生成认证 Token。
+
+    Token 只取决于 UUID 和固定密钥，按 UUID 缓存；重新生成客户端 ID 后
+    自然得到新的 Token。
     
     Args:
         uuid_str: 客户端 UUID
@@ -22,33 +38,61 @@ def generate_token(uuid_str: str) -> str:
     Returns:
         base64 编码的 HMAC token
     """
-    secret = SERVER_SECRET_KEY.encode('utf-8')
-    h = hmac.new(secret, uuid_str.encode('utf-8'), hashlib.sha256)
-    token = base64.urlsafe_b64encode(h.digest()).decode('utf-8').rstrip('=')
-    return token
+    h = _HMAC_TEMPLATE.copy()
+    h.update(uuid_str.encode('utf-8'))
+    digest = h.digest()
+    # SHA256 摘要固定 32 字节，编码后恰好以一个 "=" 结尾，直接切掉即可
+    token = binascii.b2a_base64(digest, newline=False).translate(_URLSAFE_TABLE)[:-1]
+    return token.decode('ascii')
 
 
 def get_client_id() -> str:
-    """返回本机唯一 ID，如文件不存在或为空则生成并写入。"""
-    if _ID_FILE.exists():
+    """返回本机唯一 ID，如文件不存在或为空则生成并写入。
+
+    读取结果缓存在内存中，之后的调用不再访问文件系统；重新生成或删除
+    ID 文件后需调用 reset_client_id_cache()。
+    """
+    global _client_id
+    if _client_id is not None:
+        return _client_id
+
+    try:
         content = _ID_FILE.read_text().strip()
-        if content:  # 检查文件内容是否为空
-            return content
+    except FileNotFoundError:
+        content = ""
 
-    # 文件不存在或为空，生成新的UUID
-    cid = str(uuid.uuid4())
-    _ID_FILE.write_text(cid)
-    return cid
+    if not content:  # 文件不存在或为空，生成新的UUID
+        content = str(uuid.uuid4())
+        _ID_FILE.write_text(content)
+
+    _client_id = content
+    return content
+
+
+def reset_client_id_cache() -> None:
+    """清除内存中的客户端 ID，下次调用 get_client_id() 时重新读取文件"""
+    global _client_id
+    _client_id = None
 
 
 def get_auth_token() -> str:
-    """返回基于 UUID 生成的认证 Token。"""
+    """返回基于 UUID 生成的认证 Token（同一 UUID 只计算一次）。"""
     return generate_token(get_client_id())
 
 
+@functools.lru_cache(maxsize=1)
+def get_hostname() -> str:
+    """返回本机主机名，只查询一次"""
+    return socket.gethostname()
+
+
+@functools.lru_cache(maxsize=1)
 def get_os_info() -> str:
     """获取详细的操作系统信息。
 
+    运行期间操作系统版本不会变化，结果只计算一次，后续注册重试直接复用，
+    不再重复启动 PowerShell / sw_vers 等子进程。
+
     Returns:
         str: 格式化的操作系统信息，如 "Windows 11 Pro 22H2" 或 "Ubuntu 20.04.3 LTS"
     """
@@ -70,8 +114,45 @@ def get_os_info() -> str:
         return f"{platform.system()} {platform.release()}"
 
 
+def _get_windows_os_info_registry() -> Optional[str]:
+    """从注册表读取Windows版本信息，读取失败时返回 None"""
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                           r"SOFTWARE\Microsoft\Windows NT\CurrentVersion") as key:
+            product_name = winreg.QueryValueEx(key, "ProductName")[0]
+            release = ""
+            # 新版本使用 DisplayVersion（如22H2），旧版本只有 ReleaseId
+            for value_name in ("DisplayVersion", "ReleaseId"):
+                try:
+                    release = winreg.QueryValueEx(key, value_name)[0]
+                    break
+                except FileNotFoundError:
+                    continue
+    except Exception:
+        return None
+
+    if not product_name:
+        return None
+
+    # Windows 11 的注册表 ProductName 仍为 "Windows 10 ..."，按内部版本号修正
+    if product_name.startswith("Windows 10") and sys.getwindowsversion().build >= 22000:
+        product_name = "Windows 11" + product_name[len("Windows 10"):]
+
+    parts = [product_name]
+    if release:
+        parts.append(release)
+    return " ".join(parts)
+
+
 def _get_windows_os_info() -> str:
     """获取Windows详细版本信息"""
+    # 优先读取注册表：微秒级完成，无需启动 PowerShell
+    info = _get_windows_os_info_registry()
+    if info:
+        return info
+
+    # 备用方法：注册表读取失败时再通过 PowerShell 查询
     try:
         # 使用PowerShell获取详细的Windows版本信息
         cmd = '''
@@ -134,40 +215,31 @@ def _get_windows_os_info() -> str:
     except Exception:
         pass
 
-    # 备用方法
-    try:
-        import winreg
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
-                           r"SOFTWARE\Microsoft\Windows NT\CurrentVersion") as key:
-            product_name = winreg.QueryValueEx(key, "ProductName")[0]
-            try:
-                display_version = winreg.QueryValueEx(key, "DisplayVersion")[0]
-                return f"{product_name} {display_version}"
-            except FileNotFoundError:
-                try:
-                    release_id = winreg.QueryValueEx(key, "ReleaseId")[0]
-                    return f"{product_name} {release_id}"
-                except FileNotFoundError:
-                    return product_name
-    except Exception:
-        pass
-
     # 最后的备用方法
     return f"Windows {platform.release()}"
 
 
+def _read_env_file(path: str) -> Dict[str, str]:
+    """解析 KEY=VALUE 格式的发行版信息文件（os-release / lsb-release）。
+
+    按 shell 语法切分，可正确处理引号、转义和注释行。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tokens = shlex.split(f.read(), comments=True)
+
+    info = {}
+    for token in tokens:
+        key, sep, value = token.partition("=")
+        if sep:
+            info[key] = value
+    return info
+
+
 def _get_linux_os_info() -> str:
     """获取Linux发行版信息"""
     try:
         # 尝试读取 /etc/os-release
-        with open("/etc/os-release", "r") as f:
-            lines = f.readlines()
-
-        os_info = {}
-        for line in lines:
-            if "=" in line:
-                key, value = line.strip().split("=", 1)
-                os_info[key] = value.strip('"')
+        os_info = _read_env_file("/etc/os-release")
 
         # 构建版本字符串
         name = os_info.get("PRETTY_NAME", os_info.get("NAME", "Linux"))
@@ -183,18 +255,10 @@ def _get_linux_os_info() -> str:
     except Exception:
         pass
 
-    # 备用方法：尝试 lsb_release
+    # 备用方法：直接读取 /etc/lsb-release（即 lsb_release -d 的数据来源）
     try:
-        result = subprocess.run(
-            ["lsb_release", "-d"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            description = result.stdout.strip()
-            if description.startswith("Description:"):
-                return description.split(":", 1)[1].strip()
+        description = _read_env_file("/etc/lsb-release").get("DISTRIB_DESCRIPTION")
+        if description:
             return description
     except Exception:
         pass
@@ -226,13 +290,12 @@ def _get_macos_os_info() -> str:
             product_version = info.get('ProductVersion', '')
             build_version = info.get('BuildVersion', '')
 
+            parts = [product_name]
             if product_version:
-                result_str = f"{product_name} {product_version}"
+                parts.append(product_version)
                 if build_version:
-                    result_str += f" ({build_version})"
-                return result_str
-            else:
-                return product_name
+                    parts.append(f"({build_version})")
+            return " ".join(parts)
 
     except Exception:
         pass
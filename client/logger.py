@@ -1,13 +1,21 @@
 """日志管理模块，实现按天滚动的日志文件。"""
 
+import atexit
 import logging
 import os
-from datetime import datetime
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 
 from .config import LOG_DIR, LOG_FORMAT, LOG_DATE_FORMAT, LOG_LEVEL
 
+# 当前日志文件路径缓存：(下一个本地午夜的时间戳, 路径)，跨过午夜才重新计算
+_log_file_cache = (0.0, "")
+
+# 后台写日志的监听器，重复初始化时先停止旧的
+_listener = None
+
 
 def setup_logging() -> None:
     """配置日志系统。
@@ -15,7 +23,10 @@ def setup_logging() -> None:
     - 按天滚动的文件日志
     - 同时输出到控制台
     - 日志格式：时间 级别 消息
+    - 日志记录只放入队列，由后台线程写文件和控制台，不阻塞采集循环
     """
+    global _listener
+
     # 确保日志目录存在
     log_dir = Path(LOG_DIR)
     log_dir.mkdir(parents=True, exist_ok=True)
@@ -26,6 +37,9 @@ def setup_logging() -> None:
     
     # 清除已有的处理器
     root_logger.handlers.clear()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
     
     # 1. 文件处理器（按天滚动）
     log_file = os.path.join(log_dir, "client.log")
@@ -41,20 +55,43 @@ def setup_logging() -> None:
     )
     # 设置滚动日志的命名格式：client.2024-01-30.log
     file_handler.suffix = "%Y-%m-%d.log"
-    root_logger.addHandler(file_handler)
     
     # 2. 控制台处理器
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(
         logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
     )
-    root_logger.addHandler(console_handler)
+
+    # 3. 根日志器只挂队列处理器，实际输出交给后台监听线程
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
     
     # 记录启动信息
     logging.info("日志系统初始化完成，日志目录: %s", log_dir)
     
 
+def _stop_listener() -> None:
+    """进程退出前停止监听线程，确保队列中的日志全部写出"""
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
 def get_current_log_file() -> str:
     """获取当前日志文件路径。"""
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    return os.path.join(LOG_DIR, f"client.{current_date}.log") 
\ No newline at end of file
+    global _log_file_cache
+    now = time.time()
+    next_midnight, path = _log_file_cache
+    if now < next_midnight:
+        return path
+
+    tm = time.localtime(now)
+    path = os.path.join(LOG_DIR, time.strftime("client.%Y-%m-%d.log", tm))
+    # mktime 会自动把 tm_mday + 1 规范化到下个月/下一年
+    next_midnight = time.mktime((tm.tm_year, tm.tm_mon, tm.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    _log_file_cache = (next_midnight, path)
+    return path
\ No newline at end of file
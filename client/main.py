@@ -1,14 +1,20 @@
 """客户端入口脚本。"""
 
+import json
 import logging
+import platform
 import socket
 import sys
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple
 
-import requests
 from requests.exceptions import RequestException
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
 from .cache import Cache
 from .collector import collect_all
 from .config import (
@@ -30,10 +36,132 @@ from .timing_config import (
 )
 from .identity import get_client_id, get_auth_token, get_os_info
 from .logger import setup_logging
-from .sender import Sender
-from .state_manager import StateManager, ClientState
+from .sender import Sender, create_session
+from .state_manager import StateManager, ClientState, get_state_manager
 from .monitor_config import MonitorConfig
-from .heartbeat import HeartbeatManager
+from .heartbeat import HeartbeatManager, should_force_heartbeat
+
+logger = logging.getLogger(__name__)
+
+# 运行平台在进程生命周期内不会变化，导入时确定一次
+_IS_WINDOWS = platform.system() == "Windows"
+
+# 解析注册响应；orjson 直接解析原始字节，无需先解码为 str
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# 服务端表示设备已被删除的错误码
+_DEVICE_DELETED = "DEVICE_DELETED"
+
+# 注册与上报复用同一个会话，保持 keep-alive 连接，免去重复的 TCP/TLS 握手
+_SESSION = create_session()
+
+# 注册成功响应中必须包含的字段及监控项
+_REQUIRED_FIELDS = frozenset({
+    "server_id", "auth_token", "report_url",
+    "report_interval", "monitor_items", "is_active",
+})
+_REQUIRED_MONITORS = frozenset({"cpu", "memory", "disk", "gpu"})
+
+# 采集循环中遇到这些状态时退出循环，重新开始注册流程
+_LEAVE_LOOP_STATES = frozenset({ClientState.DELETED, ClientState.REINITIALIZED, ClientState.SLEEP_RETRY})
+
+
+# 注册状态处理函数的返回值：_KEEP_WAITING 表示继续重试注册，其余值直接作为
+# register_client 的返回值
+_KEEP_WAITING = object()
+
+
+class _RegisterContext(NamedTuple):
+    """注册状态处理函数共用的上下文"""
+    state_manager: Optional[StateManager]
+    my_token: str
+
+
+def _handle_pending(config: Dict[str, Any], ctx: _RegisterContext):
+    """等待审核：继续按重试间隔重新注册"""
+    logger.info("注册请求正在等待审核...")
+    return _KEEP_WAITING
+
+
+def _handle_rejected(config: Dict[str, Any], ctx: _RegisterContext):
+    """注册被拒绝"""
+    reason = config.get("message", "未知原因")
+    logger.error("注册请求被拒绝: %s", reason)
+    logger.info("将在 30 分钟后重试...")
+    return {"status": "rejected", "message": reason}
+
+
+def _handle_deleted(config: Dict[str, Any], ctx: _RegisterContext):
+    """设备已被服务端删除，触发重新初始化"""
+    logger.warning("收到设备删除响应，触发重新初始化")
+    if ctx.state_manager:
+        ctx.state_manager.handle_device_deleted_response()
+    return {"status": "deleted", "action": "reinitialize"}
+
+
+def _handle_accepted(config: Dict[str, Any], ctx: _RegisterContext):
+    """注册通过：校验 token 和必需字段后返回完整配置"""
+    # 验证服务端返回的token
+    server_token = config.get("auth_token")
+    if not server_token:
+        logger.error("服务端未返回认证token")
+        return None
+
+    if server_token != ctx.my_token:
+        logger.error("服务端返回的token验证失败")
+        logger.error("请检查客户端和服务端的 SERVER_SECRET_KEY 是否一致")
+        return None
+
+    logger.info("Token验证成功")
+
+    # 检查必需的配置项
+    missing_fields = _REQUIRED_FIELDS - config.keys()
+    if missing_fields:
+        logger.error("注册响应缺少必需字段: %s", sorted(missing_fields))
+        logger.error("完整响应: %s", config)
+        return None
+
+    # 检查monitor_items结构
+    monitor_items = config.get("monitor_items", {})
+    missing_monitors = _REQUIRED_MONITORS - monitor_items.keys()
+    if missing_monitors:
+        logger.error("monitor_items缺少必需项: %s", sorted(missing_monitors))
+        logger.error("完整响应: %s", config)
+        return None
+
+    # 使用服务端配置，如果某项未提供则使用默认值
+    full_config = {
+        "status": "accepted",
+        "server_id": config["server_id"],
+        "report_url": config["report_url"],
+        "report_interval": config["report_interval"],
+        "monitor_items": config["monitor_items"],
+        "is_active": config["is_active"],
+        "auth_token": server_token,
+        "message": config.get("message", "注册成功")
+    }
+
+    logger.info("注册成功: %s", full_config["message"])
+    logger.info(
+        "服务器配置: ID=%s, 上报间隔=%d秒",
+        full_config["server_id"],
+        full_config["report_interval"],
+    )
+    return full_config
+
+
+def _handle_unknown_status(config: Dict[str, Any], ctx: _RegisterContext):
+    """未知的注册状态"""
+    logger.error("未知的注册状态: %s", config.get("status"))
+    return None
+
+
+_STATUS_HANDLERS = {
+    "pending": _handle_pending,
+    "rejected": _handle_rejected,
+    "deleted": _handle_deleted,
+    "accepted": _handle_accepted,
+}
 
 
 def register_client(max_retries: int = 0, retry_interval: int = 30, state_manager: Optional[StateManager] = None) -> Optional[Dict[str, Any]]:
@@ -42,7 +170,7 @@ def register_client(max_retries: int = 0, retry_interval: int = 30, state_manage
     client_id = get_client_id()
     hostname = socket.gethostname()
     os_info = get_os_info()
-    my_token = get_auth_token()  # 使用UUID生成我们的token
+    ctx = _RegisterContext(state_manager, get_auth_token())  # 使用UUID生成我们的token
 
     payload = {
         "client_id": client_id,
@@ -50,91 +178,34 @@ def register_client(max_retries: int = 0, retry_interval: int = 30, state_manage
         "os": os_info,  # 新增操作系统信息
     }
 
+    # 重试循环中反复使用的函数预先绑定到局部变量
+    post = _SESSION.post
+    sleep = time.sleep
+
     attempt = 0
     while True:
         attempt += 1
         try:
-            resp = requests.post(REGISTER_URL, json=payload, timeout=REGISTER_TIMEOUT)
+            resp = post(REGISTER_URL, json=payload, timeout=REGISTER_TIMEOUT)
 
             if resp.status_code == 200:
-                logger.info("注册原始响应: %s", resp.text)
+                # resp.text 会在调用前解码整个响应体，日志未启用时跳过
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("注册原始响应: %s", resp.text)
                 try:
-                    config = resp.json()
-                    logger.debug("收到注册响应: %s", config)
+                    config = _json_loads(resp.content)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("收到注册响应: %s", config)
 
                     if not isinstance(config, dict):
                         logger.error("注册响应格式错误，期望 dict 但收到 %s", type(config))
                         return None
 
                     status = config.get("status")
-                    if status == "pending":
-                        logger.info("注册请求正在等待审核...")
-                    elif status == "rejected":
-                        reason = config.get("message", "未知原因")
-                        logger.error("注册请求被拒绝: %s", reason)
-                        logger.info("将在 30 分钟后重试...")
-                        return {"status": "rejected", "message": reason}
-                    elif status == "deleted":
-                        logger.warning("收到设备删除响应，触发重新初始化")
-                        if state_manager:
-                            state_manager.handle_device_deleted_response()
-                        return {"status": "deleted", "action": "reinitialize"}
-                    elif status == "accepted":
-                        # 验证服务端返回的token
-                        server_token = config.get("auth_token")
-                        if not server_token:
-                            logger.error("服务端未返回认证token")
-                            return None
-                        
-                        if server_token != my_token:
-                            logger.error("服务端返回的token验证失败")
-                            logger.error("请检查客户端和服务端的 SERVER_SECRET_KEY 是否一致")
-                            return None
-                        
-                        logger.info("Token验证成功")
-
-                        # 检查必需的配置项
-                        required_fields = [
-                            "server_id", "auth_token", "report_url", 
-                            "report_interval", "monitor_items", "is_active"
-                        ]
-                        missing_fields = [f for f in required_fields if f not in config]
-                        if missing_fields:
-                            logger.error("注册响应缺少必需字段: %s", missing_fields)
-                            logger.error("完整响应: %s", config)
-                            return None
-
-                        # 检查monitor_items结构
-                        monitor_items = config.get("monitor_items", {})
-                        required_monitors = ["cpu", "memory", "disk", "gpu"]
-                        missing_monitors = [m for m in required_monitors if m not in monitor_items]
-                        if missing_monitors:
-                            logger.error("monitor_items缺少必需项: %s", missing_monitors)
-                            logger.error("完整响应: %s", config)
-                            return None
-                        
-                        # 使用服务端配置，如果某项未提供则使用默认值
-                        full_config = {
-                            "status": "accepted",
-                            "server_id": config["server_id"],
-                            "report_url": config["report_url"],
-                            "report_interval": config["report_interval"],
-                            "monitor_items": config["monitor_items"],
-                            "is_active": config["is_active"],
-                            "auth_token": server_token,
-                            "message": config.get("message", "注册成功")
-                        }
-
-                        logger.info("注册成功: %s", full_config["message"])
-                        logger.info(
-                            "服务器配置: ID=%s, 上报间隔=%d秒",
-                            full_config["server_id"],
-                            full_config["report_interval"],
-                        )
-                        return full_config
-                    else:
-                        logger.error("未知的注册状态: %s", status)
-                        return None
+                    handler = _STATUS_HANDLERS.get(status, _handle_unknown_status)
+                    result = handler(config, ctx)
+                    if result is not _KEEP_WAITING:
+                        return result
 
                 except ValueError as e:
                     logger.error("解析注册响应JSON失败: %s", e)
@@ -144,14 +215,14 @@ def register_client(max_retries: int = 0, retry_interval: int = 30, state_manage
             elif resp.status_code == 403:
                 # 检查是否是设备删除错误
                 try:
-                    error_data = resp.json()
-                    if error_data.get("error_code") == "DEVICE_DELETED":
-                        logger.warning("收到设备删除错误码，触发重新初始化")
-                        if state_manager:
-                            state_manager.handle_device_deleted_response()
-                        return {"status": "deleted", "action": "reinitialize"}
-                except (json.JSONDecodeError, ValueError):
-                    pass
+                    error_data = _json_loads(resp.content)
+                except ValueError:  # JSONDecodeError 是 ValueError 的子类
+                    error_data = None
+                if isinstance(error_data, dict) and error_data.get("error_code") == _DEVICE_DELETED:
+                    logger.warning("收到设备删除错误码，触发重新初始化")
+                    if state_manager:
+                        state_manager.handle_device_deleted_response()
+                    return {"status": "deleted", "action": "reinitialize"}
 
                 logger.error("注册失败，状态码: %d", resp.status_code)
                 logger.error("响应内容: %s", resp.text)
@@ -174,7 +245,7 @@ def register_client(max_retries: int = 0, retry_interval: int = 30, state_manage
             attempt + 1,
         )
         try:
-            time.sleep(retry_interval)
+            sleep(retry_interval)
         except KeyboardInterrupt:
             logger.info("用户中断，退出注册")
             return None
@@ -222,12 +293,7 @@ def update_config(config: Dict[str, Any], monitor_config: Optional[MonitorConfig
             if item == "disk" and "paths" not in item_config:
                 # 新版本服务端不返回paths字段，保持客户端默认配置
                 if "paths" not in RUNTIME_CONFIG["monitor_items"][item]:
-                    import platform
-                    system = platform.system().lower()
-                    if system == "windows":
-                        RUNTIME_CONFIG["monitor_items"][item]["paths"] = ["C:\\"]
-                    else:
-                        RUNTIME_CONFIG["monitor_items"][item]["paths"] = ["/"]
+                    RUNTIME_CONFIG["monitor_items"][item]["paths"] = ["C:\\"] if _IS_WINDOWS else ["/"]
                     logger.info("磁盘监控配置兼容性处理: 使用默认路径 %s",
                                RUNTIME_CONFIG["monitor_items"][item]["paths"])
 
@@ -243,11 +309,12 @@ def update_config(config: Dict[str, Any], monitor_config: Optional[MonitorConfig
         if monitor_config:
             monitor_config.update_config(config["monitor_config"])
 
-    logger.info("配置已更新:")
-    logger.info("  上报间隔: %d 秒", get_report_interval())
-    logger.info("  监控项:")
-    for item, settings in RUNTIME_CONFIG["monitor_items"].items():
-        logger.info("    %s: %s", item, settings)
+    if logger.isEnabledFor(logging.INFO):
+        # 合并为一条日志，仅在 INFO 启用时构建
+        lines = ["配置已更新:", "  上报间隔: %d 秒" % get_report_interval(), "  监控项:"]
+        lines.extend("    %s: %s" % (item, settings)
+                     for item, settings in RUNTIME_CONFIG["monitor_items"].items())
+        logger.info("\n".join(lines))
 
 
 def main() -> None:
@@ -258,7 +325,7 @@ def main() -> None:
     # 移除旧的删除检测逻辑，使用新的状态管理
 
     # 初始化状态管理器
-    state_manager = StateManager()
+    state_manager = get_state_manager()
 
     # 初始化认证token
     from . import config as config_module
@@ -285,13 +352,14 @@ def main() -> None:
         logger.warning("收到设备删除通知，触发重新初始化")
         state_manager.handle_device_deleted_response()
 
-    sender = Sender(cache, deletion_callback=on_device_deleted, monitor_config=monitor_config)
+    sender = Sender(cache, deletion_callback=on_device_deleted, monitor_config=monitor_config,
+                    session=_SESSION)
 
     # 初始化心跳管理器
     heartbeat_manager = HeartbeatManager(sender, monitor_config)
 
-    # 记录上次活动时间（用于强制心跳检测）
-    last_activity_time = int(time.time())
+    # 记录上次活动时间（用于强制心跳检测），只用于计算间隔，使用单调时钟
+    last_activity_time = time.monotonic()
 
     while True:
         # 检查是否需要停止注册（错误状态检测）
@@ -407,7 +475,7 @@ def main() -> None:
                             if sender.send_immediate(metrics):
                                 logger.info("首次数据发送成功")
                                 # 更新活动时间
-                                last_activity_time = int(time.time())
+                                last_activity_time = time.monotonic()
                                 # 等待一个完整的间隔时间再开始定时采集
                                 logger.info("将在 %d 秒后开始定时采集任务", get_report_interval())
                             else:
@@ -426,7 +494,11 @@ def main() -> None:
                     # 注册成功，开始采集循环
                     logger.info("开始定时采集，间隔 %d 秒", get_report_interval())
 
-                    # 采集循环（内层循环）
+                    # 采集循环（内层循环），循环中反复使用的函数预先绑定到局部变量
+                    get_state = state_manager.get_state
+                    get_interval = get_report_interval
+                    # 以可唤醒的等待代替 sleep，设备被删除等状态变化时立即结束等待
+                    wait = state_manager.wait_for_state_change
                     while True:
                         try:
                             # 检查是否需要停止（删除检测）
@@ -435,17 +507,18 @@ def main() -> None:
                                 break
 
                             # 检查是否需要处理删除状态
-                            current_state = state_manager.get_state()
-                            if current_state in [ClientState.DELETED, ClientState.REINITIALIZED, ClientState.SLEEP_RETRY]:
+                            current_state = get_state()
+                            if current_state in _LEAVE_LOOP_STATES:
                                 logger.info("检测到删除相关状态 (%s)，退出采集循环，重新开始注册流程", current_state.value)
                                 break  # 退出采集循环，重新开始注册
 
-                            # 检查是否需要强制发送心跳包（防止长时间静默）
-                            from .heartbeat import should_force_heartbeat
+                            # 检查是否需要强制发送心跳包（防止长时间静默）；后台上报只在
+                            # 服务端确认接收后才更新 sender.last_success，计入活动时间
+                            last_activity_time = max(last_activity_time, sender.last_success)
                             if should_force_heartbeat(last_activity_time):
                                 logger.info("长时间静默，发送强制心跳包")
                                 if heartbeat_manager.send_heartbeat("长时间静默，强制心跳"):
-                                    last_activity_time = int(time.time())
+                                    last_activity_time = time.monotonic()
 
                             # 检查是否需要发送心跳包而不是监控数据
                             should_send_heartbeat, heartbeat_reason = heartbeat_manager.should_send_heartbeat()
@@ -455,10 +528,10 @@ def main() -> None:
 
                                 # 发送心跳包
                                 if heartbeat_manager.send_heartbeat(heartbeat_reason):
-                                    last_activity_time = int(time.time())
+                                    last_activity_time = time.monotonic()
 
                                 # 等待下一次检查
-                                time.sleep(get_report_interval())
+                                wait(get_interval())
                                 continue
 
                             # 如果到这里，说明应该进行正常的监控数据采集
@@ -470,7 +543,7 @@ def main() -> None:
                             if metrics is None:
                                 logger.info("无监控数据需要上报，跳过本次采集")
                                 # 等待下一次采集
-                                time.sleep(get_report_interval())
+                                wait(get_interval())
                                 continue
 
                             logger.debug("采集完成，准备发送")
@@ -478,15 +551,13 @@ def main() -> None:
                             # 保存到缓存
                             cache.save(metrics)
 
-                            # 发送数据
-                            sender.send()
-
-                            # 更新活动时间（表示成功与服务端通信）
-                            last_activity_time = int(time.time())
+                            # 发送数据：在后台线程上报，不阻塞采集循环；删除回调触发的
+                            # 状态变化会唤醒下方的等待
+                            sender.send_in_background()
 
                             # 发送后立即检查状态变化（删除回调可能已触发）
-                            current_state = state_manager.get_state()
-                            if current_state in [ClientState.DELETED, ClientState.REINITIALIZED, ClientState.SLEEP_RETRY]:
+                            current_state = get_state()
+                            if current_state in _LEAVE_LOOP_STATES:
                                 logger.info("发送后检测到删除相关状态 (%s)，立即退出采集循环", current_state.value)
                                 break  # 立即退出采集循环，不等待下一次循环
 
@@ -494,12 +565,12 @@ def main() -> None:
                             cache.prune(CACHE_CLEANUP_INTERVAL)
 
                             # 等待下一次采集
-                            logger.debug("等待 %d 秒后进行下一次采集", get_report_interval())
+                            logger.debug("等待 %d 秒后进行下一次采集", get_interval())
 
                         except Exception as e:  # pylint: disable=broad-except
                             logger.exception("主循环异常: %s", e)
 
-                        time.sleep(get_report_interval())
+                        wait(get_interval())
 
                     # 采集循环结束，回到外层注册循环
                     logger.info("退出采集循环，回到外层注册循环")
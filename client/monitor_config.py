@@ -1,12 +1,34 @@
 """监控配置管理模块，处理不同监控模式的时间判断逻辑。"""
 
 import logging
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
 from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger(__name__)
 
 
+class MonitorMode(IntEnum):
+    """监控模式，取值即为 MonitorConfig._CHECKERS 中的下标"""
+    CONTINUOUS = 0  # 持续监控
+    SCHEDULED = 1   # 定时监控
+    COUNTDOWN = 2   # 倒计时监控
+
+
+def _hhmm_to_minutes(value: Any) -> Optional[int]:
+    """把 "HH:MM" 转换为当天的分钟数，格式错误时返回 None"""
+    try:
+        hour, minute = str(value).split(':')
+        return int(hour) * 60 + int(minute)
+    except (TypeError, ValueError):
+        return None
+
+# is_monitoring_time 结果的最长缓存时间（秒）。定时监控按分钟判断，倒计时在
+# 结束时刻切换，缓存的到期时间不会越过下一个整分钟或倒计时结束时刻
+_RESULT_CACHE_TTL = 30.0
+
+
 class MonitorConfig:
     """监控配置管理类，支持三种监控模式：
     - CONTINUOUS: 持续监控（默认模式）
@@ -26,15 +48,24 @@ class MonitorConfig:
         self.mode = config_data.get('mode', 'CONTINUOUS')
         self.schedule = config_data.get('schedule', {})
         self.countdown = config_data.get('countdown', {})
-        self.last_update = datetime.now()
+        self._parse_schedule()
+        self._parse_countdown_end()
+        self._bind_checker()
+        # 状态上报用的配置快照，每次更新配置时复制一次，get_status_info 直接共享
+        self._schedule_snapshot = dict(self.schedule or {})
+        self._countdown_snapshot = dict(self.countdown or {})
+        self._mark_updated()
+        # is_monitoring_time 的结果缓存及其到期时间（单调时钟）
+        self._cached_result = True
+        self._cached_until = 0.0
         
         logger.info("监控配置初始化: 模式=%s", self.mode)
-        if self.mode == 'SCHEDULED':
+        if self._mode is MonitorMode.SCHEDULED:
             logger.info("定时监控配置: 时间=%s-%s, 日期=%s", 
                        self.schedule.get('start_time'), 
                        self.schedule.get('end_time'),
                        self.schedule.get('days'))
-        elif self.mode == 'COUNTDOWN':
+        elif self._mode is MonitorMode.COUNTDOWN:
             logger.info("倒计时监控配置: 持续时间=%s分钟, 结束时间=%s",
                        self.countdown.get('duration'),
                        self.countdown.get('end_time'))
@@ -49,36 +80,137 @@ class MonitorConfig:
         self.mode = config_data.get('mode', 'CONTINUOUS')
         self.schedule = config_data.get('schedule', {})
         self.countdown = config_data.get('countdown', {})
-        self.last_update = datetime.now()
+        self._parse_schedule()
+        self._parse_countdown_end()
+        self._bind_checker()
+        # 状态上报用的配置快照，每次更新配置时复制一次，get_status_info 直接共享
+        self._schedule_snapshot = dict(self.schedule or {})
+        self._countdown_snapshot = dict(self.countdown or {})
+        self._mark_updated()
+        self._cached_until = 0.0  # 配置变化后立即重新判断
         
         if old_mode != self.mode:
             logger.info("监控模式变更: %s -> %s", old_mode, self.mode)
         else:
             logger.debug("监控配置已更新")
     
-    def is_monitoring_time(self) -> bool:
+    def _mark_updated(self) -> None:
+        """记录配置更新时间：单调时钟用于计算间隔，ISO 字符串只生成一次用于状态上报"""
+        self._last_update_monotonic = time.monotonic()
+        self._last_update_iso = datetime.now().isoformat()
+
+    @property
+    def last_update(self) -> str:
+        """最近一次配置更新的时间（ISO 格式字符串），只读"""
+        return self._last_update_iso
+    
+    def is_monitoring_time(self, now: Optional[datetime] = None) -> bool:
         """检查当前是否应该进行监控
         
+        Args:
+            now: 当前本地时间，未提供时自动获取并使用短期缓存的结果；
+                同一次检查中的各项判断共用该时间
+        
         Returns:
             bool: True表示应该监控，False表示不应该监控
         """
+        check = self._check_fn
+        if check is None:  # 持续监控
+            return True
         try:
-            if self.mode == 'CONTINUOUS':
-                return True
-            elif self.mode == 'SCHEDULED':
-                return self._check_scheduled_time()
-            elif self.mode == 'COUNTDOWN':
-                return self._check_countdown_time()
-            else:
-                logger.warning("未知的监控模式: %s，默认为持续监控", self.mode)
-                return True
+            use_cache = now is None
+            if use_cache:
+                mono = time.monotonic()
+                if mono < self._cached_until:
+                    return self._cached_result
+                now = datetime.now()
+            result = check(self, now)
+            if use_cache:
+                self._cached_result = result
+                self._cached_until = mono + self._result_ttl(now)
+            return result
         except Exception as e:
             logger.error("检查监控时间时发生错误: %s", e)
             return True  # 出错时默认允许监控
     
-    def _check_scheduled_time(self) -> bool:
+    def _bind_checker(self) -> None:
+        """把模式字符串映射为 MonitorMode 并选定判断函数，配置更新时执行一次"""
+        try:
+            self._mode = MonitorMode[self.mode]
+        except (KeyError, TypeError):
+            logger.warning("未知的监控模式: %s，默认为持续监控", self.mode)
+            self._mode = MonitorMode.CONTINUOUS
+        self._check_fn = self._CHECKERS[self._mode]
+    
+    def _result_ttl(self, now: datetime) -> float:
+        """计算本次判断结果可以缓存的秒数"""
+        # 不越过下一个整分钟，定时监控的 HH:MM 判断在此之前不会变化
+        ttl = min(_RESULT_CACHE_TTL, 60 - now.second - now.microsecond / 1e6)
+        if self._mode is MonitorMode.COUNTDOWN and self._countdown_end_dt is not None:
+            remaining = self._countdown_remaining(now)
+            # 倒计时未结束时不越过结束时刻
+            if remaining > 0:
+                ttl = min(ttl, remaining)
+        return ttl
+    
+    def _parse_schedule(self) -> None:
+        """把定时监控配置预处理为整数形式，配置更新时执行一次"""
+        # 监控日期：1=周一, 7=周日；未配置日期时不限制
+        days = self.schedule.get('days') if self.schedule else None
+        self._schedule_days = None
+        if days:
+            parsed_days = set()
+            for day in days:
+                try:
+                    parsed_days.add(int(day))
+                except (TypeError, ValueError):
+                    logger.warning("定时监控日期格式错误，已忽略: %s", day)
+            self._schedule_days = frozenset(parsed_days)
+        
+        # 监控时间段，换算为分钟数；任一端缺失或格式错误时视为未配置时间范围
+        self._schedule_start_min = None
+        self._schedule_end_min = None
+        if self.schedule and self.schedule.get('start_time') and self.schedule.get('end_time'):
+            start_min = _hhmm_to_minutes(self.schedule['start_time'])
+            end_min = _hhmm_to_minutes(self.schedule['end_time'])
+            if start_min is None or end_min is None:
+                logger.warning("定时监控时间格式错误: %s-%s",
+                               self.schedule['start_time'], self.schedule['end_time'])
+            else:
+                self._schedule_start_min = start_min
+                self._schedule_end_min = end_min
+    
+    def _parse_countdown_end(self) -> None:
+        """解析倒计时结束时间，配置更新时执行一次；解析失败时记为 None"""
+        self._countdown_end_dt = None
+        self._countdown_tz_aware = False
+        end_time_str = self.countdown.get('end_time') if self.countdown else None
+        if not end_time_str:
+            return
+        
+        try:
+            # 解析结束时间，支持多种格式：以 Z 结尾的 UTC 时间或本地时间
+            if end_time_str.endswith('Z'):
+                end_time_str = end_time_str[:-1] + '+00:00'
+            end_time = datetime.fromisoformat(end_time_str)
+        except Exception as e:
+            logger.error("解析倒计时结束时间失败: %s, 错误: %s", self.countdown.get('end_time'), e)
+            return
+        
+        self._countdown_end_dt = end_time
+        self._countdown_tz_aware = end_time.tzinfo is not None
+    
+    def _countdown_remaining(self, now: datetime) -> float:
+        """返回距倒计时结束的秒数（已结束时为负数），需已成功解析结束时间"""
+        current_time = now.astimezone(timezone.utc) if self._countdown_tz_aware else now
+        return (self._countdown_end_dt - current_time).total_seconds()
+    
+    def _check_scheduled_time(self, now: datetime) -> bool:
         """检查定时监控时间
         
+        Args:
+            now: 当前本地时间
+        
         Returns:
             bool: True表示在监控时间内，False表示不在监控时间内
         """
@@ -86,35 +218,33 @@ class MonitorConfig:
             logger.debug("定时监控配置为空，默认允许监控")
             return True
         
-        now = datetime.now()
-        current_weekday = str(now.weekday() + 1)  # 1=周一, 7=周日
-        current_time = now.strftime('%H:%M')
-        
         # 检查是否在监控日期内
-        days = self.schedule.get('days', [])
-        if days and current_weekday not in days:
-            logger.debug("当前日期(%s)不在监控日期内(%s)", current_weekday, days)
+        current_weekday = now.weekday() + 1  # 1=周一, 7=周日
+        if self._schedule_days is not None and current_weekday not in self._schedule_days:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("当前日期(%d)不在监控日期内(%s)", current_weekday, self.schedule.get('days'))
             return False
         
         # 检查是否在监控时间内
-        start_time = self.schedule.get('start_time')
-        end_time = self.schedule.get('end_time')
-        
-        if start_time and end_time:
-            if start_time <= current_time <= end_time:
-                logger.debug("当前时间(%s)在监控时间内(%s-%s)", current_time, start_time, end_time)
-                return True
-            else:
-                logger.debug("当前时间(%s)不在监控时间内(%s-%s)", current_time, start_time, end_time)
-                return False
+        if self._schedule_start_min is not None:
+            current_min = now.hour * 60 + now.minute
+            in_range = self._schedule_start_min <= current_min <= self._schedule_end_min
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("当前时间(%02d:%02d)%s监控时间内(%s-%s)",
+                             now.hour, now.minute, "在" if in_range else "不在",
+                             self.schedule.get('start_time'), self.schedule.get('end_time'))
+            return in_range
         
         # 如果没有配置时间范围，默认允许监控
         logger.debug("未配置监控时间范围，默认允许监控")
         return True
     
-    def _check_countdown_time(self) -> bool:
+    def _check_countdown_time(self, now: datetime) -> bool:
         """检查倒计时监控时间
         
+        Args:
+            now: 当前本地时间
+        
         Returns:
             bool: True表示倒计时未结束，False表示倒计时已结束
         """
@@ -122,73 +252,53 @@ class MonitorConfig:
             logger.debug("倒计时监控配置为空，默认不允许监控")
             return False
         
-        end_time_str = self.countdown.get('end_time')
-        if not end_time_str:
+        if not self.countdown.get('end_time'):
             logger.debug("倒计时监控未配置结束时间，默认不允许监控")
             return False
         
-        try:
-            # 解析结束时间，支持多种格式
-            if end_time_str.endswith('Z'):
-                # UTC时间格式
-                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                current_time = datetime.now(timezone.utc)
-            else:
-                # 本地时间格式
-                end_time = datetime.fromisoformat(end_time_str)
-                current_time = datetime.now()
-            
-            is_active = current_time < end_time
+        if self._countdown_end_dt is None:
+            # 结束时间格式错误，已在更新配置时记录
+            return False
+        
+        remaining = self._countdown_remaining(now)
+        is_active = remaining > 0
+        if logger.isEnabledFor(logging.DEBUG):
             if is_active:
-                remaining = end_time - current_time
-                logger.debug("倒计时监控活跃，剩余时间: %s", remaining)
+                logger.debug("倒计时监控活跃，剩余时间: %s", timedelta(seconds=remaining))
             else:
                 logger.debug("倒计时监控已结束")
-            
-            return is_active
-            
-        except Exception as e:
-            logger.error("解析倒计时结束时间失败: %s, 错误: %s", end_time_str, e)
-            return False
+        
+        return is_active
     
     def get_status_info(self) -> Dict[str, Any]:
         """获取当前监控状态信息
         
         Returns:
-            Dict: 包含监控状态的详细信息
+            Dict: 包含监控状态的详细信息；其中 schedule/countdown 为共享的
+                配置快照，调用方不应修改
         """
+        now = datetime.now()
         info = {
             'mode': self.mode,
-            'is_monitoring_time': self.is_monitoring_time(),
-            'last_update': self.last_update.isoformat()
+            'is_monitoring_time': self.is_monitoring_time(now),
+            'last_update': self._last_update_iso
         }
         
-        if self.mode == 'SCHEDULED':
-            info['schedule'] = self.schedule.copy()
+        if self._mode is MonitorMode.SCHEDULED:
+            info['schedule'] = self._schedule_snapshot
             if self.schedule:
-                now = datetime.now()
                 info['current_weekday'] = str(now.weekday() + 1)
-                info['current_time'] = now.strftime('%H:%M')
+                info['current_time'] = f"{now.hour:02d}:{now.minute:02d}"
         
-        elif self.mode == 'COUNTDOWN':
-            info['countdown'] = self.countdown.copy()
+        elif self._mode is MonitorMode.COUNTDOWN:
+            info['countdown'] = self._countdown_snapshot
             if self.countdown.get('end_time'):
-                try:
-                    end_time_str = self.countdown['end_time']
-                    if end_time_str.endswith('Z'):
-                        end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                        current_time = datetime.now(timezone.utc)
-                    else:
-                        end_time = datetime.fromisoformat(end_time_str)
-                        current_time = datetime.now()
-                    
-                    if current_time < end_time:
-                        remaining = end_time - current_time
-                        info['remaining_seconds'] = int(remaining.total_seconds())
-                    else:
-                        info['remaining_seconds'] = 0
-                except Exception as e:
-                    logger.error("计算剩余时间失败: %s", e)
+                if self._countdown_end_dt is not None:
+                    info['remaining_seconds'] = max(0, int(self._countdown_remaining(now)))
+                else:
                     info['remaining_seconds'] = 0
         
         return info
+    
+    # 各监控模式对应的判断函数（未绑定），按 MonitorMode 取值索引；持续监控无需判断
+    _CHECKERS = (None, _check_scheduled_time, _check_countdown_time)
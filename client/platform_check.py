@@ -1,41 +1,111 @@
 """跨平台兼容性检查模块。"""
 
+import atexit
+import functools
 import logging
+import os
 import platform
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Python 版本在进程内不会变化，导入时判断一次；检查结果只记录一次日志
+_PYTHON_OK = sys.version_info >= (3, 8)
+_python_version_logged = False
+
+
+# 以下平台信息在进程内不会变化，首次调用后缓存；platform.platform() 在部分系统上
+# 需要启动子进程查询
+@functools.lru_cache(maxsize=1)
+def _system() -> str:
+    return platform.system().lower()
+
+
+@functools.lru_cache(maxsize=1)
+def _version() -> str:
+    return platform.version()
+
+
+@functools.lru_cache(maxsize=1)
+def _arch() -> str:
+    return platform.architecture()[0]
+
+
+@functools.lru_cache(maxsize=1)
+def _system_info() -> Dict[str, str]:
+    return {
+        "system": _system(),
+        "version": _version(),
+        "architecture": _arch(),
+        "python_version": sys.version,
+        "platform": platform.platform()
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _nvml_device_count() -> int:
+    """初始化 NVML 并返回 NVIDIA 设备数量，成功后缓存，每个进程只初始化一次"""
+    import pynvml
+    pynvml.nvmlInit()
+    atexit.register(pynvml.nvmlShutdown)
+    return pynvml.nvmlDeviceGetCount()
+
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_amd_gpus() -> tuple:
+    """返回 /sys/class/drm 下 AMD 显卡的名称（如 card0）。
+
+    GPU 拓扑在开机后基本不变，结果在进程内缓存，只遍历一次 sysfs。
+    """
+    amd_cards = []
+    try:
+        with os.scandir("/sys/class/drm") as entries:
+            for entry in entries:
+                # 只检查 cardN，排除 card0-DP-1 等显示接口
+                if not (entry.name.startswith("card") and entry.name[4:].isdigit()):
+                    continue
+                # 直接尝试打开，不存在时跳过；比较原始字节，无需解码
+                try:
+                    with open(f"{entry.path}/device/vendor", "rb") as f:
+                        if f.read().strip() == b"0x1002":  # AMD vendor ID
+                            amd_cards.append(entry.name)
+                except OSError:
+                    continue
+    except FileNotFoundError:
+        logger.debug("未找到 /sys/class/drm，跳过AMD GPU检查")
+    return tuple(amd_cards)
+
 
 class PlatformChecker:
     """平台兼容性检查器"""
     
     def __init__(self):
-        self.system = platform.system().lower()
-        self.version = platform.version()
-        self.architecture = platform.architecture()[0]
+        self.system = _system()
+        self.version = _version()
+        self.architecture = _arch()
+        # 系统命令探测结果，首次检查后缓存，run_full_check 中多处复用
+        self._cmd_results: Optional[Dict[str, bool]] = None
         
     def get_system_info(self) -> Dict[str, str]:
         """获取系统信息"""
-        return {
-            "system": self.system,
-            "version": self.version,
-            "architecture": self.architecture,
-            "python_version": sys.version,
-            "platform": platform.platform()
-        }
+        # 返回副本，避免调用方修改缓存内容
+        return dict(_system_info())
     
     def check_python_version(self) -> bool:
         """检查Python版本是否满足要求"""
-        version_info = sys.version_info
-        if version_info.major >= 3 and version_info.minor >= 8:
-            logger.info("Python版本检查通过: %s", sys.version)
-            return True
-        else:
-            logger.error("Python版本过低，需要Python 3.8+，当前版本: %s", sys.version)
-            return False
+        global _python_version_logged
+        if not _python_version_logged:
+            _python_version_logged = True
+            if _PYTHON_OK:
+                logger.info("Python版本检查通过: %s", sys.version)
+            else:
+                logger.error("Python版本过低，需要Python 3.8+，当前版本: %s", sys.version)
+        return _PYTHON_OK
     
     def check_required_modules(self) -> Dict[str, bool]:
         """检查必需的Python模块"""
@@ -57,8 +127,21 @@ class PlatformChecker:
         
         return results
     
-    def check_system_commands(self) -> Dict[str, bool]:
-        """检查系统命令可用性"""
+    def check_system_commands(self, verify_executable: bool = False) -> Dict[str, bool]:
+        """检查系统命令可用性（结果在本实例内缓存）
+        
+        Args:
+            verify_executable: 为 True 时实际执行 "<命令> --version" 验证，
+                不使用缓存；默认只在 PATH 中查找命令
+        """
+        if verify_executable:
+            return self._probe_system_commands(verify_executable=True)
+        if self._cmd_results is None:
+            self._cmd_results = self._probe_system_commands()
+        return self._cmd_results
+    
+    def _probe_system_commands(self, verify_executable: bool = False) -> Dict[str, bool]:
+        """逐个探测系统命令是否可用"""
         commands = {}
         
         if self.system == "linux":
@@ -83,15 +166,21 @@ class PlatformChecker:
         
         results = {}
         for cmd, description in commands.items():
-            try:
-                subprocess.run([cmd, "--version"], 
-                             capture_output=True, 
-                             timeout=5, 
-                             check=False)
-                results[cmd] = True
+            # 默认只在 PATH 中查找，无需启动子进程
+            available = shutil.which(cmd) is not None
+            if available and verify_executable:
+                try:
+                    subprocess.run([cmd, "--version"], 
+                                 capture_output=True, 
+                                 timeout=5, 
+                                 check=False)
+                except (OSError, subprocess.TimeoutExpired):
+                    available = False
+            
+            results[cmd] = available
+            if available:
                 logger.info("命令 %s (%s) 可用", cmd, description)
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                results[cmd] = False
+            else:
                 if cmd in ["radeontop", "rocm-smi"]:
                     logger.debug("可选命令 %s (%s) 不可用", cmd, description)
                 else:
@@ -108,9 +197,7 @@ class PlatformChecker:
         
         # 检查NVIDIA支持
         try:
-            import pynvml
-            pynvml.nvmlInit()
-            device_count = pynvml.nvmlDeviceGetCount()
+            device_count = _nvml_device_count()
             results["nvidia"] = device_count > 0
             logger.info("NVIDIA GPU支持: %s (%d个设备)", 
                        "是" if results["nvidia"] else "否", device_count)
@@ -120,20 +207,10 @@ class PlatformChecker:
         # 检查AMD支持（仅Linux）
         if self.system == "linux":
             try:
-                import os
-                drm_path = "/sys/class/drm"
-                if os.path.exists(drm_path):
-                    amd_cards = []
-                    for entry in os.listdir(drm_path):
-                        if entry.startswith("card"):
-                            vendor_path = os.path.join(drm_path, entry, "device/vendor")
-                            if os.path.exists(vendor_path):
-                                with open(vendor_path, "r") as f:
-                                    if f.read().strip() == "0x1002":  # AMD vendor ID
-                                        amd_cards.append(entry)
-                    results["amd"] = len(amd_cards) > 0
-                    logger.info("AMD GPU支持: %s (%d个设备)", 
-                               "是" if results["amd"] else "否", len(amd_cards))
+                amd_cards = _detect_amd_gpus()
+                results["amd"] = len(amd_cards) > 0
+                logger.info("AMD GPU支持: %s (%d个设备)", 
+                           "是" if results["amd"] else "否", len(amd_cards))
             except Exception as e:
                 logger.debug("AMD GPU检查失败: %s", e)
         
@@ -175,14 +252,23 @@ class PlatformChecker:
         """运行完整的兼容性检查"""
         logger.info("开始平台兼容性检查...")
         
-        results = {
-            "system_info": self.get_system_info(),
-            "python_version_ok": self.check_python_version(),
-            "required_modules": self.check_required_modules(),
-            "system_commands": self.check_system_commands(),
-            "gpu_support": self.check_gpu_support(),
-            "limitations": self.get_platform_limitations()
-        }
+        # 各项探测互不依赖，且以导入模块、查找命令、读取 sysfs 等等待为主，并行执行
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="platform-check") as pool:
+            system_info = pool.submit(self.get_system_info)
+            required_modules = pool.submit(self.check_required_modules)
+            system_commands = pool.submit(self.check_system_commands)
+            gpu_support = pool.submit(self.check_gpu_support)
+            python_version_ok = self.check_python_version()
+            
+            results = {
+                "system_info": system_info.result(),
+                "python_version_ok": python_version_ok,
+                "required_modules": required_modules.result(),
+                "system_commands": system_commands.result(),
+                "gpu_support": gpu_support.result(),
+                # 命令探测已完成，这里直接使用缓存结果
+                "limitations": self.get_platform_limitations()
+            }
         
         # 总结
         all_modules_ok = all(results["required_modules"].values())
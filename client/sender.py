@@ -1,36 +1,371 @@
 """将缓存中的数据发送到服务端。"""
 
+import gzip
 import json
 import logging
-from typing import List, Dict, Any
+import platform
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:  # MessagePack 编码，数值为主的指标数据体积更小、编解码更快
+    import msgspec
+except ImportError:  # pragma: no cover - 可选依赖
+    msgspec = None
 
 from .cache import Cache
-from .config import API_ENDPOINT, SEND_BATCH_SIZE, RUNTIME_CONFIG
+from .config import API_ENDPOINT, MAX_BATCH_BYTES, SEND_BATCH_SIZE, RUNTIME_CONFIG
 from .timing_config import HTTP_TIMEOUT
 from .identity import get_client_id, get_auth_token
 
-# 新增: 安全浮点转换，避免 None 导致日志格式化失败
-_sf = lambda v: 0.0 if v is None else v  # noqa: E731
-
 logger = logging.getLogger(__name__)
 
+# 请求体序列化与响应解析；orjson 直接输出/解析字节，数值较多的指标数据编解码更快
+if orjson is not None:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+    _json_loads = json.loads
+
+# 服务端在响应头中声明 X-Accept-Msgpack: 1 后，上报改用 MessagePack 编码
+_MSGPACK_TYPE = "application/msgpack"
+if msgspec is not None:
+    _msgpack_dumps = msgspec.msgpack.Encoder().encode
+    _msgpack_decoder = msgspec.msgpack.Decoder()
+
+    def _msgpack_loads(body: bytes) -> Any:
+        # 与 JSON 解析失败一样抛出 ValueError，便于调用方统一处理
+        try:
+            return _msgpack_decoder.decode(body)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+else:
+    _msgpack_dumps = None
+    _msgpack_loads = None
+
+# 新版本服务端不返回磁盘 paths 字段时使用的默认监控路径，按运行平台确定一次
+_DEFAULT_DISK_PATHS = ["C:\\"] if platform.system().lower() == "windows" else ["/"]
+
+# 日志中字节数换算为 GB 的除数
+_GIB = 1024 ** 3
+
+# 日志中记录响应体时最多保留的字节数
+_LOG_BODY_LIMIT = 512
+
+# 连续发送失败时，ERROR 级别日志的最小间隔（秒），期间的失败降级为 DEBUG
+_ERROR_LOG_INTERVAL = 30.0
+
+# 指标字段键名缩短表。服务端在响应头中声明 X-Schema: v2 后才启用，
+# 启用后请求同样带上该头，由服务端按反向映射还原
+_SCHEMA_V2 = "v2"
+_KEY_MAP = {
+    "usage_percent": "up",
+    "frequency_mhz": "fm",
+    "temperature_c": "tc",
+    "power_w": "pw",
+    "util_percent": "utp",
+    "memory_util_percent": "mup",
+    "memory_total": "mt",
+    "memory_used": "mu",
+    "mountpoint": "mp",
+    "percent": "pc",
+    "available": "av",
+}
+
+# 积压时合并发送的单批条数上限，避免一次读出过多缓存数据
+_MAX_BATCH_ROWS = 1000
+
+# 批量上报的请求体达到该大小才做 gzip 压缩，过小的请求体压缩收益不抵开销
+_GZIP_MIN_BYTES = 512
+
+
+
+class ResponseOutcome(Enum):
+    """上报请求的处理结果"""
+    ACCEPTED = "accepted"  # 服务端接受，返回的配置已应用
+    UNPARSED = "unparsed"  # 数据已送达，但响应解析或配置更新失败
+    DELETED = "deleted"    # 设备已被删除，已触发删除回调
+    REJECTED = "rejected"  # 服务端拒绝上报或已停用监控
+    FAILED = "failed"      # 服务端返回错误状态码
+
+
+def _loads_response(resp: requests.Response, body: bytes) -> Any:
+    """按响应的 Content-Type 解码响应体，默认按 JSON 解析"""
+    if _msgpack_loads is not None and resp.headers.get("Content-Type", "").startswith(_MSGPACK_TYPE):
+        return _msgpack_loads(body)
+    return _json_loads(body)
+
+
+def _preview(body: bytes) -> str:
+    """截取响应体开头部分用于日志，避免异常的大响应拖慢日志"""
+    return body[:_LOG_BODY_LIMIT].decode("utf-8", "replace")
+
+
+def _shrink(obj: Any) -> Any:
+    """按 _KEY_MAP 缩短嵌套 dict/list 中的键名。
+
+    返回新的容器结构，原数据不被修改（发送失败时原数据还要写入缓存），
+    叶子值直接引用不复制；用显式栈遍历，不递归。
+    """
+    key_map = _KEY_MAP
+    root = [obj]
+    stack = [(root, 0)]
+    while stack:
+        parent, slot = stack.pop()
+        value = parent[slot]
+        if isinstance(value, dict):
+            value = {key_map.get(k, k): v for k, v in value.items()}
+            stack.extend((value, k) for k, v in value.items() if isinstance(v, (dict, list)))
+        elif isinstance(value, list):
+            value = list(value)
+            stack.extend((value, i) for i, v in enumerate(value) if isinstance(v, (dict, list)))
+        parent[slot] = value
+    return root[0]
+
+
+def _merge_monitor_items(monitor_items: Dict[str, Dict[str, Any]]) -> None:
+    """将服务端返回的监控项配置合并到运行时配置，变化的项记录日志"""
+    current_items = RUNTIME_CONFIG["monitor_items"]
+    # 服务端配置通常不变，整体相等时直接跳过
+    if monitor_items == current_items:
+        return
+    for item, config in monitor_items.items():
+        current = current_items.setdefault(item, {})
+        # 只处理有变化的监控项
+        if current == config:
+            continue
+
+        for key, value in config.items():
+            old_value = current.get(key)
+            current[key] = value
+
+            if old_value != value:
+                if key == "enabled":
+                    logger.info("监控项 %s 已%s", item, "启用" if value else "禁用")
+                elif key == "paths":
+                    logger.info("监控项 %s 路径已更新: %s", item, value)
+                else:
+                    logger.info("监控项 %s 的 %s 已%s",
+                        item, key, "启用" if value else "禁用")
+
+        # 特殊处理磁盘监控配置兼容性
+        if item == "disk" and "paths" not in config:
+            # 新版本服务端不返回paths字段，保持客户端默认配置
+            if "paths" not in current:
+                current["paths"] = list(_DEFAULT_DISK_PATHS)
+                logger.info("磁盘监控配置兼容性处理: 使用默认路径 %s", current["paths"])
+
+
+def create_session() -> requests.Session:
+    """创建上报用的 HTTP 会话。
+
+    会话内的连接池保持 keep-alive，连续上报复用同一个 TCP/TLS 连接；
+    建立连接失败时由适配器在本次调用内退避重试，此时请求尚未发出，重发安全。
+    读超时和 5xx 响应不重试：服务端可能已处理过该请求，重发 POST 会导致重复
+    上报或重复注册，交给下一轮上报处理。
+    """
+    session = requests.Session()
+    retry = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.3)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
 
 class Sender:
     """负责从本地缓存取出数据并发送到服务端。"""
 
-    def __init__(self, cache: Cache, deletion_callback=None, monitor_config=None):
+    def __init__(self, cache: Cache, deletion_callback=None, monitor_config=None,
+                 session: Optional[requests.Session] = None):
         self.cache = cache
         self.deletion_callback = deletion_callback  # 删除回调函数
         self.monitor_config = monitor_config  # 监控配置管理器
-        # 不再在构造时固定client_id和token，而是每次发送时动态获取
+        # 上一次以 ERROR 级别记录发送失败的时间（monotonic）
+        self._last_err_ts = float("-inf")
+        # 服务端以 415 拒绝压缩请求体后不再压缩
+        self._gzip_ok = True
+        # 服务端是否支持缩短键名的 v2 格式，由最近一次成功响应的 X-Schema 头决定
+        self._schema_v2 = False
+        # 服务端是否接受 MessagePack 请求体，由最近一次成功响应的 X-Accept-Msgpack 头决定
+        self._msgpack_ok = False
+        # 所有上报共用一个会话，未传入时自行创建
+        self._session = session if session is not None else create_session()
+        # 缓存数据在单独的线程中上报，采集循环无需等待网络往返
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sender")
+        self._pending: Optional[Future] = None
+        # 最近一次服务端确认接收上报数据的时间（monotonic），由发送线程更新
+        self.last_success = float("-inf")
+        # 不再在构造时固定client_id和token，而是每次发送时动态获取；
+        # 认证头按 client_id 缓存，client_id 变化（重新生成）后才重建
+        self._auth_cache: Tuple[Optional[str], Dict[str, str]] = (None, {})
+
+    def _encode(self, payload: Any, compress: bool = True) -> Tuple[bytes, Dict[str, str]]:
+        """序列化上报数据：服务端支持时缩短键名、使用 MessagePack，
+        compress 为 True 且请求体足够大时做 gzip 压缩。
 
-    def send_immediate(self, metrics: Dict[str, Any]) -> bool:
+        Returns:
+            (请求体, 需要额外附加的请求头)
+        """
+        headers = {}
+        if self._schema_v2:
+            payload = _shrink(payload)
+            headers["X-Schema"] = _SCHEMA_V2
+        if self._msgpack_ok:
+            body = _msgpack_dumps(payload)
+            headers["Content-Type"] = _MSGPACK_TYPE
+        else:
+            body = _json_dumps(payload)
+        if compress and self._gzip_ok and len(body) >= _GZIP_MIN_BYTES:
+            # 批量数据中各条记录的键名高度重复，最低压缩级别即可获得大部分收益
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
+
+    def _apply_server_response(self, response_data: Dict[str, Any]) -> None:
+        """根据上报成功后服务端返回的数据更新运行时配置"""
+        # 更新服务器ID（如果存在）
+        if "server_id" in response_data:
+            RUNTIME_CONFIG["server_id"] = response_data["server_id"]
+            logger.info("服务器ID: %s", response_data["server_id"])
+
+        # 更新上报间隔
+        if "report_interval" in response_data:
+            old_interval = RUNTIME_CONFIG["report_interval"]
+            new_interval = response_data["report_interval"]
+            if old_interval != new_interval:
+                logger.info("上报间隔已更新: %d -> %d 秒", old_interval, new_interval)
+                RUNTIME_CONFIG["report_interval"] = new_interval
+
+        # 更新上报URL（如果存在）
+        if "report_url" in response_data:
+            RUNTIME_CONFIG["report_url"] = response_data["report_url"]
+            logger.info("上报URL已更新: %s", response_data["report_url"])
+
+        # 更新监控项配置
+        if "monitor_items" in response_data:
+            _merge_monitor_items(response_data["monitor_items"])
+
+        # 更新监控模式配置
+        if "monitor_config" in response_data and self.monitor_config:
+            monitor_config = response_data["monitor_config"]
+            # 未变化时不重新解析，避免清空监控时段判断的缓存
+            if monitor_config != RUNTIME_CONFIG.get("monitor_config"):
+                self.monitor_config.update_config(monitor_config)
+                RUNTIME_CONFIG["monitor_config"] = monitor_config
+
+    def _auth(self) -> Tuple[str, Dict[str, str]]:
+        """返回 (client_id, 认证请求头)。返回的请求头被多次请求共用，调用方不得修改"""
+        client_id = get_client_id()
+        cached_id, headers = self._auth_cache
+        if client_id != cached_id:
+            # 附带 client_id，服务端可在读取并解压请求体之前完成鉴权
+            headers = {"X-Auth-Token": get_auth_token(), "X-Client-Id": client_id}
+            self._auth_cache = (client_id, headers)
+        return client_id, headers
+
+    def _log_failure(self, msg: str, *args: Any) -> None:
+        """记录发送失败；服务端不可用时客户端会反复失败，限制 ERROR 日志的频率"""
+        now = time.monotonic()
+        if now - self._last_err_ts >= _ERROR_LOG_INTERVAL:
+            self._last_err_ts = now
+            logger.error(msg, *args)
+        else:
+            logger.debug(msg, *args)
+
+    def _notify_deleted(self, message: str) -> None:
+        """记录设备删除日志并触发删除回调"""
+        logger.warning(message)
+        if self.deletion_callback:
+            self.deletion_callback()
+
+    def _handle_response(self, resp: requests.Response, context: str) -> ResponseOutcome:
+        """处理上报请求的响应，两种上报方式共用。
+
+        Args:
+            resp: 上报请求的响应
+            context: 日志中使用的上报方式描述，如 "数据上报"、"批量上报"
+        """
+        status_code = resp.status_code
+        # 响应体只读取一次，解析与日志共用
+        body = resp.content
+        if 200 <= status_code < 300:
+            self._schema_v2 = resp.headers.get("X-Schema") == _SCHEMA_V2
+            self._msgpack_ok = (_msgpack_dumps is not None
+                                and resp.headers.get("X-Accept-Msgpack") == "1")
+            try:
+                # 解析响应，获取新配置；按响应的 Content-Type 选择解码方式
+                response_data = _loads_response(resp, body)
+                if not isinstance(response_data, dict):
+                    raise ValueError(f"响应不是 JSON 对象: {type(response_data).__name__}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("服务端原始响应: %s", _preview(body))
+
+                # 检查响应状态
+                status = response_data.get("status")
+                if status == "deleted":
+                    self._notify_deleted(f"{context}时收到设备删除响应")
+                    return ResponseOutcome.DELETED
+                elif status != "accepted":
+                    logger.error("服务端拒绝了此次上报: %s", response_data.get("message", "未知原因"))
+                    return ResponseOutcome.REJECTED
+
+                # 检查服务器状态
+                if not response_data.get("is_active", True):
+                    logger.error("服务器已禁用监控，停止上报")
+                    return ResponseOutcome.REJECTED
+
+                # 更新配置
+                self._apply_server_response(response_data)
+                return ResponseOutcome.ACCEPTED
+            except ValueError as e:
+                logger.warning("解析服务端响应失败: %s", e)
+            except KeyError as e:
+                logger.warning("处理服务端配置时出错: %s", e)
+            # 数据已送达，仅配置解析/更新失败
+            return ResponseOutcome.UNPARSED
+
+        # 只有声明为 JSON/MessagePack 的错误响应才尝试解析，HTML 错误页等直接按文本记录
+        error_data = None
+        content_type = resp.headers.get("Content-Type", "")
+        if "json" in content_type or content_type.startswith(_MSGPACK_TYPE):
+            try:
+                error_data = _loads_response(resp, body)
+            except ValueError:
+                pass
+
+        # 检查是否是设备删除错误
+        if (status_code == 403 and isinstance(error_data, dict)
+                and error_data.get("error_code") == "DEVICE_DELETED"):
+            self._notify_deleted(f"{context}时收到设备删除错误码")
+            return ResponseOutcome.DELETED
+
+        # 能解析为JSON时格式化输出，正确显示中文
+        if error_data is not None:
+            self._log_failure("%s失败(%s): %s", context, status_code,
+                              json.dumps(error_data, ensure_ascii=False, indent=2))
+        else:
+            self._log_failure("%s失败(%s): %s", context, status_code, _preview(body))
+        return ResponseOutcome.FAILED
+
+    def send_immediate(self, metrics: Union[Dict[str, Any], bytes]) -> bool:
         """立即发送一条指标数据（不经过缓存）。
         
         Args:
-            metrics: 要发送的指标数据
+            metrics: 要发送的指标数据；也可以是调用方已编码好的 JSON
+                请求体（如心跳包），此时其中须已包含最新的 client_id
             
         Returns:
             bool: 是否发送成功
@@ -41,365 +376,209 @@ class Sender:
             return False
 
         # 动态获取最新的认证信息
-        current_client_id = get_client_id()
-        current_token = get_auth_token()
+        current_client_id, auth_headers = self._auth()
 
-        # 确保数据中包含最新的 client_id
-        metrics["client_id"] = current_client_id
+        if isinstance(metrics, bytes):
+            # 已编码的请求体原样发送，日志部分按空数据处理
+            body = metrics
+            metrics = {}
+        else:
+            # 确保数据中包含最新的 client_id
+            metrics["client_id"] = current_client_id
+            body = None
 
         try:
-            headers = {
-                "X-Auth-Token": current_token,
-                "Content-Type": "application/json"
-            }
+            # Content-Type 已设置在会话上，这里只需附带动态的认证令牌
+            headers = auth_headers
+            if body is None:
+                body, extra_headers = self._encode(metrics, compress=False)
+                if extra_headers:
+                    headers = {**auth_headers, **extra_headers}
             logger.info("立即发送指标到 %s", report_url)
-            resp = requests.post(
+            resp = self._session.post(
                 report_url,
-                json=metrics,
+                data=body,
                 timeout=HTTP_TIMEOUT,
-                headers=headers
+                headers=headers,
             )
-            
-            if 200 <= resp.status_code < 300:
-                try:
-                    # 解析响应，获取新配置
-                    response_data = resp.json()
-                    logger.info("服务端原始响应: %s", resp.text)
-                    
-                    # 检查响应状态
-                    status = response_data.get("status")
-                    if status == "deleted":
-                        logger.warning("数据上报时收到设备删除响应")
-                        if self.deletion_callback:
-                            self.deletion_callback()
-                        return False
-                    elif status != "accepted":
-                        logger.error("服务端拒绝了此次上报: %s", response_data.get("message", "未知原因"))
-                        return False
-
-                    # 检查服务器状态
-                    if not response_data.get("is_active", True):
-                        logger.error("服务器已禁用监控，停止上报")
-                        return False
-                    
-                    # 更新配置
-                    
-                    
-                    # 更新服务器ID（如果存在）
-                    if "server_id" in response_data:
-                        RUNTIME_CONFIG["server_id"] = response_data["server_id"]
-                        logger.info("服务器ID: %s", response_data["server_id"])
-                    
-                    # 更新上报间隔
-                    if "report_interval" in response_data:
-                        old_interval = RUNTIME_CONFIG["report_interval"]
-                        new_interval = response_data["report_interval"]
-                        if old_interval != new_interval:
-                            logger.info("上报间隔已更新: %d -> %d 秒", old_interval, new_interval)
-                            RUNTIME_CONFIG["report_interval"] = new_interval
-                    
-                    # 更新上报URL（如果存在）
-                    if "report_url" in response_data:
-                        RUNTIME_CONFIG["report_url"] = response_data["report_url"]
-                        logger.info("上报URL已更新: %s", response_data["report_url"])
-                    
-                    # 更新监控项配置
-                    if "monitor_items" in response_data:
-                        for item, config in response_data["monitor_items"].items():
-                            if item not in RUNTIME_CONFIG["monitor_items"]:
-                                RUNTIME_CONFIG["monitor_items"][item] = {}
-
-                            for key, value in config.items():
-                                old_value = RUNTIME_CONFIG["monitor_items"][item].get(key)
-                                RUNTIME_CONFIG["monitor_items"][item][key] = value
-
-                                if old_value != value:
-                                    if key == "enabled":
-                                        logger.info("监控项 %s 已%s", item, "启用" if value else "禁用")
-                                    elif key == "paths":
-                                        logger.info("监控项 %s 路径已更新: %s", item, value)
-                                    else:
-                                        logger.info("监控项 %s 的 %s 已%s",
-                                            item, key, "启用" if value else "禁用")
-
-                            # 特殊处理磁盘监控配置兼容性
-                            if item == "disk" and "paths" not in config:
-                                # 新版本服务端不返回paths字段，保持客户端默认配置
-                                if "paths" not in RUNTIME_CONFIG["monitor_items"][item]:
-                                    import platform
-                                    system = platform.system().lower()
-                                    if system == "windows":
-                                        RUNTIME_CONFIG["monitor_items"][item]["paths"] = ["C:\\"]
-                                    else:
-                                        RUNTIME_CONFIG["monitor_items"][item]["paths"] = ["/"]
-                                    logger.info("磁盘监控配置兼容性处理: 使用默认路径 %s",
-                                               RUNTIME_CONFIG["monitor_items"][item]["paths"])
-
-                    # 更新监控模式配置
-                    if "monitor_config" in response_data and self.monitor_config:
-                        self.monitor_config.update_config(response_data["monitor_config"])
-                        RUNTIME_CONFIG["monitor_config"] = response_data["monitor_config"]
-                    
-                    logger.info("成功发送实时数据")
-                    # 打印发送的数据内容
-                    logger.info("上报数据详情:")
-                    if "cpu" in metrics:
-                        logger.info("  CPU %s (%d核%d线程): 使用率=%.1f%%, 频率=%.1fMHz, 温度=%.1f°C, 功耗=%.1fW",
-                            metrics["cpu"].get("name", "Unknown"),
-                            metrics["cpu"].get("cores", 0),
-                            metrics["cpu"].get("threads", 0),
-                            _sf(metrics["cpu"].get("usage_percent")),
-                            _sf(metrics["cpu"].get("frequency_mhz")),
-                            _sf(metrics["cpu"].get("temperature_c")),
-                            _sf(metrics["cpu"].get("power_w")))
-                    if "memory" in metrics:
-                        logger.info("  内存: 频率=%.1fMHz, 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
-                            _sf(metrics["memory"].get("frequency_mhz")),
-                            metrics["memory"].get("percent", 0),
-                            metrics["memory"].get("used", 0) / 1024**3,
-                            metrics["memory"].get("total", 0) / 1024**3)
-                    if "disk" in metrics:
-                        for disk in metrics["disk"]:
-                            logger.info("  磁盘 %s (%s): 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
-                                disk.get("mountpoint", "unknown"),
-                                disk.get("model") or "unknown",
-                                disk.get("percent", 0),
-                                disk.get("used", 0) / 1024**3,
-                                disk.get("total", 0) / 1024**3)
-                    if "gpus" in metrics:
-                        for gpu in metrics["gpus"]:
-                            logger.info("  GPU %s: 使用率=%.1f%%, 显存=%.1f%%, 功耗=%.1fW",
-                                gpu.get("name", "unknown"),
-                                _sf(gpu.get("util_percent")),
-                                _sf(gpu.get("memory_util_percent")),
-                                _sf(gpu.get("power_w")))
-                    return True
-                except ValueError as e:
-                    logger.warning("解析服务端响应失败: %s", e)
-                    return True  # 数据发送成功，仅配置解析失败
-                except KeyError as e:
-                    logger.warning("处理服务端配置时出错: %s", e)
-                    return True  # 数据发送成功，仅配置更新失败
-            elif resp.status_code == 403:
-                # 检查是否是设备删除错误
-                try:
-                    error_data = resp.json()
-                    if error_data.get("error_code") == "DEVICE_DELETED":
-                        logger.warning("数据上报时收到设备删除错误码")
-                        if self.deletion_callback:
-                            self.deletion_callback()
-                        return False
-                except (json.JSONDecodeError, ValueError):
-                    pass
-
-                # 尝试解析JSON并正确显示中文
-                try:
-                    error_data = resp.json()
-                    logger.error("实时发送失败(%s): %s", resp.status_code, json.dumps(error_data, ensure_ascii=False, indent=2))
-                except (json.JSONDecodeError, ValueError):
-                    logger.error("实时发送失败(%s): %s", resp.status_code, resp.text)
-                logger.error("请求数据: %s", metrics)
-                return False
-            else:
-                # 尝试解析JSON并正确显示中文
-                try:
-                    error_data = resp.json()
-                    logger.error("实时发送失败(%s): %s", resp.status_code, json.dumps(error_data, ensure_ascii=False, indent=2))
-                except (json.JSONDecodeError, ValueError):
-                    logger.error("实时发送失败(%s): %s", resp.status_code, resp.text)
-                logger.error("请求数据: %s", metrics)
+
+            outcome = self._handle_response(resp, "数据上报")
+            if outcome is ResponseOutcome.FAILED:
+                logger.debug("请求体(%d字节)", len(body))
+            if outcome is ResponseOutcome.UNPARSED:
+                self.last_success = time.monotonic()
+                return True  # 数据发送成功，仅配置解析失败
+            if outcome is not ResponseOutcome.ACCEPTED:
                 return False
-                
-        except Exception as exc:  # pylint: disable=broad-except
-            logger.error("实时发送异常: %s", exc)
+            self.last_success = time.monotonic()
+
+            logger.info("成功发送实时数据")
+            # 打印发送的数据内容；逐项格式化的开销不小，仅在启用 DEBUG 日志时执行
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("上报数据详情:")
+                if "cpu" in metrics:
+                    logger.debug("  CPU %s (%d核%d线程): 使用率=%.1f%%, 频率=%.1fMHz, 温度=%.1f°C, 功耗=%.1fW",
+                        metrics["cpu"].get("name", "Unknown"),
+                        metrics["cpu"].get("cores", 0),
+                        metrics["cpu"].get("threads", 0),
+                        (metrics["cpu"].get("usage_percent") or 0.0),
+                        (metrics["cpu"].get("frequency_mhz") or 0.0),
+                        (metrics["cpu"].get("temperature_c") or 0.0),
+                        (metrics["cpu"].get("power_w") or 0.0))
+                if "memory" in metrics:
+                    logger.debug("  内存: 频率=%.1fMHz, 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
+                        (metrics["memory"].get("frequency_mhz") or 0.0),
+                        metrics["memory"].get("percent", 0),
+                        metrics["memory"].get("used", 0) / _GIB,
+                        metrics["memory"].get("total", 0) / _GIB)
+                if "disk" in metrics:
+                    for disk in metrics["disk"]:
+                        logger.debug("  磁盘 %s (%s): 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
+                            disk.get("mountpoint", "unknown"),
+                            disk.get("model") or "unknown",
+                            disk.get("percent", 0),
+                            disk.get("used", 0) / _GIB,
+                            disk.get("total", 0) / _GIB)
+                if "gpus" in metrics:
+                    for gpu in metrics["gpus"]:
+                        logger.debug("  GPU %s: 使用率=%.1f%%, 显存=%.1f%%, 功耗=%.1fW",
+                            gpu.get("name", "unknown"),
+                            (gpu.get("util_percent") or 0.0),
+                            (gpu.get("memory_util_percent") or 0.0),
+                            (gpu.get("power_w") or 0.0))
+            return True
+
+        except requests.RequestException as exc:
+            self._log_failure("实时发送异常: %s", exc)
             return False
 
+    def send_in_background(self) -> bool:
+        """在后台线程中发送缓存数据，立即返回。
+
+        上一批仍在发送时不再提交新任务，本轮数据留在缓存中，下次发送时一并上报。
+
+        Returns:
+            bool: 是否提交了新的发送任务
+        """
+        pending = self._pending
+        if pending is not None and not pending.done():
+            logger.debug("上一批数据仍在发送中，本轮数据留在缓存中稍后发送")
+            return False
+        self._pending = self._executor.submit(self._send_logged)
+        return True
+
+    def _send_logged(self) -> None:
+        """后台任务入口，异常只记录日志，不会静默丢失在 Future 中"""
+        try:
+            self.send()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("后台上报时发生异常")
+
     def send(self) -> None:
         """尝试发送未上报的数据。
 
-        发送成功后在本地缓存中标记 sent=1；发送失败则保留稍后重试。"""
+        发送成功后在本地缓存中标记 sent=1；发送失败则保留稍后重试。
+        缓存有积压时连续发送直到清空，且在请求体不超过 MAX_BATCH_BYTES
+        的前提下逐批加倍条数，把积压数据合并到更少的请求中。"""
         # 如果未配置上报地址，跳过发送
         if not API_ENDPOINT:
             logger.debug("未配置上报地址，跳过发送")
             return
 
-        batch = self.cache.get_unsent(SEND_BATCH_SIZE)
+        limit = SEND_BATCH_SIZE
+        while True:
+            result = self._send_batch(limit)
+            if result is None:
+                return
+            sent_count, body_size = result
+            if sent_count < limit:
+                return  # 积压已清空
+            if body_size * 2 <= MAX_BATCH_BYTES and limit < _MAX_BATCH_ROWS:
+                limit = min(limit * 2, _MAX_BATCH_ROWS)
+            logger.info("缓存仍有积压，继续发送（下一批最多 %d 条）", limit)
+
+    def _send_batch(self, limit: int) -> Optional[Tuple[int, int]]:
+        """从缓存取出最多 limit 条数据发送一次。
+
+        Returns:
+            成功时返回 (发送条数, 请求体字节数)；无数据或发送失败时返回 None
+        """
+        batch = self.cache.get_unsent(limit)
         if not batch:
-            return
+            return None
 
         # 动态获取最新的认证信息
-        current_client_id = get_client_id()
-        current_token = get_auth_token()
-
-        # 对缓存数据做一次补丁，保证 GPU 数值字段不是 None，并更新client_id
-        payload: List[dict] = []
-        for item in batch:
-            data = item["data"]
-            # 更新为最新的client_id（防止使用缓存中的旧client_id）
-            data["client_id"] = current_client_id
+        current_client_id, headers = self._auth()
 
-            for gpu in data.get("gpus", []):
-                for key in ("memory_total", "memory_used", "memory_util_percent", "util_percent", "frequency_mhz"):
-                    if gpu.get(key) is None:
-                        gpu[key] = 0
-            payload.append(data)
+        # GPU 数值字段已在写入缓存时补齐，这里只需更新为最新的client_id
+        # （防止使用缓存中的旧client_id）
+        payload: List[dict] = [item["data"] for item in batch]
+        for data in payload:
+            data["client_id"] = current_client_id
         ids = [item["id"] for item in batch]
 
         report_url = RUNTIME_CONFIG.get("report_url", API_ENDPOINT)
 
-        # 准备HTTP请求
-        headers = {
-            "X-Auth-Token": current_token,
-            "Content-Type": "application/json"
-        }
+        # 准备HTTP请求，Content-Type 已设置在会话上
+        body, extra_headers = self._encode(payload)
         
         logger.info("发送 %d 条缓存指标到 %s", len(payload), report_url)
 
         try:
-            resp = requests.post(report_url, json=payload, timeout=HTTP_TIMEOUT, headers=headers)
-            if 200 <= resp.status_code < 300:
-                try:
-                    # 解析响应，获取新配置
-                    response_data = resp.json()
-                    logger.info("服务端原始响应: %s", resp.text)
-                    
-                    # 检查响应状态
-                    status = response_data.get("status")
-                    if status == "deleted":
-                        logger.warning("批量上报时收到设备删除响应")
-                        if self.deletion_callback:
-                            self.deletion_callback()
-                        return
-                    elif status != "accepted":
-                        logger.error("服务端拒绝了此次上报: %s", response_data.get("message", "未知原因"))
-                        return
-
-                    # 检查服务器状态
-                    if not response_data.get("is_active", True):
-                        logger.error("服务器已禁用监控，停止上报")
-                        return False
-                    
-                    # 更新配置
-                    
-                    
-                    # 更新服务器ID（如果存在）
-                    if "server_id" in response_data:
-                        RUNTIME_CONFIG["server_id"] = response_data["server_id"]
-                        logger.info("服务器ID: %s", response_data["server_id"])
-                    
-                    # 更新上报间隔
-                    if "report_interval" in response_data:
-                        old_interval = RUNTIME_CONFIG["report_interval"]
-                        new_interval = response_data["report_interval"]
-                        if old_interval != new_interval:
-                            logger.info("上报间隔已更新: %d -> %d 秒", old_interval, new_interval)
-                            RUNTIME_CONFIG["report_interval"] = new_interval
-                    
-                    # 更新上报URL（如果存在）
-                    if "report_url" in response_data:
-                        RUNTIME_CONFIG["report_url"] = response_data["report_url"]
-                        logger.info("上报URL已更新: %s", response_data["report_url"])
-                    
-                    # 更新监控项配置
-                    if "monitor_items" in response_data:
-                        for item, config in response_data["monitor_items"].items():
-                            if item not in RUNTIME_CONFIG["monitor_items"]:
-                                RUNTIME_CONFIG["monitor_items"][item] = {}
-
-                            for key, value in config.items():
-                                old_value = RUNTIME_CONFIG["monitor_items"][item].get(key)
-                                RUNTIME_CONFIG["monitor_items"][item][key] = value
-
-                                if old_value != value:
-                                    if key == "enabled":
-                                        logger.info("监控项 %s 已%s", item, "启用" if value else "禁用")
-                                    elif key == "paths":
-                                        logger.info("监控项 %s 路径已更新: %s", item, value)
-                                    else:
-                                        logger.info("监控项 %s 的 %s 已%s",
-                                            item, key, "启用" if value else "禁用")
-
-                            # 特殊处理磁盘监控配置兼容性
-                            if item == "disk" and "paths" not in config:
-                                # 新版本服务端不返回paths字段，保持客户端默认配置
-                                if "paths" not in RUNTIME_CONFIG["monitor_items"][item]:
-                                    import platform
-                                    system = platform.system().lower()
-                                    if system == "windows":
-                                        RUNTIME_CONFIG["monitor_items"][item]["paths"] = ["C:\\"]
-                                    else:
-                                        RUNTIME_CONFIG["monitor_items"][item]["paths"] = ["/"]
-                                    logger.info("磁盘监控配置兼容性处理: 使用默认路径 %s",
-                                               RUNTIME_CONFIG["monitor_items"][item]["paths"])
-
-                    # 更新监控模式配置
-                    if "monitor_config" in response_data and self.monitor_config:
-                        self.monitor_config.update_config(response_data["monitor_config"])
-                        RUNTIME_CONFIG["monitor_config"] = response_data["monitor_config"]
-                    
-                    # 标记数据已发送
-                    self.cache.mark_sent(ids)
-                    logger.info("成功发送 %d 条采集数据", len(ids))
-                    
-                    # 打印发送的数据内容
-                    for idx, data in enumerate(payload, 1):
-                        logger.info("数据 %d/%d:", idx, len(payload))
-                        if "cpu" in data:
-                            logger.info("  CPU: 使用率=%.1f%%, 温度=%.1f°C, 功耗=%.1fW",
-                                _sf(data["cpu"].get("usage_percent")),
-                                _sf(data["cpu"].get("temperature_c")),
-                                _sf(data["cpu"].get("power_w")))
-                        if "memory" in data:
-                            logger.info("  内存: 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
-                                data["memory"].get("percent", 0),
-                                data["memory"].get("used", 0) / 1024**3,
-                                data["memory"].get("total", 0) / 1024**3)
-                        if "disk" in data:
-                            for disk in data["disk"]:
-                                logger.info("  磁盘 %s (%s): 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
-                                    disk.get("mountpoint", "unknown"),
-                                    disk.get("model") or "unknown",
-                                    disk.get("percent", 0),
-                                    disk.get("used", 0) / 1024**3,
-                                    disk.get("total", 0) / 1024**3)
-                        if "gpus" in data:
-                            for gpu in data["gpus"]:
-                                logger.info("  GPU %s: 频率=%.1fMHz, 使用率=%.1f%%, 显存=%.1f%%, 功耗=%.1fW",
-                                    gpu.get("name", "unknown"),
-                                    _sf(gpu.get("frequency_mhz")),
-                                    _sf(gpu.get("util_percent")),
-                                    _sf(gpu.get("memory_util_percent")),
-                                    _sf(gpu.get("power_w")))
-                except ValueError as e:
-                    logger.warning("解析服务端响应失败: %s", e)
-                except KeyError as e:
-                    logger.warning("处理服务端配置时出错: %s", e)
-            elif resp.status_code == 403:
-                # 检查是否是设备删除错误
-                try:
-                    error_data = resp.json()
-                    if error_data.get("error_code") == "DEVICE_DELETED":
-                        logger.warning("批量上报时收到设备删除错误码")
-                        if self.deletion_callback:
-                            self.deletion_callback()
-                        return
-                except (json.JSONDecodeError, ValueError):
-                    pass
-
-                # 尝试解析JSON并正确显示中文
-                try:
-                    error_data = resp.json()
-                    logger.error("上报失败(%s): %s", resp.status_code, json.dumps(error_data, ensure_ascii=False, indent=2))
-                except (json.JSONDecodeError, ValueError):
-                    logger.error("上报失败(%s): %s", resp.status_code, resp.text)
-                logger.error("请求数据: %s", payload)
-            else:
-                # 尝试解析JSON并正确显示中文
-                try:
-                    error_data = resp.json()
-                    logger.error("上报失败(%s): %s", resp.status_code, json.dumps(error_data, ensure_ascii=False, indent=2))
-                except (json.JSONDecodeError, ValueError):
-                    logger.error("上报失败(%s): %s", resp.status_code, resp.text)
-                logger.error("请求数据: %s", payload)
-        except Exception as exc:  # pylint: disable=broad-except
-            logger.error("上报时发生异常: %s", exc) 
\ No newline at end of file
+            resp = self._session.post(report_url, data=body, timeout=HTTP_TIMEOUT,
+                                      headers={**headers, **extra_headers})
+            if resp.status_code == 415 and "Content-Encoding" in extra_headers:
+                # 服务端不支持压缩请求体，解压出已序列化的请求体重试一次，无需重新编码
+                logger.warning("服务端不支持 gzip 请求体，改为不压缩发送")
+                self._gzip_ok = False
+                body = gzip.decompress(body)
+                del extra_headers["Content-Encoding"]
+                resp = self._session.post(report_url, data=body, timeout=HTTP_TIMEOUT,
+                                          headers={**headers, **extra_headers})
+
+            outcome = self._handle_response(resp, "批量上报")
+            if outcome is ResponseOutcome.FAILED:
+                logger.debug("请求体(%d字节)", len(body))
+            if outcome is not ResponseOutcome.ACCEPTED:
+                return None
+
+            # 标记数据已发送
+            self.cache.mark_sent(ids)
+            self.last_success = time.monotonic()
+            logger.info("成功发送 %d 条采集数据", len(ids))
+
+            # 打印发送的数据内容；逐条格式化的开销不小，仅在启用 DEBUG 日志时执行
+            if logger.isEnabledFor(logging.DEBUG):
+                for idx, data in enumerate(payload, 1):
+                    logger.debug("数据 %d/%d:", idx, len(payload))
+                    if "cpu" in data:
+                        logger.debug("  CPU: 使用率=%.1f%%, 温度=%.1f°C, 功耗=%.1fW",
+                            (data["cpu"].get("usage_percent") or 0.0),
+                            (data["cpu"].get("temperature_c") or 0.0),
+                            (data["cpu"].get("power_w") or 0.0))
+                    if "memory" in data:
+                        logger.debug("  内存: 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
+                            data["memory"].get("percent", 0),
+                            data["memory"].get("used", 0) / _GIB,
+                            data["memory"].get("total", 0) / _GIB)
+                    if "disk" in data:
+                        for disk in data["disk"]:
+                            logger.debug("  磁盘 %s (%s): 使用率=%.1f%%, 已用=%.1fGB/%.1fGB",
+                                disk.get("mountpoint", "unknown"),
+                                disk.get("model") or "unknown",
+                                disk.get("percent", 0),
+                                disk.get("used", 0) / _GIB,
+                                disk.get("total", 0) / _GIB)
+                    if "gpus" in data:
+                        for gpu in data["gpus"]:
+                            logger.debug("  GPU %s: 频率=%.1fMHz, 使用率=%.1f%%, 显存=%.1f%%, 功耗=%.1fW",
+                                gpu.get("name", "unknown"),
+                                (gpu.get("frequency_mhz") or 0.0),
+                                (gpu.get("util_percent") or 0.0),
+                                (gpu.get("memory_util_percent") or 0.0),
+                                (gpu.get("power_w") or 0.0))
+        except requests.RequestException as exc:
+            self._log_failure("上报时发生异常: %s", exc)
+            return None
+
+        return len(ids), len(body) 
\ No newline at end of file
@@ -1,19 +1,38 @@
 """客户端状态管理模块，处理删除检测和状态切换。"""
 
+import atexit
+import json
 import logging
 import os
+import threading
 import time
 from enum import Enum
 from pathlib import Path
 from typing import Optional, Dict, Any
-import requests
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+from . import config
 from .config import REGISTER_URL
-from .timing_config import HTTP_TIMEOUT
-from .identity import get_client_id, get_auth_token, get_os_info
+from .timing_config import HTTP_TIMEOUT, get_sleep_retry_interval
+from .identity import get_client_id, get_auth_token, get_hostname, get_os_info, reset_client_id_cache
+from .cache import reset_cache_db
+from .sender import create_session
 
 logger = logging.getLogger(__name__)
 
+# 状态文件的序列化；orjson 直接输出/解析字节，与 json 回退实现的输出格式一致
+if orjson is not None:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+    _json_loads = json.loads
+
 
 class ClientState(Enum):
     """客户端状态枚举"""
@@ -26,86 +45,320 @@ class ClientState(Enum):
     ERROR = "error"                  # 错误状态
 
 
+# 进入这些状态后采集循环需要立即退出，重新开始注册流程
+_WAKE_STATES = frozenset({ClientState.DELETED, ClientState.REINITIALIZED, ClientState.SLEEP_RETRY})
+
+# 处于这些状态时进入休眠重注册模式
+_SLEEP_RETRY_STATES = frozenset({ClientState.REINITIALIZED, ClientState.SLEEP_RETRY})
+
+# 枚举成员是单例，热路径上预先绑定并用 is 比较
+_ERROR = ClientState.ERROR
+
+# 状态取值到枚举成员的映射，加载状态时直接查表
+_STATE_BY_VALUE = ClientState._value2member_map_
+
+# 删除通知复用的 HTTP 会话：保持 keep-alive 连接，临时错误由适配器退避重试
+_SESSION = create_session()
+
+# 使用注册URL的删除端点（需要服务端支持）
+_DELETE_URL = REGISTER_URL.replace("/register", "/delete")
+
+# 状态日志压缩的延迟时间窗口（秒），窗口内的多次触发只压缩一次
+_SAVE_DEBOUNCE = 0.5
+
+# 状态日志超过该大小（字节）时压缩为快照并清空
+_WAL_COMPACT_BYTES = 64 * 1024
+
+# 自动恢复判断的缓存时间（秒）
+_RECOVER_DECISION_TTL = 1.0
+
+# 删除标记文件的检查间隔（秒），间隔内直接返回内存中的结果
+_MARKER_CHECK_INTERVAL = 5.0
+
+
+# 状态快照与状态日志所在的目录
+_STATE_DIR = "client_data"
+
+# 支持 dir_fd 的平台（Linux 等）上只打开一次状态目录，之后的文件操作都相对于
+# 该目录句柄进行，不再每次解析完整路径，也不受工作目录变化影响；
+# 其余平台（如 Windows）回退为拼接路径
+_USE_DIR_FD = {os.open, os.rename, os.unlink} <= os.supports_dir_fd
+
+
+def _atomic_write(path: str, content: bytes, dir_fd: Optional[int] = None) -> None:
+    """先写入同目录下的临时文件并 fsync，再原子替换目标文件。
+
+    进程在写入中途崩溃时目标文件保持旧内容，不会留下被截断的空文件。
+    dir_fd 不为 None 时 path 相对于该目录句柄。
+    """
+    tmp = f"{path}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+    try:
+        os.write(fd, content)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+
+
+def _atomic_write_json(path: str, data: dict, dir_fd: Optional[int] = None) -> None:
+    """以 JSON 格式原子写入文件，见 _atomic_write"""
+    _atomic_write(path, _json_dumps(data), dir_fd)
+
+
+def _new_uuid4() -> str:
+    """由 16 个随机字节直接拼出标准格式的 UUID4 字符串，与 str(uuid.uuid4()) 等价"""
+    raw = bytearray(os.urandom(16))
+    raw[6] = (raw[6] & 0x0F) | 0x40  # 版本 4
+    raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 变体
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
 class StateManager:
     """客户端状态管理器"""
     
     def __init__(self):
         self.state = ClientState.UNREGISTERED
-        self.state_file = Path("client_state.json")
+        # 状态快照；每次状态变更只向状态日志追加一行，日志过大时再压缩进快照。
+        # 两者位于 _STATE_DIR 下，使用目录句柄时为相对于 _dir_fd 的文件名
+        self._dir_fd = self._open_state_dir()
+        if self._dir_fd is not None:
+            self.state_file = "client_state.json"
+            self.wal_file = "client_state.log"
+        else:
+            self.state_file = os.path.join(_STATE_DIR, "client_state.json")
+            self.wal_file = os.path.join(_STATE_DIR, "client_state.log")
         self.delete_marker_file = Path(".client_delete_marker")
+        # 删除标记是否存在的内存标志及上次检查文件的时间（单调时钟）
+        self._marker_present = False
+        self._marker_checked_at = float("-inf")
         self.error_start_time = 0  # 错误状态开始时间
         self.error_retry_count = 0  # 错误状态重试次数
+        # 进入需要退出采集循环的状态时置位，用于提前唤醒采集循环的等待
+        self._wake = threading.Event()
+        # 缓存的自动恢复判断及其时间（单调时钟），状态变更时失效
+        self._recover_decision = False
+        self._recover_decision_ts = float("-inf")
+        # 休眠重注册的等待，置位时提前结束休眠
+        self._retry_wake = threading.Event()
+        # 重新初始化次数，随状态一起记录，旧版本写入的 reinit_info.json 仅作初始值
+        self._reinit_count = self._read_legacy_reinit_count()
+        # 最近一次重新初始化 / 重新激活的时间戳，与状态一起记录
+        self._last_reinit_ts = 0
+        self._last_reactivation_ts = 0
+        # 状态日志压缩：_dirty 标记日志需要压缩，由定时器合并执行
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._last_flush_ts = 0.0
+        self._wal_size = 0
+        # 上次写入状态日志的内容（不含时间戳），用于跳过重复写入
+        self._last_written_blob = b""
+        # 进程退出时执行尚未完成的压缩
+        atexit.register(self._flush)
         self._load_state()
     
+    @staticmethod
+    def _open_state_dir() -> Optional[int]:
+        """创建状态目录并迁移旧版本放在工作目录下的状态文件，返回目录句柄
+
+        不支持 dir_fd 的平台返回 None。
+        """
+        os.makedirs(_STATE_DIR, exist_ok=True)
+        for name in ("client_state.json", "client_state.log"):
+            target = os.path.join(_STATE_DIR, name)
+            if os.path.exists(name) and not os.path.exists(target):
+                os.replace(name, target)
+                logger.info("状态文件已迁移到 %s", target)
+        if not _USE_DIR_FD:
+            return None
+        return os.open(_STATE_DIR, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+
+    def _opener(self, path: str, flags: int) -> int:
+        """供 open() 使用的 opener，打开状态目录中的文件"""
+        return os.open(path, flags, 0o666, dir_fd=self._dir_fd)
+
+    def close(self) -> None:
+        """写入尚未完成的压缩并关闭状态目录句柄"""
+        self._flush()
+        if self._dir_fd is not None:
+            os.close(self._dir_fd)
+            self._dir_fd = None
+
+    def _read_state_record(self) -> Optional[Dict[str, Any]]:
+        """读取状态快照并按顺序重放状态日志，返回合并后的状态记录
+
+        快照和日志均不存在时返回 None。日志末尾因崩溃而写了一半的行会被截掉。
+        """
+        record: Optional[Dict[str, Any]] = None
+        try:
+            with open(self.state_file, 'rb', opener=self._opener) as f:
+                record = _json_loads(f.read())
+        except FileNotFoundError:
+            pass
+
+        try:
+            with open(self.wal_file, 'rb', opener=self._opener) as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b""
+        if raw and not raw.endswith(b"\n"):
+            # 截掉写了一半的末行，避免后续追加的事件与其拼接到同一行
+            raw = raw[:raw.rfind(b"\n") + 1]
+            with open(self.wal_file, 'r+b', opener=self._opener) as f:
+                f.truncate(len(raw))
+        self._wal_size = len(raw)
+        lines = raw.splitlines()
+
+        for line in lines:
+            try:
+                event = _json_loads(line)
+            except ValueError:
+                logger.debug("忽略损坏的状态日志行: %r", line[:80])
+                continue
+            if record is None:
+                record = {}
+            record.update(event)
+        return record
+
     def _load_state(self) -> None:
-        """从文件加载状态"""
+        """从状态快照和状态日志加载状态"""
         try:
-            if self.state_file.exists():
-                import json
-                with open(self.state_file, 'r') as f:
-                    data = json.load(f)
-                    state_str = data.get("state", "unregistered")
-                    loaded_state = ClientState(state_str)
-
-                    # 启动时自动重置某些临时状态（可配置）
-                    should_reset = False
-                    reset_reason = ""
-
-                    if loaded_state == ClientState.ERROR:
-                        from .config import AUTO_RESET_ERROR_STATE_ON_STARTUP
-                        if AUTO_RESET_ERROR_STATE_ON_STARTUP:
-                            should_reset = True
-                            reset_reason = "错误状态"
-
-                    elif loaded_state == ClientState.REGISTERING:
-                        from .config import AUTO_RESET_REGISTERING_STATE_ON_STARTUP
-                        if AUTO_RESET_REGISTERING_STATE_ON_STARTUP:
-                            should_reset = True
-                            reset_reason = "注册中状态"
-
-                    if should_reset:
-                        logger.info("检测到%s，重启时自动重置为未注册状态", reset_reason)
-                        self.state = ClientState.UNREGISTERED
-                        # 重置错误相关计数
-                        self.error_start_time = 0
-                        self.error_retry_count = 0
-                        # 立即保存新状态
-                        self._save_state()
-                    else:
-                        self.state = loaded_state
-                        logger.info("加载客户端状态: %s", self.state.value)
+            data = self._read_state_record()
+            if data is not None:
+                state_str = data.get("state", "unregistered")
+                # 直接查成员表，未知取值回退为未注册状态而不是抛出异常
+                loaded_state = _STATE_BY_VALUE.get(state_str, ClientState.UNREGISTERED)
+                self.error_start_time = data.get("error_start_time", 0)
+                self.error_retry_count = data.get("error_retry_count", 0)
+                self._reinit_count = data.get("reinit_count", self._reinit_count)
+                self._last_reinit_ts = data.get("last_reinit_ts", 0)
+                self._last_reactivation_ts = data.get("last_reactivation_ts", 0)
+
+                # 启动时自动重置某些临时状态（可配置）
+                should_reset = False
+                reset_reason = ""
+
+                if loaded_state is _ERROR:
+                    if config.AUTO_RESET_ERROR_STATE_ON_STARTUP:
+                        should_reset = True
+                        reset_reason = "错误状态"
+
+                elif loaded_state is ClientState.REGISTERING:
+                    if config.AUTO_RESET_REGISTERING_STATE_ON_STARTUP:
+                        should_reset = True
+                        reset_reason = "注册中状态"
+
+                if should_reset:
+                    logger.info("检测到%s，重启时自动重置为未注册状态", reset_reason)
+                    self.state = ClientState.UNREGISTERED
+                    # 重置错误相关计数
+                    self.error_start_time = 0
+                    self.error_retry_count = 0
+                    # 立即保存新状态
+                    self._save_state()
+                else:
+                    self.state = loaded_state
+                    self._last_written_blob = self._record_blob(self._state_record())
+                    logger.info("加载客户端状态: %s", self.state.value)
             else:
                 self.state = ClientState.UNREGISTERED
                 logger.info("初始化客户端状态: %s", self.state.value)
         except Exception as e:
             logger.error("加载状态失败: %s", e)
             self.state = ClientState.UNREGISTERED
-    
-    def _save_state(self) -> None:
-        """保存状态到文件"""
+
+    def _state_record(self, now: Optional[int] = None) -> Dict[str, Any]:
+        """当前状态的完整记录，同时用作快照内容；now 为调用方已取得的时间戳"""
+        return {
+            "state": self.state.value,
+            "timestamp": int(time.time()) if now is None else now,
+            "error_start_time": self.error_start_time,
+            "error_retry_count": self.error_retry_count,
+            "reinit_count": self._reinit_count,
+            "last_reinit_ts": self._last_reinit_ts,
+            "last_reactivation_ts": self._last_reactivation_ts,
+        }
+
+    def _append_wal(self, event: dict) -> None:
+        """向状态日志追加一行事件；日志超过 _WAL_COMPACT_BYTES 时安排压缩"""
+        # 紧凑输出（无多余空格）：每条事件少写约 10 字节，日志更晚触发压缩
+        line = _json_dumps(event) + b"\n"
+        with self._save_lock:
+            with open(self.wal_file, 'ab', buffering=0, opener=self._opener) as f:
+                f.write(line)
+            self._wal_size += len(line)
+            if self._wal_size < _WAL_COMPACT_BYTES:
+                return
+            # 压缩同样延迟执行，合并短时间内的多次触发
+            self._dirty = True
+            if self._flush_timer is None:
+                timer = threading.Timer(_SAVE_DEBOUNCE, self._flush)
+                timer.daemon = True
+                self._flush_timer = timer
+                timer.start()
+
+    @staticmethod
+    def _record_blob(record: Dict[str, Any]) -> bytes:
+        """状态记录去掉时间戳后的序列化结果；时间戳每秒都在变化，不参与比较"""
+        return _json_dumps({k: v for k, v in record.items() if k != "timestamp"})
+
+    def _save_state(self, now: Optional[int] = None) -> None:
+        """将当前状态作为一行事件追加到状态日志；内容与上次写入相同时跳过"""
         try:
-            import json
-            data = {
-                "state": self.state.value,
-                "timestamp": int(time.time())
-            }
-            with open(self.state_file, 'w') as f:
-                json.dump(data, f)
+            record = self._state_record(now)
+            blob = self._record_blob(record)
+            if blob == self._last_written_blob:
+                return
+            self._append_wal(record)
+            self._last_written_blob = blob
             logger.debug("保存客户端状态: %s", self.state.value)
         except Exception as e:
             logger.error("保存状态失败: %s", e)
+
+    def _flush(self) -> None:
+        """压缩状态日志：写入新的状态快照后清空日志（仅在需要压缩时）"""
+        with self._save_lock:
+            timer, self._flush_timer = self._flush_timer, None
+            if timer is not None:
+                timer.cancel()
+            if not self._dirty:
+                return
+            self._dirty = False
+            try:
+                _atomic_write_json(self.state_file, self._state_record(), self._dir_fd)
+                # 快照已包含日志中的全部内容，截断日志
+                with open(self.wal_file, 'wb', opener=self._opener):
+                    pass
+                self._wal_size = 0
+                self._last_flush_ts = time.monotonic()
+                logger.debug("状态日志已压缩，当前状态: %s", self.state.value)
+            except Exception as e:
+                logger.error("压缩状态日志失败: %s", e)
+
+    def _discard_pending_save(self) -> None:
+        """丢弃尚未执行的状态日志压缩"""
+        with self._save_lock:
+            timer, self._flush_timer = self._flush_timer, None
+            if timer is not None:
+                timer.cancel()
+            self._dirty = False
     
     def set_state(self, new_state: ClientState) -> None:
         """设置新状态"""
-        if self.state != new_state:
+        if self.state is not new_state:
             old_state = self.state
             self.state = new_state
+            self._invalidate_recover_decision()
+            # 本次状态变更只取一次时间，错误计时与状态记录共用
+            now = int(time.time())
 
             # 处理错误状态的特殊逻辑
-            if new_state == ClientState.ERROR:
-                if old_state != ClientState.ERROR:
+            if new_state is _ERROR:
+                if old_state is not _ERROR:
                     # 首次进入错误状态
-                    self.error_start_time = int(time.time())
+                    self.error_start_time = now
                     self.error_retry_count = 0
                     logger.info("进入错误状态，开始错误恢复计时")
                 else:
@@ -113,26 +366,51 @@ class StateManager:
                     self.error_retry_count += 1
             else:
                 # 离开错误状态，重置错误相关计数
-                if old_state == ClientState.ERROR:
+                if old_state is _ERROR:
                     logger.info("离开错误状态，重置错误计数")
                     self.error_start_time = 0
                     self.error_retry_count = 0
 
-            self._save_state()
+            self._save_state(now)
             logger.info("状态变更: %s -> %s", old_state.value, new_state.value)
+
+            if new_state in _WAKE_STATES:
+                self._wake.set()
+            else:
+                self._wake.clear()
     
     def get_state(self) -> ClientState:
         """获取当前状态"""
         return self.state
+
+    def wait_for_state_change(self, timeout: float) -> bool:
+        """等待最多 timeout 秒，期间进入需要退出采集循环的状态时立即返回
+
+        Returns:
+            bool: 是否因状态变化被提前唤醒
+        """
+        woken = self._wake.wait(timeout)
+        self._wake.clear()
+        return woken
     
     def check_delete_marker(self) -> bool:
-        """检查删除标记文件是否存在"""
-        return self.delete_marker_file.exists()
+        """检查删除标记文件是否存在
+
+        本进程创建/移除标记时直接更新内存标志；外部创建的标记最多延迟
+        _MARKER_CHECK_INTERVAL 秒被发现，期间的调用不访问文件系统。
+        """
+        now = time.monotonic()
+        if now - self._marker_checked_at >= _MARKER_CHECK_INTERVAL:
+            self._marker_present = self.delete_marker_file.exists()
+            self._marker_checked_at = now
+        return self._marker_present
     
     def create_delete_marker(self) -> None:
         """创建删除标记文件"""
         try:
             self.delete_marker_file.write_text(f"deleted_at_{int(time.time())}")
+            self._marker_present = True
+            self._marker_checked_at = time.monotonic()
             logger.info("创建删除标记文件")
         except Exception as e:
             logger.error("创建删除标记文件失败: %s", e)
@@ -140,37 +418,35 @@ class StateManager:
     def remove_delete_marker(self) -> None:
         """移除删除标记文件"""
         try:
-            if self.delete_marker_file.exists():
-                self.delete_marker_file.unlink()
-                logger.info("移除删除标记文件")
+            self.delete_marker_file.unlink()
+            logger.info("移除删除标记文件")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error("移除删除标记文件失败: %s", e)
+            return
+        self._marker_present = False
+        self._marker_checked_at = time.monotonic()
     
     def notify_server_deletion(self) -> bool:
         """通知服务端设备已删除"""
         try:
-            import socket
             client_id = get_client_id()
             token = get_auth_token()
             os_info = get_os_info()
 
             payload = {
                 "client_id": client_id,
-                "hostname": socket.gethostname(),
+                "hostname": get_hostname(),
                 "os": os_info,
                 "action": "delete",
                 "timestamp": int(time.time())
             }
             
-            headers = {
-                "X-Auth-Token": token,
-                "Content-Type": "application/json"
-            }
-            
-            # 使用注册URL的删除端点（需要服务端支持）
-            delete_url = REGISTER_URL.replace("/register", "/delete")
-            
-            resp = requests.post(delete_url, json=payload, timeout=HTTP_TIMEOUT, headers=headers)
+            # Content-Type 已由会话统一设置
+            headers = {"X-Auth-Token": token}
+
+            resp = _SESSION.post(_DELETE_URL, json=payload, timeout=HTTP_TIMEOUT, headers=headers)
             
             if resp.status_code == 200:
                 logger.info("成功通知服务端设备删除")
@@ -186,22 +462,35 @@ class StateManager:
     def reset_client(self) -> None:
         """重置客户端状态，准备重新注册"""
         try:
-            # 删除状态文件
-            if self.state_file.exists():
-                self.state_file.unlink()
-            
-            # 删除客户端ID文件，强制重新生成
-            client_id_file = Path("client_id.txt")
-            if client_id_file.exists():
-                client_id_file.unlink()
-            
-            # 删除缓存数据库
-            cache_db = Path("client_cache.db")
-            if cache_db.exists():
-                cache_db.unlink()
-            
-            # 移除删除标记
-            self.remove_delete_marker()
+            # 丢弃尚未落盘的写入，避免定时器重新创建状态文件
+            self._discard_pending_save()
+
+            # 删除状态目录中的状态快照和状态日志
+            for name in (self.state_file, self.wal_file):
+                try:
+                    os.unlink(name, dir_fd=self._dir_fd)
+                except FileNotFoundError:
+                    pass
+
+            # 一次遍历工作目录，删除客户端ID文件（强制重新生成）和删除标记，
+            # 缓存数据库只清空数据，保留表结构
+            targets = {"client_id.txt", self.delete_marker_file.name}
+            cache_db_found = False
+            with os.scandir(".") as it:
+                for entry in it:
+                    if entry.name in targets:
+                        os.unlink(entry.path)
+                        logger.debug("删除文件: %s", entry.name)
+                    elif entry.name == config.DB_PATH:
+                        cache_db_found = True
+            if cache_db_found:
+                reset_cache_db(config.DB_PATH)
+
+            self._wal_size = 0
+            self._last_written_blob = b""
+            reset_client_id_cache()
+            self._marker_present = False
+            self._marker_checked_at = time.monotonic()
             
             # 重置状态
             self.state = ClientState.UNREGISTERED
@@ -213,7 +502,7 @@ class StateManager:
     
     def should_enter_sleep_retry_mode(self) -> bool:
         """检查是否应该进入休眠重注册模式"""
-        return self.state in [ClientState.REINITIALIZED, ClientState.SLEEP_RETRY]
+        return self.state in _SLEEP_RETRY_STATES
 
     def enter_sleep_retry_mode(self) -> None:
         """进入休眠重注册模式"""
@@ -222,17 +511,18 @@ class StateManager:
 
     def sleep_and_retry_register(self, retry_count: int = 0) -> bool:
         """休眠并重试注册（智能间隔）"""
-        import time
-        from .timing_config import get_sleep_retry_interval
-
         # 使用配置文件中的智能休眠间隔
         sleep_interval = get_sleep_retry_interval(retry_count)
 
         if sleep_interval > 0:
             logger.info("休眠重注册模式：等待 %d 分钟后重试注册 (第%d次重试)", sleep_interval // 60, retry_count + 1)
             try:
-                time.sleep(sleep_interval)
-                logger.info("休眠结束，准备重试注册")
+                # 可被 wake() 提前结束的等待，收到唤醒后立即重试注册
+                if self._retry_wake.wait(sleep_interval):
+                    logger.info("休眠被提前唤醒，立即重试注册")
+                else:
+                    logger.info("休眠结束，准备重试注册")
+                self._retry_wake.clear()
             except KeyboardInterrupt:
                 logger.info("用户中断休眠，退出程序")
                 return False
@@ -241,6 +531,10 @@ class StateManager:
 
         return True
 
+    def wake(self) -> None:
+        """提前结束休眠重注册的等待"""
+        self._retry_wake.set()
+
     def handle_register_response(self, response_data: dict) -> str:
         """处理注册响应，返回下一步操作"""
         status = response_data.get("status", "unknown")
@@ -270,28 +564,15 @@ class StateManager:
 
     def _record_reactivation(self) -> None:
         """记录重新激活日志"""
-        import time
-
-        try:
-            reactivation_data = {
-                "reactivation_timestamp": int(time.time()),
-                "previous_reinit_count": self._get_reinit_count()
-            }
-
-            import json
-            reactivation_file = Path("reactivation_info.json")
-            with open(reactivation_file, 'w') as f:
-                json.dump(reactivation_data, f)
-
-            logger.info("设备重新激活成功，恢复正常运行")
-
-        except Exception as e:
-            logger.error("记录重新激活信息失败: %s", e)
+        now = int(time.time())
+        self._last_reactivation_ts = now
+        self._save_state(now)
+        logger.info("设备重新激活成功，恢复正常运行 (此前已重新初始化 %d 次)", self._reinit_count)
 
     def should_stop_registration(self) -> bool:
         """检查是否应该停止注册过程"""
         # 检查是否应该从错误状态自动恢复
-        if self.state == ClientState.ERROR:
+        if self.state is _ERROR:
             return not self._should_auto_recover_from_error()
 
         # DELETED状态会触发重新初始化，不会停止注册
@@ -299,9 +580,21 @@ class StateManager:
 
     def _should_auto_recover_from_error(self) -> bool:
         """检查是否应该从错误状态自动恢复"""
-        if self.state != ClientState.ERROR:
+        if self.state is not _ERROR:
             return False
 
+        # 同一轮主循环内 should_stop_registration / should_stop_reporting 可能先后调用，
+        # 短时间内直接复用上次的判断结果
+        now = time.monotonic()
+        if now - self._recover_decision_ts < _RECOVER_DECISION_TTL:
+            return self._recover_decision
+        decision = self._decide_auto_recover()
+        self._recover_decision = decision
+        self._recover_decision_ts = now
+        return decision
+
+    def _decide_auto_recover(self) -> bool:
+        """判断错误状态是否达到自动恢复条件，达到时执行恢复"""
         current_time = int(time.time())
         error_duration = current_time - self.error_start_time
 
@@ -340,11 +633,16 @@ class StateManager:
             logger.error("错误状态自动恢复失败: %s", e)
             # 如果恢复失败，延长错误状态时间，避免频繁重试
             self.error_start_time = int(time.time())
+            self._invalidate_recover_decision()
+
+    def _invalidate_recover_decision(self) -> None:
+        """使缓存的自动恢复判断失效"""
+        self._recover_decision_ts = float("-inf")
 
     def should_stop_reporting(self) -> bool:
         """检查是否应该停止上报"""
         # 检查是否应该从错误状态自动恢复
-        if self.state == ClientState.ERROR:
+        if self.state is _ERROR:
             return not self._should_auto_recover_from_error()
 
         # DELETED状态会触发重新初始化，不会停止上报
@@ -352,7 +650,7 @@ class StateManager:
 
     def force_reset_error_state(self) -> None:
         """强制重置错误状态（用于手动恢复）"""
-        if self.state == ClientState.ERROR:
+        if self.state is _ERROR:
             logger.info("手动重置错误状态")
             self.set_state(ClientState.UNREGISTERED)
         else:
@@ -360,7 +658,7 @@ class StateManager:
 
     def get_error_info(self) -> dict:
         """获取错误状态信息"""
-        if self.state != ClientState.ERROR:
+        if self.state is not _ERROR:
             return {"in_error": False}
 
         current_time = int(time.time())
@@ -388,6 +686,9 @@ class StateManager:
         # 触发设备重新初始化流程
         self.reinitialize_device()
 
+        # 正在休眠重注册时立即以新身份重试
+        self.wake()
+
         logger.info("设备重新初始化完成，进入休眠重注册模式")
 
     def reinitialize_device(self) -> None:
@@ -418,31 +719,31 @@ class StateManager:
 
     def _regenerate_client_id(self) -> None:
         """重新生成客户端ID"""
-        import uuid
-        from pathlib import Path
-
-        client_id_file = Path("client_id.txt")
+        client_id_file = "client_id.txt"
 
-        # 删除旧的客户端ID
-        if client_id_file.exists():
-            old_id = client_id_file.read_text().strip()
+        # 读取旧的客户端ID仅用于记录日志
+        try:
+            with open(client_id_file, 'rb') as f:
+                old_id = f.read().strip().decode("ascii", "replace")
             logger.info("删除旧的客户端ID: %s", old_id)
-            client_id_file.unlink()
+        except FileNotFoundError:
+            pass
 
-        # 生成新的UUID
-        new_id = str(uuid.uuid4())
-        client_id_file.write_text(new_id)
+        # 生成新的UUID，原子替换旧文件
+        new_id = _new_uuid4()
+        _atomic_write(client_id_file, new_id.encode("ascii"))
+        reset_client_id_cache()
         logger.info("生成新的客户端ID: %s", new_id)
 
     def _clear_auth_info(self) -> None:
         """清空认证信息"""
-        from .config import RUNTIME_CONFIG
+        runtime_config = config.RUNTIME_CONFIG
 
         # 清空运行时配置中的认证信息
         auth_keys = ["auth_token", "server_id", "report_url"]
         for key in auth_keys:
-            if key in RUNTIME_CONFIG:
-                old_value = RUNTIME_CONFIG.pop(key, None)
+            if key in runtime_config:
+                old_value = runtime_config.pop(key, None)
                 logger.debug("清空认证信息: %s = %s", key, old_value)
 
         logger.info("认证信息已清空")
@@ -454,47 +755,51 @@ class StateManager:
         logger.debug("设备配置已重置")
 
     def _save_reinit_timestamp(self) -> None:
-        """保存重新初始化时间戳"""
-        import time
-
-        reinit_data = {
-            "reinit_timestamp": int(time.time()),
-            "reinit_count": self._get_reinit_count() + 1
-        }
-
-        try:
-            import json
-            reinit_file = Path("reinit_info.json")
-            with open(reinit_file, 'w') as f:
-                json.dump(reinit_data, f)
-            logger.info("重新初始化信息已保存: 第%d次重新初始化", reinit_data["reinit_count"])
-        except Exception as e:
-            logger.error("保存重新初始化信息失败: %s", e)
+        """记录重新初始化时间戳（随状态记录一起保存）"""
+        self._reinit_count += 1
+        now = int(time.time())
+        self._last_reinit_ts = now
+        self._save_state(now)
+        logger.info("重新初始化信息已保存: 第%d次重新初始化", self._reinit_count)
 
     def _get_reinit_count(self) -> int:
         """获取重新初始化次数"""
+        return self._reinit_count
+
+    @staticmethod
+    def _read_legacy_reinit_count() -> int:
+        """读取旧版本 reinit_info.json 中记录的重新初始化次数，仅用于迁移"""
         try:
-            import json
             reinit_file = Path("reinit_info.json")
             if reinit_file.exists():
-                with open(reinit_file, 'r') as f:
-                    data = json.load(f)
+                with open(reinit_file, 'rb') as f:
+                    data = _json_loads(f.read())
                     return data.get("reinit_count", 0)
         except Exception:
             pass
         return 0
 
 
+_instance: Optional[StateManager] = None
+
+
+def get_state_manager() -> StateManager:
+    """返回进程内共享的状态管理器，首次调用时创建并加载状态"""
+    global _instance
+    if _instance is None:
+        _instance = StateManager()
+    return _instance
+
+
 def create_delete_marker() -> None:
     """创建删除标记文件的便捷函数"""
-    manager = StateManager()
-    manager.create_delete_marker()
+    get_state_manager().create_delete_marker()
 
 
 def check_and_handle_deletion() -> bool:
     """检查并处理删除操作的便捷函数"""
-    manager = StateManager()
+    manager = get_state_manager()
     if manager.check_delete_marker():
-        manager.handle_deletion()
+        manager.handle_device_deleted_response()
         return True
     return False
@@ -46,10 +46,18 @@ SLEEP_RETRY_INTERVALS = {
     "default": 300  # 第4次及以后：5分钟后重试
 }
 
+# 由上面的配置展开成按重试次数索引的元组，查询时只需一次下标访问
+SLEEP_RETRY_INTERVALS_TABLE = tuple(
+    SLEEP_RETRY_INTERVALS[i] for i in range(len(SLEEP_RETRY_INTERVALS) - 1)
+)
+SLEEP_RETRY_DEFAULT = SLEEP_RETRY_INTERVALS["default"]
+
 # 获取休眠重注册间隔的函数
 def get_sleep_retry_interval(retry_count: int) -> int:
     """根据重试次数获取休眠间隔"""
-    return SLEEP_RETRY_INTERVALS.get(retry_count, SLEEP_RETRY_INTERVALS["default"])
+    if 0 <= retry_count < len(SLEEP_RETRY_INTERVALS_TABLE):
+        return SLEEP_RETRY_INTERVALS_TABLE[retry_count]
+    return SLEEP_RETRY_DEFAULT
 
 
 # ================================
@@ -10,6 +10,20 @@ auth = None
 HOST = "0.0.0.0"
 PORT = 8045 
 
+# 服务端前方的反向代理层数，大于 0 时按 X-Forwarded-For 等头还原客户端地址；
+# 直接对外暴露时保持 0，避免客户端伪造来源地址
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "0"))
+
+# 上报鉴权结果在每个进程内缓存的秒数，0 表示不缓存。缓存按进程独立，审核状态
+# 变化只会清空处理该请求的进程；多进程部署时其他进程最多延迟这么久才生效
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "10"))
+
+# 请求体的最大字节数（压缩后），超过时返回 413
+MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", str(4 * 1024 * 1024)))
+
+# 上报请求体解压后的最大字节数，超过时返回 413，防止很小的压缩数据解压后耗尽内存
+MAX_DECOMPRESSED_BYTES = int(os.getenv("MAX_DECOMPRESSED_BYTES", str(16 * 1024 * 1024)))
+
 # MySQL 连接信息（从环境变量读取）
 MYSQL = {
     "host": os.getenv("DB_HOST", "localhost"),
@@ -2,7 +2,9 @@
 
 import json
 import logging
+import queue
 import secrets
+import time
 from contextlib import contextmanager
 from enum import Enum
 from typing import Dict, Any, Optional, List, Tuple
@@ -98,21 +100,61 @@ CREATE TABLE IF NOT EXISTS server_events (
 """
 
 
+# 连接池：归还的连接连同归还时间放入后进先出队列，优先复用最近用过的连接，
+# 省去每次请求的 TCP 握手和 MySQL 认证；超出容量的连接直接关闭
+_POOL_SIZE = 16
+# 空闲超过该时长（秒）的连接在取出时先 ping 一次，断开则自动重连
+_POOL_PING_IDLE = 30.0
+_pool: "queue.LifoQueue[Tuple[Any, float]]" = queue.LifoQueue(maxsize=_POOL_SIZE)
+
+# 批量更新心跳时单条 UPDATE 最多涉及的服务器数量，避免语句过长
+_SEEN_UPDATE_CHUNK = 500
+
+
 def _get_conn():
     """获取数据库连接。"""
     return pymysql.connect(**MYSQL, autocommit=True, cursorclass=DictCursor)
 
 
+def _acquire_conn():
+    """从连接池取出一个可用连接，池为空时新建。"""
+    try:
+        conn, released_at = _pool.get_nowait()
+    except queue.Empty:
+        return _get_conn()
+    if time.monotonic() - released_at >= _POOL_PING_IDLE:
+        try:
+            conn.ping(reconnect=True)
+        except pymysql.Error as e:
+            logger.debug("连接池中的连接不可用，重新连接: %s", e)
+            conn.close()
+            return _get_conn()
+    return conn
+
+
+def _release_conn(conn) -> None:
+    """将连接归还连接池，池已满时关闭。"""
+    try:
+        _pool.put_nowait((conn, time.monotonic()))
+    except queue.Full:
+        conn.close()
+
+
 @contextmanager
 def get_cursor():
-    """获取数据库游标的上下文管理器。"""
-    conn = _get_conn()
+    """获取数据库游标的上下文管理器，连接用完后归还连接池。"""
+    conn = _acquire_conn()
     try:
-        cur = conn.cursor()
-        yield cur
-    finally:
-        cur.close()
+        with conn.cursor() as cur:
+            yield cur
+    except pymysql.Error:
+        # 数据库错误后连接状态不确定，直接关闭不再复用
         conn.close()
+        raise
+    except BaseException:
+        _release_conn(conn)
+        raise
+    _release_conn(conn)
 
 
 def init_tables():
@@ -298,6 +340,31 @@ def update_server_seen(uuid: str, ip: str):
         )
 
 
+def update_servers_seen(rows: List[Tuple[str, str]]) -> None:
+    """批量更新多台服务器的最后心跳时间。
+
+    executemany 只会把 INSERT/REPLACE 合并为一条语句，UPDATE 仍逐行发送；
+    这里用 CASE 拼成一条 UPDATE，每 _SEEN_UPDATE_CHUNK 台服务器一次往返。
+
+    Args:
+        rows: (ip, uuid) 元组列表
+    """
+    with get_cursor() as cur:
+        for start in range(0, len(rows), _SEEN_UPDATE_CHUNK):
+            chunk = rows[start:start + _SEEN_UPDATE_CHUNK]
+            params: List[str] = []
+            for ip, uuid in chunk:
+                params.append(uuid)
+                params.append(ip)
+            params.extend(uuid for _, uuid in chunk)
+            cur.execute(
+                "UPDATE servers SET last_seen = CURRENT_TIMESTAMP, ip_address = CASE uuid"
+                + " WHEN %s THEN %s" * len(chunk)
+                + " END WHERE uuid IN (" + ", ".join(["%s"] * len(chunk)) + ")",
+                params
+            )
+
+
 def add_event(
     server_id: int,
     event_type: EventType,
@@ -1,59 +1,573 @@
 """服务端主程序。"""
 
+import atexit
+import gzip
+import json
 import logging
-from typing import Dict, Any, List
+import queue
+import threading
+import time
+import zlib
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, List, Optional, Tuple
 
-from flask import Flask, abort, jsonify, request
+from flask import Flask, g, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+try:  # 可选：接受客户端以 MessagePack 编码的上报数据
+    import msgspec
+except ImportError:  # pragma: no cover - 可选依赖
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:  # 可选：接受 zstd 压缩的上报数据
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
 
 from . import db
+from .config import AUTH_CACHE_TTL, MAX_CONTENT_LENGTH, MAX_DECOMPRESSED_BYTES, TRUSTED_PROXIES
+
+if msgspec is not None:
+    from . import schema
+
+# JSON 编解码；orjson 直接解析/输出字节，无需额外的 str 编码。日期等类型交给
+# Flask 默认的转换函数处理，输出格式与原先的 jsonify 一致
+if orjson is not None:
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(
+            obj, default=DefaultJSONProvider.default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=DefaultJSONProvider.default).encode("utf-8")
+    _json_loads = json.loads
+
+
+class _FastJSONProvider(DefaultJSONProvider):
+    """让 Flask 内部的 JSON 处理同样使用 _json_dumps / _json_loads。"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # sort_keys、indent 等参数 orjson 无法一一对应，交给默认实现处理
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return _json_dumps(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return _json_loads(s)
+
 
 app = Flask(__name__)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+# 超过该大小的请求体在读取时即以 413 拒绝
+app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
+if orjson is not None:
+    app.json = _FastJSONProvider(app)
+if TRUSTED_PROXIES > 0:
+    # 部署在反向代理之后时，request.remote_addr 取代理转发的真实客户端地址
+    app.wsgi_app = ProxyFix(
+        app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES, x_host=TRUSTED_PROXIES
+    )
+
+
+def _setup_logging() -> QueueListener:
+    """配置日志系统。
+
+    根日志器只挂队列处理器，格式化与输出交给后台监听线程，请求处理线程记录
+    日志时不再等待控制台写入。
+    """
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers[:] = [QueueHandler(log_queue)]
+
+    listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    listener.start()
+    # 进程退出前停止监听线程，确保队列中的日志全部写出
+    atexit.register(listener.stop)
+    return listener
+
+
+_log_listener = _setup_logging()
+logger = logging.getLogger(__name__)
+
+# 客户端 v2 上报格式缩短的字段键名，须与 client/sender.py 中的 _KEY_MAP 保持一致
+_SCHEMA_V2 = "v2"
+_SHORT_KEYS = {
+    "up": "usage_percent",
+    "fm": "frequency_mhz",
+    "tc": "temperature_c",
+    "pw": "power_w",
+    "utp": "util_percent",
+    "mup": "memory_util_percent",
+    "mt": "memory_total",
+    "mu": "memory_used",
+    "mp": "mountpoint",
+    "pc": "percent",
+    "av": "available",
+}
+
+# 字节到 GiB 的换算系数，日志中以乘法代替除法
+_GIB = 1.0 / 1024 ** 3
+
+# 逐条明细日志的格式串
+_ENTRY_FMT = (
+    "[Entry %d] ts=%s | CPU %.1f%%, %.1f°C, %.1fW | Mem %.1f%% (%.2f/%.2f GB) freq=%s MHz"
+)
+_DISK_FMT = "    Disk %s at %s %.1f%% used (%.2f/%.2f GB)"
+_GPU_FMT = "    GPU %s idx=%s util=%.1f%% mem=%.1f%% power=%.1fW"
+
+_MSGPACK_TYPE = "application/msgpack"
+
+# 上报请求体解码器，按 (是否 MessagePack, 是否 v2) 选择；msgspec 不可用时为 None，
+# 退回到解析为 dict 列表
+_report_decoders = None
+if msgspec is not None:
+    _V2_RENAME = {name: short for short, name in _SHORT_KEYS.items()}
+    _report_decoders = {
+        (False, False): msgspec.json.Decoder(schema.report_type()).decode,
+        (False, True): msgspec.json.Decoder(schema.report_type(_V2_RENAME)).decode,
+        (True, False): msgspec.msgpack.Decoder(schema.report_type()).decode,
+        (True, True): msgspec.msgpack.Decoder(schema.report_type(_V2_RENAME)).decode,
+    }
+
+# 上报鉴权结果缓存：(uuid, token) -> 过期时间（单调时钟）。稳定上报的客户端
+# 在有效期内无需每次查询数据库；审核状态变化时整体清空。缓存只在本进程内有效，
+# 其他工作进程要等条目过期才会感知拒绝或删除，因此有效期保持较短（见 AUTH_CACHE_TTL）
+_AUTH_TTL = AUTH_CACHE_TTL
+_AUTH_CACHE_MAX = 4096
+_auth_cache: Dict[Tuple[str, str], float] = {}
+_auth_lock = threading.Lock()
+
+# 心跳时间由后台线程批量写入：上报请求只记录 uuid -> 来源地址，后台线程在
+# 合并窗口结束后用一条 executemany 更新这段时间内上报过的全部服务器
+_SEEN_BATCH_WINDOW = 0.5
+_seen_pending: Dict[str, str] = {}
+_seen_lock = threading.Lock()
+_seen_wakeup = threading.Event()
+_seen_writer: Optional[threading.Thread] = None
+
+# 数据库表在首个请求到达时确认一次（也可预先执行 flask init-db），
+# 不在导入时执行建表语句，多进程部署时工作进程启动无需等待数据库
+_tables_ready = threading.Event()
+_tables_lock = threading.Lock()
+
+# 由 before_request 统一解析 JSON 请求体的端点；上报接口另行解码（gzip/MessagePack）
+_JSON_BODY_ENDPOINTS = frozenset({"register", "reject_server"})
+
+# 请求体解压或解码失败时可能抛出的异常
+_DECODE_ERRORS = (OSError, EOFError, ValueError, zlib.error)
+if msgspec is not None:
+    _DECODE_ERRORS += (msgspec.DecodeError,)
+
+# 请求体能解码但结构与 schema 不符
+_VALIDATION_ERRORS = (msgspec.ValidationError,) if msgspec is not None else ()
+if zstandard is not None:
+    _DECODE_ERRORS += (zstandard.ZstdError,)
+
+# 响应体达到该大小且客户端接受 gzip 时压缩响应，过小的响应压缩收益不抵开销
+_GZIP_MIN_BYTES = 1024
+
+
+class _BodyTooLarge(Exception):
+    """解压后的请求体超过 MAX_DECOMPRESSED_BYTES。"""
+
+
+def _gzip_decompress(raw: bytes) -> bytes:
+    """解压 gzip 数据，输出最多 MAX_DECOMPRESSED_BYTES 字节，超出时抛出 _BodyTooLarge。"""
+    d = zlib.decompressobj(wbits=31)
+    out = d.decompress(raw, MAX_DECOMPRESSED_BYTES)
+    if d.unconsumed_tail or (not d.eof and len(out) >= MAX_DECOMPRESSED_BYTES):
+        raise _BodyTooLarge
+    if not d.eof:
+        raise EOFError("Compressed body ended before the end-of-stream marker")
+    if d.unused_data:
+        raise ValueError("Unexpected data after the gzip stream")
+    return out
+
+
+def _zstd_decompress(raw: bytes) -> bytes:
+    """解压 zstd 数据，输出最多 MAX_DECOMPRESSED_BYTES 字节，超出时抛出 _BodyTooLarge。
+
+    依次解压全部帧，不要求帧头记录原始大小；解压对象每次新建、线程安全。
+    """
+    reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    with reader:
+        out = reader.read(MAX_DECOMPRESSED_BYTES + 1)
+    if len(out) > MAX_DECOMPRESSED_BYTES:
+        raise _BodyTooLarge
+    return out
+
+
+# 请求体支持的 Content-Encoding 及对应的解压函数
+_DECOMPRESSORS = {"gzip": _gzip_decompress}
+if zstandard is not None:
+    _DECOMPRESSORS["zstd"] = _zstd_decompress
+
+
+def _json_response(obj: Any):
+    """以 JSON 响应返回 obj，直接使用序列化得到的字节作为响应体。"""
+    return app.response_class(_json_dumps(obj), mimetype="application/json")
+
+
+_ErrorResponse = Tuple[bytes, int, Dict[str, str]]
+
+
+def _error_response(status: int, message: str) -> _ErrorResponse:
+    """构造 (响应体, 状态码, 响应头) 形式的 JSON 错误响应，供路由直接返回。"""
+    return _json_dumps({"error": message}), status, {"Content-Type": "application/json"}
+
+
+# 常见错误的响应体预先序列化，路由直接返回，无需 abort 抛出异常再渲染错误页。
+# 以元组保存，每次由 Flask 新建响应对象，不会在请求之间共享
+_ERR_INVALID_BODY = _error_response(400, "Invalid request body")
+_ERR_MISSING_IDENTITY = _error_response(400, "Missing client_id or hostname")
+_ERR_NOT_ARRAY = _error_response(400, "Payload must be a JSON array")
+_ERR_MISSING_CLIENT_ID = _error_response(400, "Missing client_id in metrics")
+_ERR_CLIENT_ID_MISMATCH = _error_response(400, "client_id does not match X-Client-Id")
+_ERR_NO_TOKEN = _error_response(401, "Unauthorized: Invalid token")
+_ERR_UNKNOWN_CLIENT = _error_response(401, "Unknown client")
+_ERR_BAD_TOKEN = _error_response(401, "Invalid token for this client")
+_ERR_NOT_ACCEPTED = _error_response(403, "Registration not accepted")
+_ERR_SERVER_NOT_FOUND = _error_response(404, "Server not found")
+_ERR_BODY_TOO_LARGE = _error_response(413, "Request body too large")
+_ERR_BAD_ENCODING = _error_response(415, "Unsupported Content-Encoding")
+_ERR_BAD_CONTENT_TYPE = _error_response(415, "Unsupported Content-Type")
+
+
+def _get_report_body(schema_v2: bool) -> Tuple[Optional[list], Optional[_ErrorResponse]]:
+    """解析上报请求体，支持 gzip/zstd 压缩及 MessagePack 编码。
+
+    msgspec 可用时按 schema 一次解码为 Struct 列表并完成校验，v2 缩短的键名在
+    解码时一并还原；否则解析为 dict 列表后再还原键名。
+
+    Returns:
+        (指标列表, None)；解析或校验失败时为 (None, 错误响应)
+    """
+    encoding = request.headers.get("Content-Encoding", "").lower()
+    is_msgpack = request.mimetype == _MSGPACK_TYPE
+    decompress = _DECOMPRESSORS.get(encoding) if encoding else None
+    if encoding and decompress is None:
+        return None, _ERR_BAD_ENCODING
+    if is_msgpack and _report_decoders is None:
+        return None, _ERR_BAD_CONTENT_TYPE
+    try:
+        raw = request.get_data(cache=False)
+        if decompress is not None:
+            raw = decompress(raw)
+        if _report_decoders is not None:
+            return _report_decoders[is_msgpack, schema_v2](raw), None
+        data = _json_loads(raw)
+    except _BodyTooLarge:
+        return None, _ERR_BODY_TOO_LARGE
+    except _VALIDATION_ERRORS as e:
+        # 结构不符时返回 msgspec 给出的具体原因及字段路径，如 "... - at `$[0].cpu`"
+        return None, _error_response(400, f"Invalid metrics payload: {e}")
+    except _DECODE_ERRORS:
+        return None, _ERR_NOT_ARRAY
+    if not isinstance(data, list):
+        return None, _ERR_NOT_ARRAY
+    if schema_v2:
+        _expand_keys(data)
+    return data, None
+
+
+def _authenticate(uuid: str, token: str) -> Optional[_ErrorResponse]:
+    """校验客户端的 Token，有效期内已通过鉴权的直接放行。
+
+    Returns:
+        通过时为 None，否则为错误响应
+    """
+    if _auth_cached(uuid, token):
+        return None
+    with db.get_cursor() as cur:
+        cur.execute(
+            "SELECT auth_token, register_status FROM servers WHERE uuid = %s",
+            (uuid,)
+        )
+        server = cur.fetchone()
+    if not server:
+        return _ERR_UNKNOWN_CLIENT
+    if server["register_status"] != "ACCEPTED":
+        return _ERR_NOT_ACCEPTED
+    if server["auth_token"] != token:
+        return _ERR_BAD_TOKEN
+    _remember_auth(uuid, token)
+    return None
+
+
+def _auth_cached(uuid: str, token: str) -> bool:
+    """(uuid, token) 是否在有效期内通过过鉴权。"""
+    expiry = _auth_cache.get((uuid, token))
+    return expiry is not None and expiry > time.monotonic()
+
+
+def _remember_auth(uuid: str, token: str) -> None:
+    """记录一次通过的鉴权；缓存条目过多时直接清空，避免无限增长。"""
+    if _AUTH_TTL <= 0:
+        return
+    with _auth_lock:
+        if len(_auth_cache) >= _AUTH_CACHE_MAX:
+            _auth_cache.clear()
+        _auth_cache[(uuid, token)] = time.monotonic() + _AUTH_TTL
+
+
+def _invalidate_auth_cache() -> None:
+    """清空鉴权缓存，在服务器审核状态变化后调用。"""
+    with _auth_lock:
+        _auth_cache.clear()
+
+
+def _mark_seen(uuid: str, ip: str) -> None:
+    """登记一次心跳，由后台线程合并写入数据库。"""
+    global _seen_writer
+    with _seen_lock:
+        _seen_pending[uuid] = ip
+        # 首次使用时才启动写入线程，多进程部署时每个工作进程各自启动
+        if _seen_writer is None:
+            _seen_writer = threading.Thread(target=_seen_writer_loop, name="seen-writer", daemon=True)
+            _seen_writer.start()
+            atexit.register(_flush_seen)
+    _seen_wakeup.set()
+
+
+def _flush_seen() -> None:
+    """将登记的心跳一次性写入数据库。"""
+    with _seen_lock:
+        batch = [(ip, uuid) for uuid, ip in _seen_pending.items()]
+        _seen_pending.clear()
+    if not batch:
+        return
+    try:
+        db.update_servers_seen(batch)
+    except Exception as e:
+        logger.error("批量更新心跳时间失败 (%d 台): %s", len(batch), e)
+
 
-# 初始化数据库表
-db.init_tables()
+def _seen_writer_loop() -> None:
+    """后台写入线程：有新心跳时等待一个合并窗口，再批量写入。"""
+    while True:
+        _seen_wakeup.wait()
+        time.sleep(_SEEN_BATCH_WINDOW)
+        _seen_wakeup.clear()
+        _flush_seen()
+
+
+def _expand_keys(obj: Any) -> Any:
+    """将 v2 格式中缩短的键名还原，原地修改嵌套的 dict/list。"""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for short in [k for k in value if k in _SHORT_KEYS]:
+                value[_SHORT_KEYS[short]] = value.pop(short)
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return obj
+
+
+def _log_dict_entry(idx: int, entry: Dict[str, Any]) -> None:
+    """以 INFO 级别输出单条指标（dict）的 CPU/内存、磁盘及 GPU 明细。"""
+    entry_get = entry.get
+    cpu_get = (entry_get("cpu") or {}).get
+    mem_get = (entry_get("memory") or {}).get
+    info = logger.info
+
+    info(
+        _ENTRY_FMT,
+        idx,
+        entry_get("timestamp"),
+        cpu_get("usage_percent", 0.0),
+        cpu_get("temperature_c") or -1.0,
+        cpu_get("power_w") or -1.0,
+        mem_get("percent", 0.0),
+        mem_get("used", 0) * _GIB,
+        mem_get("total", 0) * _GIB,
+        mem_get("frequency_mhz") or "-",
+    )
+
+    for d in entry_get("disk") or ():
+        d_get = d.get
+        info(
+            _DISK_FMT,
+            d_get("device"),
+            d_get("mountpoint"),
+            d_get("percent"),
+            d_get("used", 0) * _GIB,
+            d_get("total", 0) * _GIB,
+        )
+
+    for g in entry_get("gpus") or ():
+        g_get = g.get
+        info(
+            _GPU_FMT,
+            g_get("name"),
+            g_get("index"),
+            g_get("util_percent"),
+            g_get("memory_util_percent"),
+            g_get("power_w") or -1.0,
+        )
+
+
+def _log_struct_entry(idx: int, entry: Any) -> None:
+    """以 INFO 级别输出单条指标（schema.Entry）的 CPU/内存、磁盘及 GPU 明细。"""
+    cpu = entry.cpu
+    mem = entry.memory
+    info = logger.info
+
+    info(
+        _ENTRY_FMT,
+        idx,
+        entry.timestamp,
+        cpu.usage_percent,
+        cpu.temperature_c or -1.0,
+        cpu.power_w or -1.0,
+        mem.percent,
+        mem.used * _GIB,
+        mem.total * _GIB,
+        mem.frequency_mhz or "-",
+    )
+
+    for d in entry.disk:
+        info(_DISK_FMT, d.device, d.mountpoint, d.percent, d.used * _GIB, d.total * _GIB)
+
+    for g in entry.gpus:
+        info(
+            _GPU_FMT,
+            g.name,
+            g.index,
+            g.util_percent,
+            g.memory_util_percent,
+            g.power_w or -1.0,
+        )
+
+
+_log_entry = _log_dict_entry if _report_decoders is None else _log_struct_entry
+
+
+def _report_response(body: Dict[str, Any]):
+    """上报接口的响应，附带响应头告知客户端支持的 v2 格式及 MessagePack 编码。"""
+    resp = _json_response(body)
+    resp.headers["X-Schema"] = _SCHEMA_V2
+    if _report_decoders is not None:
+        resp.headers["X-Accept-Msgpack"] = "1"
+    return resp
+
+
+@app.cli.command("init-db")
+def init_db_command() -> None:
+    """创建数据库表，部署时执行一次。"""
+    db.init_tables()
+    _tables_ready.set()
+
+
+@app.before_request
+def _ensure_tables() -> None:
+    """首个请求到达时确保数据库表已创建，每个进程只执行一次。"""
+    if _tables_ready.is_set():
+        return
+    with _tables_lock:
+        if not _tables_ready.is_set():
+            db.init_tables()
+            _tables_ready.set()
+
+
+@app.before_request
+def _parse_json_body() -> None:
+    """普通 JSON 接口的请求体在此解析一次并存入 g.json，为空或解析失败时为 None。"""
+    if request.endpoint not in _JSON_BODY_ENDPOINTS:
+        return
+    g.json = None
+    # 不带请求体的调用（如不填原因的拒绝审核）直接跳过，不读取输入流；
+    # 分块传输时没有 Content-Length，仍按实际读到的内容判断
+    if request.content_length == 0:
+        return
+    raw = request.get_data(cache=False)
+    if raw:
+        try:
+            g.json = _json_loads(raw)
+        except ValueError:
+            pass
+
+
+@app.errorhandler(HTTPException)
+def _http_error(e: HTTPException):
+    """其余 HTTP 错误（abort、未知路由等）同样以 JSON 返回，保留原有响应头。"""
+    resp = e.get_response()
+    resp.set_data(_json_dumps({"error": e.description}))
+    resp.mimetype = "application/json"
+    return resp
+
+
+@app.after_request
+def _compress_response(resp):
+    """较大的 JSON 响应在客户端接受 gzip 时压缩后返回。"""
+    if resp.direct_passthrough or resp.mimetype != "application/json":
+        return resp
+    if "Content-Encoding" in resp.headers or not request.accept_encodings["gzip"]:
+        return resp
+    body = resp.get_data()
+    if len(body) < _GZIP_MIN_BYTES:
+        return resp
+    # JSON 中的键名大量重复，最低压缩级别即可获得大部分收益
+    resp.set_data(gzip.compress(body, compresslevel=1))
+    resp.headers["Content-Encoding"] = "gzip"
+    resp.vary.add("Accept-Encoding")
+    return resp
 
 
 @app.route("/api/agent/register", methods=["POST"])
 def register():
     """处理客户端注册请求。"""
-    data = request.get_json(force=True, silent=True)
+    data = g.json
     if not isinstance(data, dict):
-        abort(400, "Invalid request body")
+        return _ERR_INVALID_BODY
 
     uuid = data.get("client_id")
     hostname = data.get("hostname")
     if not (uuid and hostname):
-        abort(400, "Missing client_id or hostname")
+        return _ERR_MISSING_IDENTITY
 
     result = db.register_server(uuid, hostname, request.remote_addr)
-    return jsonify(result)
+    return _json_response(result)
 
 
 @app.route("/api/admin/servers/pending", methods=["GET"])
 def list_pending():
     """获取待审核的服务器列表。"""
     servers = db.get_pending_servers()
-    return jsonify(servers)
+    return _json_response(servers)
 
 
 @app.route("/api/admin/servers/<int:server_id>/accept", methods=["POST"])
 def accept_server(server_id: int):
     """接受服务器注册。"""
     if db.accept_server(server_id):
-        return jsonify({"status": "ok"})
-    abort(404, "Server not found")
+        _invalidate_auth_cache()
+        return _json_response({"status": "ok"})
+    return _ERR_SERVER_NOT_FOUND
 
 
 @app.route("/api/admin/servers/<int:server_id>/reject", methods=["POST"])
 def reject_server(server_id: int):
     """拒绝服务器注册。"""
-    data = request.get_json(force=True, silent=True) or {}
-    reason = data.get("reason", "")
-    
+    data = g.json
+    reason = data.get("reason", "") if isinstance(data, dict) else ""
+
     if db.reject_server(server_id, reason):
-        return jsonify({"status": "ok"})
-    abort(404, "Server not found")
+        _invalidate_auth_cache()
+        return _json_response({"status": "ok"})
+    return _ERR_SERVER_NOT_FOUND
 
 
 @app.route("/api/agent/report", methods=["POST"])
@@ -61,80 +575,53 @@ def report():
     """接收客户端上报的指标列表。"""
     client_token = request.headers.get("X-Auth-Token")
     if not client_token:
-        abort(401, "Unauthorized: Invalid token")
+        return _ERR_NO_TOKEN
 
-    data = request.get_json(force=True, silent=True)
-    if not isinstance(data, list):
-        abort(400, "Payload must be a JSON array")
+    # 客户端在请求头中给出 client_id 时先完成鉴权，未通过的请求不读取、不解压请求体
+    header_uuid = request.headers.get("X-Client-Id")
+    if header_uuid:
+        error = _authenticate(header_uuid, client_token)
+        if error is not None:
+            return error
+
+    data, error = _get_report_body(request.headers.get("X-Schema") == _SCHEMA_V2)
+    if error is not None:
+        return error
 
     # 验证第一条数据的 client_id
     if not data:
-        return jsonify({"status": "ok", "received": 0})
+        return _report_response({"status": "ok", "received": 0})
 
     entry = data[0]
-    uuid = entry.get("client_id")
+    uuid = entry.get("client_id") if isinstance(entry, dict) else entry.client_id
     if not uuid:
-        abort(400, "Missing client_id in metrics")
+        return _ERR_MISSING_CLIENT_ID
 
-    # 查询该 UUID 对应的认证信息
-    with db.get_cursor() as cur:
-        cur.execute(
-            "SELECT auth_token, register_status FROM servers WHERE uuid = %s",
-            (uuid,)
-        )
-        server = cur.fetchone()
-        if not server:
-            abort(401, "Unknown client")
-        if server["register_status"] != "ACCEPTED":
-            abort(403, "Registration not accepted")
-        if server["auth_token"] != client_token:
-            abort(401, "Invalid token for this client")
+    if header_uuid:
+        # 已按请求头鉴权，数据须属于同一客户端
+        if uuid != header_uuid:
+            return _ERR_CLIENT_ID_MISMATCH
+    else:
+        # 旧版本客户端不带 X-Client-Id，解码后按数据中的 client_id 鉴权
+        error = _authenticate(uuid, client_token)
+        if error is not None:
+            return error
+
+    # 更新心跳时间；同一请求内客户端和来源地址不变，整批只需登记一次
+    _mark_seen(uuid, request.remote_addr)
 
     count: int = len(data)
-    logging.info("收到 %d 条指标", count)
-
-    for idx, entry in enumerate(data, start=1):
-        ts = entry.get("timestamp")
-
-        # 更新心跳时间
-        db.update_server_seen(uuid, request.remote_addr)
-
-        cpu: Dict[str, Any] = entry.get("cpu", {})
-        mem: Dict[str, Any] = entry.get("memory", {})
-
-        logging.info(
-            "[Entry %d] ts=%s | CPU %.1f%%, %.1f°C, %.1fW | Mem %.1f%% (%.2f/%.2f GB) freq=%s MHz",
-            idx,
-            ts,
-            cpu.get("usage_percent", 0.0),
-            cpu.get("temperature_c", -1.0) or -1.0,
-            cpu.get("power_w", -1.0) or -1.0,
-            mem.get("percent", 0.0),
-            (mem.get("used", 0) / 1024 ** 3),
-            (mem.get("total", 0) / 1024 ** 3),
-            mem.get("frequency_mhz", "-") or "-",
-        )
+    logger.info("收到 %d 条指标", count)
+
+    # 逐条明细日志只在 INFO 启用时构建参数
+    if not logger.isEnabledFor(logging.INFO):
+        return _report_response({"status": "ok", "received": count})
+
+    # 客户端正常上报时每次只有一条，单独处理；积压补发时按下标遍历
+    if count == 1:
+        _log_entry(1, entry)
+    else:
+        for idx in range(count):
+            _log_entry(idx + 1, data[idx])
 
-        # 打印磁盘信息
-        for d in entry.get("disk", []):
-            logging.info(
-                "    Disk %s at %s %.1f%% used (%.2f/%.2f GB)",
-                d.get("device"),
-                d.get("mountpoint"),
-                d.get("percent"),
-                d.get("used", 0) / 1024 ** 3,
-                d.get("total", 0) / 1024 ** 3,
-            )
-
-        # 打印 GPU 信息
-        for g in entry.get("gpus", []):
-            logging.info(
-                "    GPU %s idx=%s util=%.1f%% mem=%.1f%% power=%.1fW",
-                g.get("name"),
-                g.get("index"),
-                g.get("util_percent"),
-                g.get("memory_util_percent"),
-                g.get("power_w", -1.0) or -1.0,
-            )
-
-    return jsonify({"status": "ok", "received": count}) 
\ No newline at end of file
+    return _report_response({"status": "ok", "received": count}) 
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""上报指标的数据结构，依赖 msgspec。
+
+请求体按这里的结构一次解码为 Struct 列表，同时完成结构校验，省去中间 dict 及
+逐级 .get 查找；未声明的字段在解码时直接丢弃。数值字段一律用 float、可缺省的
+字段用 Optional，以兼容各版本客户端。
+"""
+
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+
+def report_type(rename: Optional[Dict[str, str]] = None) -> Any:
+    """返回上报请求体的类型 List[Entry]。
+
+    rename 为字段名到请求中实际键名的映射，用于直接解码 v2 格式缩短的键名，
+    未出现在映射中的字段沿用原名。
+    """
+
+    class CPU(msgspec.Struct, rename=rename):
+        usage_percent: float = 0.0
+        temperature_c: Optional[float] = None
+        power_w: Optional[float] = None
+
+    class Memory(msgspec.Struct, rename=rename):
+        percent: float = 0.0
+        used: float = 0
+        total: float = 0
+        frequency_mhz: Optional[float] = None
+
+    class Disk(msgspec.Struct, rename=rename):
+        device: Optional[str] = None
+        mountpoint: Optional[str] = None
+        percent: Optional[float] = None
+        used: float = 0
+        total: float = 0
+
+    class GPU(msgspec.Struct, rename=rename):
+        name: Optional[str] = None
+        index: Optional[int] = None
+        util_percent: Optional[float] = None
+        memory_util_percent: Optional[float] = None
+        power_w: Optional[float] = None
+
+    class Entry(msgspec.Struct, rename=rename):
+        client_id: Optional[str] = None
+        timestamp: Any = None
+        cpu: CPU = msgspec.field(default_factory=CPU)
+        memory: Memory = msgspec.field(default_factory=Memory)
+        disk: List[Disk] = []
+        gpus: List[GPU] = []
+
+    return List[Entry]
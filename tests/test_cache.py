@@ -0,0 +1,151 @@
+"""client.cache 的轮换表、未发送数据及解码容错测试。"""
+
+import json
+import logging
+import types
+
+import pytest
+
+from client import cache as cache_mod
+from client.cache import Cache
+
+MAX_AGE = 100
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.time，替换 cache 模块中使用的时钟。"""
+    now = [1_000_000]
+    monkeypatch.setattr(cache_mod, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    c = Cache(str(tmp_path / "cache.db"))
+    yield c
+    c.close()
+
+
+def _unsent_values(c):
+    return [row["data"]["n"] for row in c.get_unsent(limit=100)]
+
+
+def test_prune_before_max_age_keeps_active_table(cache, clock):
+    cache.save_many([{"n": 1}, {"n": 2}])
+    clock[0] += MAX_AGE - 1
+    cache.prune(MAX_AGE)
+    assert cache._active == 0
+    assert _unsent_values(cache) == [1, 2]
+
+
+def test_first_rollover_keeps_rows_of_previous_table(cache, clock):
+    cache.save_many([{"n": 1}, {"n": 2}])
+    clock[0] += MAX_AGE
+    cache.prune(MAX_AGE)
+    assert cache._active == 1
+
+    cache.save({"n": 3})
+    # 未发送的数据横跨两张表，仍按写入顺序返回
+    assert _unsent_values(cache) == [1, 2, 3]
+
+
+def test_ids_keep_increasing_across_rollovers(cache, clock):
+    cache.save_many([{"n": 1}, {"n": 2}])
+    for n in (3, 4):
+        clock[0] += MAX_AGE
+        cache.prune(MAX_AGE)
+        cache.save({"n": n})
+    ids = [row["id"] for row in cache.get_unsent(limit=100)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_second_rollover_drops_stale_table_and_warns_about_unsent(cache, clock, caplog):
+    cache.save_many([{"n": 1}, {"n": 2}, {"n": 3}, {"n": 4}])
+    first_ids = [row["id"] for row in cache.get_unsent()]
+    cache.mark_sent(first_ids[:2])
+
+    clock[0] += MAX_AGE
+    cache.prune(MAX_AGE)
+    cache.save({"n": 5})
+
+    clock[0] += MAX_AGE
+    with caplog.at_level(logging.WARNING, logger="client.cache"):
+        cache.prune(MAX_AGE)
+
+    assert _unsent_values(cache) == [5]
+    warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert warnings[0].args == (2,)
+
+
+def test_rollover_of_fully_sent_table_does_not_warn(cache, clock, caplog):
+    cache.save_many([{"n": 1}, {"n": 2}])
+    cache.mark_sent([row["id"] for row in cache.get_unsent()])
+    clock[0] += MAX_AGE
+    cache.prune(MAX_AGE)
+    clock[0] += MAX_AGE
+    with caplog.at_level(logging.WARNING, logger="client.cache"):
+        cache.prune(MAX_AGE)
+    assert not [r for r in caplog.records if r.levelno == logging.WARNING]
+
+
+def test_rollover_state_survives_reopen(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    c = Cache(path)
+    c.save({"n": 1})
+    clock[0] += MAX_AGE
+    c.prune(MAX_AGE)
+    c.save({"n": 2})
+    c.close()
+
+    reopened = Cache(path)
+    try:
+        assert reopened._active == 1
+        assert _unsent_values(reopened) == [1, 2]
+    finally:
+        reopened.close()
+
+
+def test_mark_sent_covers_both_tables(cache, clock):
+    cache.save({"n": 1})
+    clock[0] += MAX_AGE
+    cache.prune(MAX_AGE)
+    cache.save({"n": 2})
+    cache.mark_sent([row["id"] for row in cache.get_unsent()])
+    assert cache.get_unsent() == []
+
+
+def test_undecodable_row_is_skipped_and_does_not_block(cache, monkeypatch, caplog):
+    # 替换模块中的编解码函数，模拟未安装 msgspec 的环境：新数据以 JSON 写入，
+    # MessagePack 数据无法解码
+    monkeypatch.setattr(cache_mod, "_encode", lambda data: json.dumps(data).encode("utf-8"))
+    monkeypatch.setattr(cache_mod, "_decode_msgpack", None)
+    cache.save({"n": 1})
+    # 装有 msgspec 的进程写入的 MessagePack 数据，在上述模拟环境中无法解码
+    with cache._conn:
+        cache._conn.execute(
+            "INSERT INTO metrics_a (timestamp, data, sent) VALUES (0, ?, 0)", (b"\x81\xa1n\x02",)
+        )
+    cache.save({"n": 3})
+
+    with caplog.at_level(logging.WARNING, logger="client.cache"):
+        assert _unsent_values(cache) == [1, 3]
+    assert any(r.levelno == logging.WARNING for r in caplog.records)
+    # 无法解码的行已标记，之后不再返回
+    assert _unsent_values(cache) == [1, 3]
+    assert cache._conn.execute("SELECT COUNT(*) FROM metrics_a WHERE sent = 0").fetchone()[0] == 2
+
+
+def test_save_does_not_mutate_callers_gpu_dicts(cache):
+    gpu = {"name": "gpu0", "util_percent": None, "memory_total": 8}
+    metrics = {"n": 1, "gpus": [gpu]}
+    cache.save(metrics)
+
+    assert gpu == {"name": "gpu0", "util_percent": None, "memory_total": 8}
+    assert metrics["gpus"][0] is gpu
+    saved = cache.get_unsent()[0]["data"]["gpus"][0]
+    assert saved["util_percent"] == 0
+    assert saved["memory_used"] == 0
+    assert saved["memory_total"] == 8
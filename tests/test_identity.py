@@ -0,0 +1,46 @@
+"""client.identity 生成的 Token 须与服务端算法逐字节一致。"""
+
+import base64
+import hashlib
+import hmac
+import uuid
+
+import pytest
+
+from client.config import SERVER_SECRET_KEY
+from client.identity import generate_token
+
+
+def _reference_token(uuid_str: str) -> str:
+    """服务端使用的原始算法：HMAC-SHA256 后 URL 安全 base64 编码并去掉填充。"""
+    h = hmac.new(SERVER_SECRET_KEY.encode("utf-8"), uuid_str.encode("utf-8"), hashlib.sha256)
+    return base64.urlsafe_b64encode(h.digest()).decode("utf-8").rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "uuid_str",
+    [
+        "00000000-0000-0000-0000-000000000000",
+        "ffffffff-ffff-ffff-ffff-ffffffffffff",
+        "",
+        "主机-ünicode",
+        "x" * 200,
+    ],
+)
+def test_token_matches_reference(uuid_str):
+    assert generate_token(uuid_str) == _reference_token(uuid_str)
+
+
+def test_token_matches_reference_for_random_uuids():
+    for _ in range(500):
+        uuid_str = str(uuid.uuid4())
+        assert generate_token(uuid_str) == _reference_token(uuid_str)
+
+
+def test_token_uses_urlsafe_alphabet_without_padding():
+    # 遍历足够多的输入，确保出现过需要替换 "+" "/" 的摘要
+    tokens = [generate_token(str(i)) for i in range(200)]
+    assert all(len(t) == 43 for t in tokens)
+    joined = "".join(tokens)
+    assert not set("+/=") & set(joined)
+    assert set("-_") & set(joined)
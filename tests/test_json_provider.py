@@ -0,0 +1,20 @@
+"""服务端 JSON provider 测试。"""
+
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("pymysql")
+pytest.importorskip("orjson")
+
+from server import main  # noqa: E402
+
+
+def test_dumps_without_options_is_compact():
+    assert main.app.json.dumps({"b": 1, "a": 2}) == '{"b":1,"a":2}'
+
+
+def test_dumps_honours_flask_options():
+    out = main.app.json.dumps({"b": 1, "a": 2}, sort_keys=True, indent=2)
+    assert out == json.dumps({"a": 2, "b": 1}, indent=2)
@@ -0,0 +1,21 @@
+"""client.monitor_config 对缺省配置项的容错测试。"""
+
+import pytest
+
+from client.monitor_config import MonitorConfig
+
+
+@pytest.mark.parametrize("mode", ["CONTINUOUS", "SCHEDULED", "COUNTDOWN"])
+def test_null_schedule_and_countdown_are_tolerated(mode):
+    config = MonitorConfig({"mode": "CONTINUOUS", "schedule": None, "countdown": None})
+    config.update_config({"mode": mode, "schedule": None, "countdown": None})
+    assert config.mode == mode
+    assert config.is_monitoring_time() in (True, False)
+
+
+def test_status_snapshot_is_a_copy():
+    schedule = {"start_time": "09:00", "end_time": "18:00", "days": [1, 2, 3]}
+    config = MonitorConfig({"mode": "SCHEDULED", "schedule": schedule})
+    info = config.get_status_info()
+    assert info["schedule"] == schedule
+    assert info["schedule"] is not schedule
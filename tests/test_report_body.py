@@ -0,0 +1,99 @@
+"""上报接口对压缩请求体的大小限制及鉴权顺序测试。"""
+
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("pymysql")
+
+from server import main  # noqa: E402
+
+ENTRY = {"timestamp": 1700000000, "client_id": "c1", "cpu": {"usage_percent": 1.0}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # 这些用例不访问数据库：跳过建表，鉴权直接放行
+    main._tables_ready.set()
+    monkeypatch.setattr(main, "_authenticate", lambda uuid, token: None)
+    monkeypatch.setattr(main, "_mark_seen", lambda uuid, ip: None)
+    return main.app.test_client()
+
+
+def _post(client, body, **headers):
+    return client.post("/api/agent/report", data=body, headers={"X-Auth-Token": "t", **headers})
+
+
+def test_gzip_body_is_decoded(client):
+    resp = _post(client, gzip.compress(json.dumps([ENTRY]).encode()), **{"Content-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.get_json()["received"] == 1
+
+
+def test_gzip_bomb_is_rejected_with_413(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_DECOMPRESSED_BYTES", 1024)
+    bomb = gzip.compress(b"[" + b" " * 100_000 + b"]")
+    assert len(bomb) < 1024
+    resp = _post(client, bomb, **{"Content-Encoding": "gzip"})
+    assert resp.status_code == 413
+    assert resp.get_json() == {"error": "Request body too large"}
+
+
+def test_gzip_body_exactly_at_limit_is_accepted(client, monkeypatch):
+    body = json.dumps([ENTRY]).encode()
+    monkeypatch.setattr(main, "MAX_DECOMPRESSED_BYTES", len(body))
+    resp = _post(client, gzip.compress(body), **{"Content-Encoding": "gzip"})
+    assert resp.status_code == 200
+
+
+def test_truncated_gzip_body_is_rejected_with_400(client):
+    body = gzip.compress(json.dumps([ENTRY] * 50).encode())
+    resp = _post(client, body[: len(body) // 2], **{"Content-Encoding": "gzip"})
+    assert resp.status_code == 400
+
+
+def test_oversized_request_body_is_rejected_with_413(client, monkeypatch):
+    monkeypatch.setitem(main.app.config, "MAX_CONTENT_LENGTH", 16)
+    resp = _post(client, json.dumps([ENTRY]).encode())
+    assert resp.status_code == 413
+    assert resp.is_json
+
+
+def test_client_id_header_is_authenticated_before_body_is_read(client, monkeypatch):
+    seen = []
+
+    def reject(uuid, token):
+        seen.append(uuid)
+        return main._ERR_UNKNOWN_CLIENT
+
+    monkeypatch.setattr(main, "_authenticate", reject)
+    monkeypatch.setattr(main, "_get_report_body", lambda schema_v2: pytest.fail("body was read"))
+    resp = _post(client, b"not even json", **{"X-Client-Id": "c1"})
+    assert resp.status_code == 401
+    assert seen == ["c1"]
+
+
+def test_client_id_header_must_match_payload(client):
+    resp = _post(client, json.dumps([ENTRY]).encode(), **{"X-Client-Id": "other"})
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "client_id does not match X-Client-Id"}
+
+
+def test_zstd_bomb_is_rejected_with_413(client, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+    monkeypatch.setattr(main, "MAX_DECOMPRESSED_BYTES", 1024)
+    bomb = zstandard.ZstdCompressor().compress(b"[" + b" " * 100_000 + b"]")
+    resp = _post(client, bomb, **{"Content-Encoding": "zstd"})
+    assert resp.status_code == 413
+
+
+def test_zstd_body_spanning_several_frames_is_decoded(client):
+    zstandard = pytest.importorskip("zstandard")
+    compress = zstandard.ZstdCompressor().compress
+    body = json.dumps([ENTRY, ENTRY]).encode()
+    half = body.index(b"}},") + 2
+    resp = _post(client, compress(body[:half]) + compress(body[half:]), **{"Content-Encoding": "zstd"})
+    assert resp.status_code == 200
+    assert resp.get_json()["received"] == 2
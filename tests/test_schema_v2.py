@@ -0,0 +1,120 @@
+"""v2 上报格式：客户端 _shrink 缩短键名与服务端还原的往返测试。"""
+
+import copy
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("flask")
+pytest.importorskip("pymysql")
+
+from client import sender  # noqa: E402
+from server import main  # noqa: E402
+
+PAYLOAD = [
+    {
+        "timestamp": 1700000000,
+        "client_id": "00000000-0000-0000-0000-000000000001",
+        "hostname": "host-1",
+        "cpu": {"usage_percent": 12.5, "temperature_c": None, "power_w": 35.0},
+        "memory": {"total": 16 * 1024 ** 3, "used": 8 * 1024 ** 3, "percent": 50.0, "available": 8},
+        "disk": [
+            {
+                "device": "/dev/sda1",
+                "model": "disk",
+                "mountpoint": "/",
+                "fstype": "ext4",
+                "total": 100,
+                "used": 40,
+                "free": 60,
+                "percent": 40.0,
+            }
+        ],
+        "gpus": [
+            {
+                "vendor": "nvidia",
+                "index": 0,
+                "name": "gpu",
+                "util_percent": 30.0,
+                "memory_total": 8,
+                "memory_used": 2,
+                "memory_util_percent": 25.0,
+                "frequency_mhz": 1500,
+                "power_w": 120.0,
+            }
+        ],
+    },
+    {"timestamp": 1700000030, "client_id": "00000000-0000-0000-0000-000000000001", "hostname": "host-1"},
+]
+
+
+def test_key_maps_are_inverse():
+    assert main._SHORT_KEYS == {short: name for name, short in sender._KEY_MAP.items()}
+
+
+def test_shrink_then_expand_round_trips():
+    original = copy.deepcopy(PAYLOAD)
+    shrunk = sender._shrink(PAYLOAD)
+
+    assert PAYLOAD == original  # _shrink 不修改原数据
+    assert "up" in shrunk[0]["cpu"] and "usage_percent" not in shrunk[0]["cpu"]
+    assert "pc" in shrunk[0]["disk"][0]
+    assert "mup" in shrunk[0]["gpus"][0]
+
+    # 模拟经过网络传输后的独立副本
+    received = json.loads(json.dumps(shrunk))
+    assert main._expand_keys(received) == original
+
+
+def test_shrink_keeps_unmapped_keys_and_leaf_values():
+    shrunk = sender._shrink({"cpu": {"usage_percent": 1.0, "custom": [1, {"percent": 2}]}})
+    assert shrunk == {"cpu": {"up": 1.0, "custom": [1, {"pc": 2}]}}
+
+
+def _fields(obj):
+    """将 Struct 递归展开为以字段名为键的 dict。"""
+    if isinstance(obj, list):
+        return [_fields(v) for v in obj]
+    if hasattr(obj, "__struct_fields__"):
+        return {name: _fields(getattr(obj, name)) for name in obj.__struct_fields__}
+    return obj
+
+
+def test_msgspec_v2_decoder_matches_v1_decoder():
+    pytest.importorskip("msgspec")
+    decode_v1 = main._report_decoders[False, False]
+    decode_v2 = main._report_decoders[False, True]
+    v1 = decode_v1(json.dumps(PAYLOAD).encode())
+    v2 = decode_v2(json.dumps(sender._shrink(PAYLOAD)).encode())
+    # v1/v2 各自生成 Struct 类型（序列化键名也不同），按字段名逐个比较
+    assert _fields(v1) == _fields(v2)
+    assert v2[0].cpu.usage_percent == 12.5
+    assert v2[0].disk[0].percent == 40.0
+    assert v2[0].gpus[0].memory_util_percent == 25.0
+
+
+@pytest.fixture
+def client():
+    # 这些用例都在访问数据库之前返回，跳过首个请求时的建表
+    main._tables_ready.set()
+    return main.app.test_client()
+
+
+def test_report_validation_error_includes_field_path(client):
+    pytest.importorskip("msgspec")
+    body = copy.deepcopy(PAYLOAD)
+    body[0]["cpu"]["usage_percent"] = "high"
+    resp = client.post("/api/agent/report", data=json.dumps(body), headers={"X-Auth-Token": "t"})
+    assert resp.status_code == 400
+    assert "$[0].cpu.usage_percent" in resp.get_json()["error"]
+
+
+def test_report_unsupported_encoding_returns_json_415(client):
+    resp = client.post(
+        "/api/agent/report",
+        data=b"[]",
+        headers={"X-Auth-Token": "t", "Content-Encoding": "br"},
+    )
+    assert resp.status_code == 415
+    assert resp.get_json() == {"error": "Unsupported Content-Encoding"}
@@ -0,0 +1,116 @@
+"""client.state_manager 的状态日志重放与压缩测试。"""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip("requests")
+
+from client import state_manager as sm  # noqa: E402
+from client.state_manager import ClientState, StateManager  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # 状态目录是相对于工作目录的 client_data
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def managers():
+    """创建 StateManager 并在用例结束时关闭，避免目录句柄泄漏。"""
+    created = []
+
+    def make():
+        m = StateManager()
+        created.append(m)
+        return m
+
+    yield make
+    for m in created:
+        m.close()
+
+
+def _wal_lines(workdir):
+    path = workdir / sm._STATE_DIR / "client_state.log"
+    return path.read_bytes().splitlines() if path.exists() else []
+
+
+def test_state_changes_are_replayed_from_journal(managers, workdir):
+    m = managers()
+    m.set_state(ClientState.REGISTERED)
+    m.set_state(ClientState.SLEEP_RETRY)
+    assert len(_wal_lines(workdir)) == 2
+    assert not (workdir / sm._STATE_DIR / "client_state.json").exists()
+
+    assert managers().get_state() is ClientState.SLEEP_RETRY
+
+
+def test_journal_lines_are_compact(managers, workdir):
+    managers().set_state(ClientState.REGISTERED)
+    line = _wal_lines(workdir)[0]
+    assert b", " not in line and b": " not in line
+    assert json.loads(line)["state"] == "registered"
+
+
+def test_unchanged_state_is_not_written_twice(managers, workdir):
+    m = managers()
+    m.set_state(ClientState.REGISTERED)
+    m._save_state()
+    m._save_state()
+    assert len(_wal_lines(workdir)) == 1
+
+
+def test_torn_last_line_is_truncated_and_ignored(managers, workdir):
+    m = managers()
+    m.set_state(ClientState.REGISTERED)
+    m.close()
+    wal = workdir / sm._STATE_DIR / "client_state.log"
+    with open(wal, "ab") as f:
+        f.write(b'{"state":"sleep_re')
+
+    reloaded = managers()
+    assert reloaded.get_state() is ClientState.REGISTERED
+    assert wal.read_bytes().endswith(b"\n")
+
+    # 截断后追加的事件独占一行，可以正常重放
+    reloaded.set_state(ClientState.SLEEP_RETRY)
+    assert managers().get_state() is ClientState.SLEEP_RETRY
+
+
+def test_compaction_writes_snapshot_and_empties_journal(managers, workdir, monkeypatch):
+    monkeypatch.setattr(sm, "_WAL_COMPACT_BYTES", 1)
+    monkeypatch.setattr(sm, "_SAVE_DEBOUNCE", 3600)
+    m = managers()
+    m.set_state(ClientState.REGISTERED)
+    m.set_state(ClientState.SLEEP_RETRY)
+    assert m._dirty
+
+    m._flush()
+    assert _wal_lines(workdir) == []
+    snapshot = json.loads((workdir / sm._STATE_DIR / "client_state.json").read_bytes())
+    assert snapshot["state"] == "sleep_retry"
+
+    assert managers().get_state() is ClientState.SLEEP_RETRY
+
+
+def test_journal_after_snapshot_overrides_snapshot(managers, workdir, monkeypatch):
+    monkeypatch.setattr(sm, "_WAL_COMPACT_BYTES", 1)
+    monkeypatch.setattr(sm, "_SAVE_DEBOUNCE", 3600)
+    m = managers()
+    m.set_state(ClientState.SLEEP_RETRY)
+    m._flush()
+    m.set_state(ClientState.REGISTERED)
+    m._discard_pending_save()
+
+    assert len(_wal_lines(workdir)) == 1
+    assert managers().get_state() is ClientState.REGISTERED
+
+
+def test_legacy_state_file_in_workdir_is_migrated(managers, workdir):
+    (workdir / "client_state.json").write_text(json.dumps({"state": "registered"}))
+    assert managers().get_state() is ClientState.REGISTERED
+    assert not (workdir / "client_state.json").exists()
+    assert os.path.exists(os.path.join(sm._STATE_DIR, "client_state.json"))